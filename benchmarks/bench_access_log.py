@@ -0,0 +1,115 @@
+# benchmarks/bench_access_log.py
+#
+# Compares the old open/append/close access logger with the queued background
+# writer in modules/logger, checks that several processes appending to one
+# rotating CSV lose no rows, and times the CSV / Parquet / SQLite sinks.
+#
+#   python benchmarks/bench_access_log.py --rows 20000 --processes 4
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import logger
+
+
+def legacy_log_access(path, email, page=None):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    file_exists = os.path.isfile(path)
+    with open(path, mode="a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["Email", "DateTime", "Page"])
+        writer.writerow([email, now, page or "Login"])
+
+
+def row(i, tag="main"):
+    return [f"user{i % 97}@gh.nestle.com", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), f"{tag}-{i}"]
+
+
+def write_from_process(path, tag, n_rows, max_bytes):
+    writer = logger.AccessLogWriter(logger.CsvSink(path, max_bytes=max_bytes, backup_count=1000),
+                                    flush_interval=0.05, batch_size=200)
+    for i in range(n_rows):
+        writer.log(row(i, tag))
+    writer.close()
+
+
+def read_csv_logs(path):
+    files = logger.rotated_files(path, backup_count=1000)
+    return pd.concat([pd.read_csv(f) for f in files], ignore_index=True), files
+
+
+def timed_writer(sink, n_rows):
+    writer = logger.AccessLogWriter(sink)
+    start = time.perf_counter()
+    for i in range(n_rows):
+        writer.log(row(i))
+    enqueue = time.perf_counter() - start
+    assert writer.flush(timeout=120)
+    total = time.perf_counter() - start
+    writer.close()
+    return enqueue, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        # Old logger: one open/append/close per page view
+        legacy_path = os.path.join(root, "legacy.csv")
+        start = time.perf_counter()
+        for i in range(args.rows):
+            legacy_log_access(legacy_path, *row(i)[::2])
+        legacy = time.perf_counter() - start
+
+        results = {}
+        for kind, name in [("csv", "log.csv"), ("parquet", "log.parquet"), ("sqlite", "log.db")]:
+            path = os.path.join(root, name)
+            results[kind] = timed_writer(logger.make_sink(path), args.rows)
+
+        assert len(pd.read_csv(os.path.join(root, "log.csv"))) == args.rows
+        assert len(pd.read_parquet(os.path.join(root, "log.parquet"))) == args.rows
+        with sqlite3.connect(os.path.join(root, "log.db")) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM access_log").fetchone()[0] == args.rows
+
+        # Several processes appending to one rotating file
+        shared = os.path.join(root, "shared.csv")
+        per_process = args.rows // args.processes
+        start = time.perf_counter()
+        procs = [multiprocessing.Process(target=write_from_process, args=(shared, f"p{p}", per_process, 64 * 1024))
+                 for p in range(args.processes)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        shared_seconds = time.perf_counter() - start
+        df, files = read_csv_logs(shared)
+        assert len(df) == per_process * args.processes, (len(df), per_process * args.processes)
+        assert df["Page"].is_unique
+        assert not glob.glob(os.path.join(root, "*.tmp"))
+
+    print(f"{args.rows} rows")
+    print(f"{'legacy open/append per row':<36}{legacy:>8.3f}s {legacy / args.rows * 1e6:>9.1f} us/row in caller")
+    for kind, (enqueue, total) in results.items():
+        print(f"{f'queued {kind} sink':<36}{total:>8.3f}s {enqueue / args.rows * 1e6:>9.1f} us/row in caller")
+    print(f"{f'{args.processes} processes, one rotating CSV':<36}{shared_seconds:>8.3f}s "
+          f"{len(files):>5} files, no rows lost")
+
+
+if __name__ == "__main__":
+    main()
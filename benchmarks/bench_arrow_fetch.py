@@ -0,0 +1,131 @@
+# benchmarks/bench_arrow_fetch.py
+#
+# Compares the legacy pd.read_sql extract with the Arrow batch path in
+# modules/snowflake_connector using a local fake cursor. Each mode runs in its own
+# process so the peak RSS growth it reports is not shared between them (POSIX only).
+#
+#   python benchmarks/bench_arrow_fetch.py --rows 2000000 --batch-size 100000
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import snowflake_connector
+
+ZONES = ["AMS", "AOA", "EUR", "GC"]
+FUNCTIONS = ["Sales", "Marketing", "Finance", "HR", "IT", "Supply Chain", "Manufacturing", "R&D Team"]
+REASONS = ["Hire", "Termination", "Transfer", "Promotion", "Retirement", "Data Change"]
+STATUSES = ["Active", "Inactive", "Leave"]
+
+
+def make_batch(start, size, seed):
+    rng = np.random.default_rng(seed)
+    entry = np.datetime64("2005-01-01") + rng.integers(0, 7000, size).astype("timedelta64[D]")
+    action = np.datetime64("2021-01-01") + rng.integers(0, 1400, size).astype("timedelta64[D]")
+    return pa.table({
+        "EMPLOYEE_PERSONNEL_NUMBER": pc.cast(pa.array(np.arange(start, start + size)), pa.string()),
+        "CALENDAR_YEAR": pa.array(rng.integers(2021, 2025, size), type=pa.int16() if seed % 2 else pa.int64()),
+        "ZONE_NIM_GEO": pa.array(np.array(ZONES)[rng.integers(0, len(ZONES), size)]),
+        "FUNCTION": pa.array(np.array(FUNCTIONS)[rng.integers(0, len(FUNCTIONS), size)]),
+        "REASON_FOR_ACTION": pa.array(np.array(REASONS)[rng.integers(0, len(REASONS), size)]),
+        "TECHNICAL_ENTRY_DATE": pa.array(entry, type=pa.date32()),
+        "ACTION_DATE": pa.array(action, type=pa.date32()),
+        "EMPLOYMENT_STATUS": pa.array(np.array(STATUSES)[rng.integers(0, len(STATUSES), size)]),
+    })
+
+
+class FakeCursor:
+    """Serves synthetic Arrow batches, or Python tuples for the DB-API path."""
+
+    def __init__(self, rows, batch_size):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.description = [(name, None, None, None, None, None, None)
+                            for name in snowflake_connector.WORKFORCE_COLUMNS]
+
+    def execute(self, query, *args):
+        return self
+
+    def fetch_arrow_batches(self):
+        for i, start in enumerate(range(0, self.rows, self.batch_size)):
+            yield make_batch(start, min(self.batch_size, self.rows - start), i)
+
+    def fetchall(self):
+        rows = []
+        for batch in self.fetch_arrow_batches():
+            rows.extend(zip(*(col.to_pylist() for col in batch.columns)))
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows, batch_size):
+        self.rows = rows
+        self.batch_size = batch_size
+
+    def cursor(self):
+        return FakeCursor(self.rows, self.batch_size)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def run_mode(mode, rows, batch_size, queue):
+    conn = FakeConnection(rows, batch_size)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "arrow":
+        df = snowflake_connector.fetch_arrow_frame(conn, snowflake_connector.WORKFORCE_QUERY)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            df = pd.read_sql(snowflake_connector.WORKFORCE_QUERY, conn)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_mb": (peak_kb - baseline_kb) / 1e3,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "rows": len(df),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for mode in ["read_sql", "arrow"]:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=run_mode, args=(mode, args.rows, args.batch_size, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    print(f"{'mode':<10}{'rows':>12}{'seconds':>10}{'+peak MB':>10}{'frame MB':>10}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['rows']:>12,}{r['seconds']:>10.2f}{r['peak_mb']:>10.1f}{r['frame_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_batch_runner.py
+#
+# Writes synthetic market folders (drivers.csv, headcount.csv, config.json)
+# and times modules/batch_runner inline and with a process pool, checking
+# that both runs write the same tables.
+#
+#   python benchmarks/bench_batch_runner.py --markets 100 --workers 8
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import batch_runner
+
+FUNCTIONS = ["Sales", "Supply Chain", "Manufacturing", "Marketing", "Finance", "HR"]
+DRIVERS = ["Sales Volume", "Supply Chain Cost", "Manufacturing Output", "Marketing Spend",
+           "Finance Transactions", "HR Tickets", "Store Count", "Export Volume"]
+
+
+def write_market(path, seed, n_years=5):
+    rng = np.random.default_rng(seed)
+    years = [str(2020 + i) for i in range(n_years)]
+    trend = np.arange(n_years)
+
+    headcount = pd.DataFrame({
+        "Function Unit": FUNCTIONS,
+        **{y: (rng.integers(50, 500, len(FUNCTIONS)) * (1 + 0.05 * t)).round() for t, y in enumerate(years)}
+    })
+    drivers = pd.DataFrame({
+        "Business Driver": DRIVERS,
+        **{y: np.round(rng.uniform(100, 1000, len(DRIVERS)) * (1 + rng.uniform(0, 0.2) * t), 1)
+           for t, y in zip(trend, years)}
+    })
+    roles = {f"{f} Analyst": f for f in FUNCTIONS} | {f"{f} Lead": f for f in FUNCTIONS}
+    config = {
+        "driver_function_mapping": {
+            d: [f for f in FUNCTIONS if f.split()[0].lower() in d.lower()] or [FUNCTIONS[i % len(FUNCTIONS)]]
+            for i, d in enumerate(DRIVERS)
+        },
+        "selection_method": "Best driver per correlation cluster",
+        "bootstrap_resamples": 500,
+        "role_func_map": roles,
+        "growth_rate": 0.03,
+        "strategic_scores": {role: int(rng.integers(1, 6)) for role in roles}
+    }
+
+    os.makedirs(path, exist_ok=True)
+    headcount.to_csv(os.path.join(path, batch_runner.HEADCOUNT_FILE), index=False)
+    drivers.to_csv(os.path.join(path, batch_runner.DRIVERS_FILE), index=False)
+    with open(os.path.join(path, batch_runner.CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+def timed_batch(market_dirs, output_dir, workers):
+    start = time.perf_counter()
+    results = list(batch_runner.run_batch(market_dirs, output_dir, workers))
+    seconds = time.perf_counter() - start
+    failed = [(m, e) for m, e, _ in results if e]
+    return seconds, failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--markets", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        input_dir = os.path.join(root, "markets")
+        for i in range(args.markets):
+            write_market(os.path.join(input_dir, f"market_{i:03d}"), seed=i)
+        market_dirs = batch_runner.find_markets(input_dir)
+
+        inline_dir, pool_dir = os.path.join(root, "inline"), os.path.join(root, "pool")
+        inline_seconds, failed = timed_batch(market_dirs, inline_dir, 1)
+        pool_seconds, _ = timed_batch(market_dirs, pool_dir, args.workers)
+
+        for market_dir in market_dirs:
+            market = os.path.basename(market_dir)
+            if not os.path.isdir(os.path.join(inline_dir, market)):
+                continue
+            for name in os.listdir(os.path.join(inline_dir, market)):
+                pd.testing.assert_frame_equal(
+                    pd.read_csv(os.path.join(inline_dir, market, name)),
+                    pd.read_csv(os.path.join(pool_dir, market, name))
+                )
+
+    print(f"{args.markets} markets, {len(failed)} failed")
+    for market, error in failed[:5]:
+        print(f"  {os.path.basename(market)}: {error}")
+    print(f"{'inline':<28}{inline_seconds:>8.2f}s {args.markets / inline_seconds:>8.1f} markets/s")
+    print(f"{f'process pool ({args.workers} workers)':<28}{pool_seconds:>8.2f}s {args.markets / pool_seconds:>8.1f} markets/s")
+
+
+if __name__ == "__main__":
+    main()
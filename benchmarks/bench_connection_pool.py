@@ -0,0 +1,199 @@
+# benchmarks/bench_connection_pool.py
+#
+# Exercises modules/snowflake_connector.ConnectionPool with an in-process fake
+# connector (connect() sleeps like the SSO handshake, queries sleep briefly):
+# reuse across sessions, max_size blocking and acquire timeouts, idle
+# eviction, health checks, and discarding connections whose query raised.
+# Compares query latency with opening a connection per query.
+#
+#   python benchmarks/bench_connection_pool.py --sessions 40 --threads 8 --max-size 4
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import snowflake_connector
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.closed:
+            raise RuntimeError("connection is closed")
+        time.sleep(self.conn.query_seconds)
+        if sql == "FAIL":
+            raise RuntimeError("query failed")
+        self.conn.queries += 1
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, query_seconds):
+        self.query_seconds = query_seconds
+        self.queries = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    """
+    connect() for the pool; tracks how many fake connections are open at once.
+    """
+
+    def __init__(self, connect_seconds, query_seconds):
+        self.connect_seconds = connect_seconds
+        self.query_seconds = query_seconds
+        self.connections = []
+
+    def __call__(self):
+        time.sleep(self.connect_seconds)
+        conn = FakeConnection(self.query_seconds)
+        self.connections.append(conn)
+        return conn
+
+    def open_count(self):
+        return sum(not c.closed for c in self.connections)
+
+
+def query(conn, sql="SELECT 1"):
+    cur = conn.cursor()
+    try:
+        cur.execute(sql)
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def run_sessions(pool, sessions, threads):
+    """
+    `sessions` queries from `threads` threads; returns the peak number of
+    connections checked out at once.
+    """
+    peak, lock = [0], threading.Lock()
+    todo = iter(range(sessions))
+
+    def worker():
+        for _ in iter(lambda: next(todo, None), None):
+            with pool.connection() as conn:
+                with lock:
+                    peak[0] = max(peak[0], pool.metrics()["in_use"])
+                query(conn)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return peak[0]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--max-size", type=int, default=4)
+    parser.add_argument("--connect", type=float, default=0.3, help="seconds to open a connection")
+    parser.add_argument("--query", type=float, default=0.02, help="seconds per query")
+    args = parser.parse_args()
+
+    # Old behaviour: a new connection per query
+    connector = FakeConnector(args.connect, args.query)
+
+    def per_query():
+        for _ in range(args.sessions):
+            conn = connector()
+            query(conn)
+            conn.close()
+    _, unpooled_seconds = timed(per_query)
+
+    # Reuse: sequential sessions share one connection
+    connector = FakeConnector(args.connect, args.query)
+    pool = snowflake_connector.ConnectionPool(connector, max_size=args.max_size)
+    _, sequential_seconds = timed(run_sessions, pool, args.sessions, 1)
+    stats = pool.metrics()
+    assert stats["opened"] == 1 and stats["reused"] == args.sessions - 1, stats
+
+    # Concurrent sessions: never more than max_size connections open
+    peak, concurrent_seconds = timed(run_sessions, pool, args.sessions, args.threads)
+    stats = pool.metrics()
+    assert peak <= args.max_size and stats["opened"] <= args.max_size, (peak, stats)
+    assert connector.open_count() <= args.max_size and stats["in_use"] == 0
+
+    # max_size blocking: with every connection checked out, acquire waits and times out
+    held = [pool.acquire() for _ in range(args.max_size)]
+    start = time.perf_counter()
+    try:
+        pool.acquire(timeout=0.2)
+        raise AssertionError("acquire should block while the pool is exhausted")
+    except TimeoutError:
+        blocked = time.perf_counter() - start
+    assert blocked >= 0.2
+    threading.Timer(0.1, pool.release, [held.pop()]).start()
+    waited_conn, waited = timed(pool.acquire, timeout=5)
+    assert 0.05 < waited < 1.0, waited
+    for conn in held + [waited_conn]:
+        pool.release(conn)
+
+    # A query that raises: its connection is closed, not handed to the next session
+    try:
+        with pool.connection() as conn:
+            failed = conn
+            query(conn, "FAIL")
+    except RuntimeError:
+        pass
+    assert failed.closed and all(c is not failed for c, _ in pool._idle)
+
+    # Health check: a connection closed while idle is replaced
+    pool._idle[-1][0].close()
+    with pool.connection() as conn:
+        assert not conn.closed
+        query(conn)
+    assert pool.metrics()["unhealthy"] == 1
+
+    # Idle eviction: connections idle past idle_timeout are closed
+    pool.idle_timeout = 0.1
+    time.sleep(0.2)
+    opened = pool.metrics()["opened"]
+    with pool.connection() as conn:
+        query(conn)
+    stats = pool.metrics()
+    assert stats["evicted"] >= 1 and stats["opened"] == opened + 1, stats
+    pool.close_all()
+    assert connector.open_count() == 0
+
+    print(f"{args.sessions} sessions, connect {args.connect:g}s, query {args.query:g}s, max_size {args.max_size}")
+    print(f"{'connection per query':<36}{unpooled_seconds:>8.2f}s")
+    print(f"{'pool, 1 thread':<36}{sequential_seconds:>8.2f}s")
+    print(f"{f'pool, {args.threads} threads':<36}{concurrent_seconds:>8.2f}s  peak in use {peak}")
+    print(f"{'acquire on exhausted pool':<36}{blocked:>8.2f}s  (timeout 0.2s)")
+    print(f"reused {stats['reused']}, opened {stats['opened']}, evicted {stats['evicted']}, "
+          f"unhealthy {stats['unhealthy']}, reuse ratio {stats['reuse_ratio']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
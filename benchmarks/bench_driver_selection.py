@@ -0,0 +1,77 @@
+# benchmarks/bench_driver_selection.py
+#
+# Times the intercorrelation matrix and each driver selection method in
+# modules/correlation_engine on synthetic drivers built from a few latent
+# business factors, plus the original pandas "every pair < 0.5" filter.
+#
+#   python benchmarks/bench_driver_selection.py --drivers 5000 --years 4
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import correlation_engine
+
+
+def synthetic_drivers(n_drivers, n_years, n_factors, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(n_factors, n_years))
+    loadings = rng.integers(0, n_factors, n_drivers)
+    values = 100 + 10 * factors[loadings] + rng.normal(scale=4, size=(n_drivers, n_years))
+    mask = rng.random((n_drivers, n_years)) > 0.05
+    mask[:, :2] = True
+    scores = rng.uniform(-1, 1, n_drivers)
+    return values, mask, scores
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def legacy_filter(corr_matrix, threshold):
+    corr_abs = corr_matrix.abs()
+    return [d for d in corr_abs.columns if all(corr_abs[d].drop(d) < threshold)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--factors", type=int, default=25)
+    parser.add_argument("--threshold", type=float, default=correlation_engine.INTERCORRELATION_THRESHOLD)
+    parser.add_argument("--legacy-limit", type=int, default=1000,
+                        help="largest driver count to run the pandas filter on")
+    args = parser.parse_args()
+
+    values, mask, scores = synthetic_drivers(args.drivers, args.years, args.factors)
+    corr, corr_seconds = timed(correlation_engine.pairwise_correlation, values, mask, repeat=1)
+    corr = np.round(corr, 2)
+    print(f"{args.drivers:,} drivers x {args.years} years")
+    print(f"{'intercorrelation matrix':<42}{corr_seconds:>8.3f}s")
+
+    for label, select in correlation_engine.SELECTION_METHODS.items():
+        selected, seconds = timed(select, corr, scores, args.threshold)
+        print(f"{label:<42}{seconds:>8.3f}s {len(selected):>6} kept")
+
+    if args.drivers <= args.legacy_limit:
+        labels = [f"D{i}" for i in range(args.drivers)]
+        frame = pd.DataFrame(corr, index=labels, columns=labels)
+        legacy, seconds = timed(legacy_filter, frame, args.threshold, repeat=1)
+        strict = correlation_engine.strict_filter(corr, scores, args.threshold)
+        assert legacy == [labels[i] for i in strict], "strict filter differs from the pandas rule"
+        print(f"{'pandas filter (original)':<42}{seconds:>8.3f}s {len(legacy):>6} kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# benchmarks/bench_external_fetch.py
+#
+# Serves stub World Bank and Adzuna endpoints on localhost - with latency,
+# intermittent 503s, a 429 with Retry-After and one role that never answers -
+# and compares the old sequential lookups with modules/fetch_engine as used by
+# the External Benchmarking page. Checks per-host concurrency, the Adzuna rate
+# limit, that the stuck role only costs its timeout, and that a stream the
+# page abandons (or whose deadline passes) stops sending requests. The
+# defaults are the page's Adzuna limits, so a full run takes ~3 minutes;
+# raise --rate for a quick one.
+#
+#   python benchmarks/bench_external_fetch.py --roles 50 --delay 0.3
+#   python benchmarks/bench_external_fetch.py --roles 50 --rate 600 --concurrency 4
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import fetch_engine, http_cache
+
+STUCK_ROLE = "Role 7"
+
+
+def salary_of(role):
+    return round(40_000 + 1_000 * int(role.split()[-1]) + 0.25, 2)
+
+
+def start_stub(delay, stuck_seconds):
+    """
+    Two "hosts" on one server: /adzuna/salaries?what=<role> and
+    /wb/country/<code>/indicator/<ind>. Every 5th first attempt at a salary
+    answers 503 and role 3 first gets a 429 with Retry-After: 1.
+    """
+    log = {"adzuna": [], "wb": [], "attempts": {}}
+    in_flight = {"adzuna": 0, "wb": 0}
+    peak = {"adzuna": 0, "wb": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, status, body, headers=()):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass   # the client already gave up (stuck role)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            host = url.path.split("/")[1]
+            role = parse_qs(url.query).get("what", [""])[0]
+            # The client gives up on the stuck role; don't count it as in flight
+            counted = role != STUCK_ROLE
+            with lock:
+                in_flight[host] += counted
+                peak[host] = max(peak[host], in_flight[host])
+                log[host].append(time.monotonic())
+            try:
+                if host == "adzuna":
+                    with lock:
+                        attempt = log["attempts"][role] = log["attempts"].get(role, 0) + 1
+                    time.sleep(stuck_seconds if role == STUCK_ROLE else delay)
+                    if role == "Role 3" and attempt == 1:
+                        return self.send_json(429, {"error": "quota"}, [("Retry-After", "1")])
+                    if int(role.split()[-1]) % 5 == 0 and attempt == 1:
+                        return self.send_json(503, {"error": "busy"})
+                    return self.send_json(200, {"mean": salary_of(role)})
+                time.sleep(delay)
+                years = {str(y): 1_000_000 + y for y in range(2015, 2024)}
+                return self.send_json(200, [{"page": 1}, [{"date": y, "value": v} for y, v in years.items()]])
+            finally:
+                with lock:
+                    in_flight[host] -= counted
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, log, peak
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.3, help="stub response time in seconds")
+    parser.add_argument("--rate", type=float, default=20, help="Adzuna requests per minute")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=2, help="Adzuna requests in flight")
+    parser.add_argument("--timeout", type=float, default=1.5, help="read timeout in seconds")
+    parser.add_argument("--deadline", type=float, default=120,
+                        help="seconds allowed on top of the rate limit's wait, as on the page")
+    args = parser.parse_args()
+
+    server, log, peak = start_stub(args.delay, stuck_seconds=30)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    adzuna, worldbank = base + "/adzuna/salaries", base + "/wb"
+    roles = [f"Role {i}" for i in range(1, args.roles + 1)]
+
+    # Old behaviour: one blocking request after another (the stuck role is
+    # left out - without a timeout it would hang the page)
+    def sequential():
+        results = {}
+        for role in [r for r in roles if r != STUCK_ROLE][:10]:
+            res = requests.get(adzuna, params={"what": role})
+            results[role] = res.json().get("mean") if res.status_code == 200 else None
+        return results
+    _, old_seconds = timed(sequential)
+    old_seconds *= len(roles) / 10
+    log["attempts"].clear()
+    log["adzuna"].clear()
+    peak["adzuna"] = 0
+
+    cache_dir = tempfile.TemporaryDirectory()
+    fetcher = fetch_engine.Fetcher(
+        host_limits={urlsplit(base).netloc: args.concurrency},
+        rate_limits={urlsplit(base).netloc: (args.rate / 60, args.burst)},
+        timeout=(1, args.timeout), retries=2, backoff=0.2,
+        cache=http_cache.ResponseCache(os.path.join(cache_dir.name, "http_cache.sqlite"))
+    )
+
+    def salary(role):
+        return fetcher.get_json(adzuna, params={"what": role})["mean"]
+
+    # As the page does: long enough for the bucket to let every role through
+    deadline = args.deadline + fetcher.wait_estimate(urlsplit(base).netloc, len(roles))
+
+    def run():
+        wb = [fetcher.submit(fetcher.get_json, f"{worldbank}/country/ch/indicator/{i}") for i in ("POP", "UNEMP")]
+        arrivals, results = [], {}
+        start = time.perf_counter()
+        for role, value, error in fetcher.stream(salary, roles, timeout=deadline):
+            arrivals.append(time.perf_counter() - start)
+            results[role] = error if error is not None else value
+        return results, arrivals, [f.result() for f in wb]
+
+    (results, arrivals, wb), new_seconds = timed(run)
+    for role in roles:
+        if role == STUCK_ROLE:
+            assert isinstance(results[role], requests.Timeout), results[role]
+        else:
+            assert results[role] == salary_of(role), (role, results[role])
+    assert all(len(w[1]) == 9 for w in wb)
+    assert peak["adzuna"] <= args.concurrency, peak
+    # Token bucket: no window may see more than burst + rate * window requests
+    stamps = sorted(log["adzuna"])
+    for i, t in enumerate(stamps):
+        window = [s for s in stamps[i:] if s - t <= 10.0]
+        assert len(window) <= args.burst + args.rate / 60 * 10.0 + 1, len(window)
+
+    _, cached_seconds = timed(lambda: list(fetcher.stream(salary, [r for r in roles if r != STUCK_ROLE])))
+
+    def requests_after(stop, lookups):
+        """
+        Adzuna requests sent more than one stub delay after stop() returned.
+        """
+        stop(lookups)
+        quiet_from = time.monotonic() + args.delay + 0.5
+        time.sleep(args.delay + 4.0)
+        return sum(t > quiet_from for t in log["adzuna"])
+
+    # Streamlit rerun: the page stops reading after two rows
+    def abandon(lookups):
+        rows = fetcher.stream(salary, lookups, timeout=deadline)
+        next(rows), next(rows)
+        rows.close()
+    after_close = requests_after(abandon, [f"Role {i}" for i in range(101, 121)])
+    # Deadline far shorter than the rate limit needs: lookups give up instead of queueing
+    short = [r for r in fetcher.stream(salary, [f"Role {i}" for i in range(201, 221)], timeout=2)]
+    after_deadline = requests_after(lambda lookups: None, [])
+    assert after_close == 0 and after_deadline == 0, (after_close, after_deadline)
+    assert any(isinstance(error, (TimeoutError, requests.Timeout)) for _, _, error in short)
+    fetcher.shutdown()
+    server.shutdown()
+    cache_dir.cleanup()
+
+    print(f"{len(roles)} roles, stub delay {args.delay:.2f}s, Adzuna limit {args.rate:g}/min "
+          f"burst {args.burst}, {args.concurrency} in flight, read timeout {args.timeout:g}s, "
+          f"deadline {deadline:.0f}s")
+    print(f"{'sequential (extrapolated, no stuck role)':<44}{old_seconds:>8.2f}s")
+    print(f"{'fetch layer, first row':<44}{arrivals[0]:>8.2f}s")
+    print(f"{'fetch layer, all rows':<44}{new_seconds:>8.2f}s")
+    print(f"{'fetch layer, cached rerun':<44}{cached_seconds:>8.3f}s")
+    print(f"requests {fetcher.stats['requests']}, retries {fetcher.stats['retries']}, "
+          f"failed {fetcher.stats['failed']}, peak Adzuna in flight {peak['adzuna']}")
+    print(f"requests after the page abandoned the stream {after_close}, after its deadline {after_deadline}")
+
+
+if __name__ == "__main__":
+    main()
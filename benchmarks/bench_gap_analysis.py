@@ -0,0 +1,135 @@
+# benchmarks/bench_gap_analysis.py
+#
+# Checks modules/gap_engine.role_gap_table against the original Gap Analysis
+# role x year loop on randomized inputs (duplicate forecast rows, roles
+# missing from the scenario table or the rate assumptions), then times the
+# vectorized table at a large role count.
+#
+# Tables must be identical (values compared exactly; only the dtype of
+# all-integer columns in degenerate cases may differ, as the loop mixes
+# ints and floats).
+#
+#   python benchmarks/bench_gap_analysis.py --roles 50000 --years 4
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import gap_engine
+
+
+def legacy_gap_table(demand_df, supply_df, attrition_rates, retirement_rates, internal_pipeline):
+    forecast_years = sorted({
+        col.split()[-1] for col in demand_df.columns if col.startswith("Forecast ")
+    })
+    roles = demand_df["Role"].unique()
+    rows = []
+    for role in roles:
+        for year in forecast_years:
+            demand_col = f"Forecast {year}"
+            gap_col = f"Gap {year}"
+
+            scenario_demand_series = demand_df[demand_df["Role"] == role][demand_col]
+            scenario_demand = scenario_demand_series.sum() if not scenario_demand_series.empty else 0
+
+            if year == forecast_years[0]:
+                projected_supply = supply_df.at[role, gap_col] + scenario_demand if (role in supply_df.index and gap_col in supply_df.columns) else 0
+            else:
+                prev_supply = rows[-1]["Projected Supply"]
+                attr = attrition_rates.get(role, 0)
+                retire = retirement_rates.get(role, 0)
+                inflow = internal_pipeline.get(role, 0)
+                projected_supply = prev_supply * (1 - attr - retire) + inflow
+
+            gap = (scenario_demand) - (projected_supply)
+            gap_pct = (gap / scenario_demand * 100) if scenario_demand else 0
+            status = "Shortfall" if gap > 0 else "Surplus" if gap < 0 else "Balanced"
+
+            rows.append({
+                "Critical Role": role,
+                "Year": year,
+                "Scenario Demand": round(scenario_demand, 1),
+                "Projected Supply": round(projected_supply, 1),
+                "Gap": round(gap, 1),
+                "Gap %": round(gap_pct, 1),
+                "Status": status
+            })
+    return pd.DataFrame(rows)
+
+
+def assert_same_table(expected, actual):
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_exact=True)
+
+
+def synthetic_inputs(n_roles, n_years, seed=0, duplicates=0.3, missing=0.05):
+    """
+    Scenario forecast rows, role gap summary and rate assumptions shaped like
+    the Scenario Planning session outputs. Values sit on 0.05 steps so exact
+    rounding halves come up often.
+    """
+    rng = np.random.default_rng(seed)
+    years = [str(2025 + i) for i in range(n_years)]
+    roles = np.array([f"Role {i}" for i in range(n_roles)], dtype=object)
+    rows = np.concatenate([roles, rng.choice(roles, int(n_roles * duplicates))])
+    demand_df = pd.DataFrame({
+        "Role": rows,
+        **{f"Forecast {y}": rng.integers(0, 4000, len(rows)) * 0.05 for y in years}
+    })
+
+    in_table = rng.random(n_roles) > missing
+    supply_df = pd.DataFrame({
+        "Role": roles[in_table],
+        **{f"Gap {y}": rng.integers(-50, 50, in_table.sum()).astype(float) for y in years}
+    }).set_index("Role")
+
+    rated = roles[rng.random(n_roles) > missing]
+    attrition = dict(zip(rated, (rng.integers(0, 20, len(rated)) * 0.005).tolist()))
+    retirement = dict(zip(rated, (rng.integers(0, 10, len(rated)) * 0.005).tolist()))
+    pipeline = dict(zip(rated, (rng.integers(0, 40, len(rated)) * 0.25).tolist()))
+    return demand_df, supply_df, attrition, retirement, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=50000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--checks", type=int, default=25, help="randomized regression cases")
+    parser.add_argument("--legacy-roles", type=int, default=1000,
+                        help="role count for the timed run of the original loop")
+    args = parser.parse_args()
+
+    for seed in range(args.checks):
+        rng = np.random.default_rng(seed)
+        inputs = synthetic_inputs(int(rng.integers(1, 60)), int(rng.integers(1, 7)), seed=seed,
+                                  duplicates=rng.random() * 12, missing=rng.random() * 0.5)
+        expected = legacy_gap_table(*inputs)
+        actual = gap_engine.role_gap_table(*inputs)
+        assert_same_table(expected, actual)
+    print(f"{args.checks} randomized cases identical to the original loop")
+
+    inputs = synthetic_inputs(args.legacy_roles, args.years)
+    start = time.perf_counter()
+    expected = legacy_gap_table(*inputs)
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = gap_engine.role_gap_table(*inputs)
+    engine_seconds = time.perf_counter() - start
+    assert_same_table(expected, actual)
+    print(f"{f'original loop ({args.legacy_roles:,} roles)':<42}{legacy_seconds:>8.3f}s")
+    print(f"{f'role_gap_table ({args.legacy_roles:,} roles)':<42}{engine_seconds:>8.3f}s")
+
+    inputs = synthetic_inputs(args.roles, args.years)
+    start = time.perf_counter()
+    table = gap_engine.role_gap_table(*inputs)
+    seconds = time.perf_counter() - start
+    print(f"{f'role_gap_table ({args.roles:,} roles)':<42}{seconds:>8.3f}s {len(table):>10,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_geo.py
+#
+# Serves a slow stub geo-IP service on localhost and compares the old blocking
+# lookup with modules/geo.GeoResolver: time spent in the caller on first and
+# repeated logins, and offline CIDR lookups against a linear scan.
+#
+#   python benchmarks/bench_geo.py --delay 1.0 --clients 200 --networks 200000
+
+import argparse
+import ipaddress
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import geo
+
+COUNTRIES = ["gh", "ng", "ch", "fr", "us", "br", "in", "za", "ke", "de"]
+
+
+def country_of(ip):
+    return COUNTRIES[int(ipaddress.ip_address(ip)) % len(COUNTRIES)] if ip else "gh"
+
+
+def start_stub(delay):
+    """
+    Answers /<ip>/json/ and /json/ like ipapi.co, after `delay` seconds.
+    """
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            parts = [p for p in self.path.split("/") if p and p != "json"]
+            ip = parts[0] if parts else ""
+            calls.append(ip)
+            body = json.dumps({"ip": ip, "country_code": country_of(ip).upper()}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def random_networks(n, seed=0):
+    """
+    `n` non-overlapping public /24s with a country each.
+    """
+    rng = np.random.default_rng(seed)
+    blocks = np.unique(rng.integers(int(ipaddress.ip_address("11.0.0.0")) >> 8,
+                                    int(ipaddress.ip_address("99.0.0.0")) >> 8, n))
+    networks = [f"{ipaddress.ip_address(int(b) << 8)}/24" for b in blocks]
+    codes = [COUNTRIES[i] for i in rng.integers(0, len(COUNTRIES), len(networks))]
+    return networks, codes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=1.0, help="stub response time in seconds")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--networks", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    server, calls = start_stub(args.delay)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    url, self_url = base + "/{ip}/json/", base + "/json/"
+    rng = np.random.default_rng(1)
+    clients = [str(ipaddress.ip_address(int(v))) for v in
+               rng.integers(int(ipaddress.ip_address("11.0.0.0")), int(ipaddress.ip_address("99.0.0.0")), args.clients)]
+
+    # Old behaviour: every login and every banner rerun waits for the service
+    start = time.perf_counter()
+    for ip in clients[:5]:
+        assert geo.fetch_country(url.format(ip=ip)) == country_of(ip)
+    blocking = (time.perf_counter() - start) / 5
+
+    resolver = geo.GeoResolver(url=url, self_url=self_url, workers=8)
+    start = time.perf_counter()
+    for ip in clients:
+        resolver.prefetch(ip)           # login form rendered
+    prefetch = (time.perf_counter() - start) / len(clients)
+
+    start = time.perf_counter()
+    first = [resolver.resolve(ip) for ip in clients]   # Login clicked straight away
+    first_call = (time.perf_counter() - start) / len(clients)
+
+    deadline = time.monotonic() + args.delay * (len(clients) / 8 + 2) + 5
+    while resolver._pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+    start = time.perf_counter()
+    repeated = [resolver.resolve(ip) for ip in clients for _ in range(10)]  # banner reruns
+    cached = (time.perf_counter() - start) / len(repeated)
+    assert repeated[::10] == [country_of(ip) for ip in clients]
+    assert sum(1 for c in calls if c) == len(clients) + 5, "each client IP should hit the service once"
+    resolver.shutdown()
+    server.shutdown()
+
+    # Offline table
+    networks, codes = random_networks(args.networks)
+    start = time.perf_counter()
+    table = geo.CidrTable(zip(networks, codes))
+    build = time.perf_counter() - start
+
+    starts = np.array([int(ipaddress.ip_address(n.split("/")[0])) for n in networks])
+    probes = np.concatenate([starts[rng.integers(0, len(starts), args.lookups // 2)]
+                             + rng.integers(0, 256, args.lookups // 2),
+                             rng.integers(int(starts.min()), int(starts.max()), args.lookups - args.lookups // 2)])
+    probe_ips = [str(ipaddress.ip_address(int(v))) for v in probes]
+    start = time.perf_counter()
+    found = [table.lookup(ip) for ip in probe_ips]
+    lookup = (time.perf_counter() - start) / len(probe_ips)
+
+    order = np.argsort(starts)
+    for ip, v, country in list(zip(probe_ips, probes, found))[:2000]:
+        i = np.searchsorted(starts[order], v, side="right") - 1
+        hit = i >= 0 and v < starts[order][i] + 256
+        assert country == (codes[order[i]] if hit else ""), ip
+
+    print(f"stub delay {args.delay:.2f}s, {len(clients)} clients, {len(table)} networks")
+    print(f"{'blocking lookup per call':<36}{blocking * 1e3:>10.2f} ms")
+    print(f"{'resolver prefetch per call':<36}{prefetch * 1e3:>10.3f} ms")
+    print(f"{'resolver first resolve per call':<36}{first_call * 1e3:>10.3f} ms  ({sum(map(bool, first))} answered)")
+    print(f"{'resolver cached resolve per call':<36}{cached * 1e6:>10.2f} us")
+    print(f"{'offline table build':<36}{build:>10.2f} s")
+    print(f"{'offline lookup per call':<36}{lookup * 1e6:>10.2f} us  ({sum(map(bool, found))}/{len(found)} hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_headcount_cube.py
+#
+# Loads a synthetic pd_headcount_v into an in-memory SQLite stand-in and
+# compares pulling the employee-level extract into pandas with the
+# server-side cube from modules/snowflake_connector. Checks the cube against
+# a pandas nunique, the pivoted headcount_table, and that filters matching
+# nothing still give a cube with its own columns (SQLite and Arrow paths).
+#
+#   python benchmarks/bench_headcount_cube.py --employees 200000
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import snowflake_connector
+
+ZONES = ["AMS", "AOA", "EUR", "GC"]
+FUNCTIONS = ["Sales", "Marketing", "Finance", "HR", "IT", "Supply Chain", "Manufacturing", "R&D Team"]
+REASONS = ["Hire", "Termination", "Transfer", "Promotion", "Retirement", "Data Change"]
+STATUSES = ["Active", "Inactive", "Leave"]
+YEARS = (2021, 2024)
+
+
+def make_view(n_employees, seed=0):
+    """
+    One row per employee per year plus a second action for ~10% of them,
+    so COUNT(DISTINCT ...) differs from COUNT(*).
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for year in range(YEARS[0], YEARS[1] + 1):
+        ids = np.arange(n_employees)
+        ids = np.concatenate([ids, rng.choice(ids, n_employees // 10, replace=False)])
+        frames.append(pd.DataFrame({
+            "EMPLOYEE_PERSONNEL_NUMBER": ids.astype(str),
+            "CALENDAR_YEAR": year,
+            "ZONE_NIM_GEO": np.array(ZONES)[ids % len(ZONES)],
+            "FUNCTION_UNIT": np.array(FUNCTIONS)[(ids // len(ZONES)) % len(FUNCTIONS)],
+            "REASON_FOR_ACTION": np.array(REASONS)[rng.integers(0, len(REASONS), len(ids))],
+            "EMPLOYMENT_STATUS": np.array(STATUSES)[rng.integers(0, len(STATUSES), len(ids))]
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class EmptyArrowCursor:
+    """
+    Snowflake-like cursor whose query matched nothing: a description but no batches.
+    """
+
+    def __init__(self, sqlite_cursor):
+        self._cur = sqlite_cursor
+
+    def execute(self, sql, params):
+        self._cur.execute(sql, params)
+        self.description = self._cur.description
+
+    def fetch_arrow_batches(self):
+        return iter([])
+
+    def close(self):
+        self._cur.close()
+
+
+class EmptyArrowConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return EmptyArrowCursor(self._conn.cursor())
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=200_000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    view = make_view(args.employees)
+    conn = sqlite3.connect(":memory:")
+    view.to_sql("pd_headcount_v", conn, index=False)
+    conn.execute("CREATE INDEX by_year ON pd_headcount_v (CALENDAR_YEAR)")
+
+    def cube(**kwargs):
+        return snowflake_connector.fetch_headcount_cube(
+            conn, table="pd_headcount_v", paramstyle="qmark", years=YEARS, **kwargs)
+
+    # Old behaviour: the employee-level extract, aggregated in pandas
+    def extract_then_pivot():
+        df = pd.read_sql("SELECT * FROM pd_headcount_v WHERE CALENDAR_YEAR BETWEEN ? AND ?", conn, params=YEARS)
+        return df.groupby(["FUNCTION_UNIT", "CALENDAR_YEAR"])["EMPLOYEE_PERSONNEL_NUMBER"].nunique()
+    expected, extract_seconds = timed(extract_then_pivot)
+
+    result, cube_seconds = timed(cube, dimensions=("function", "year"))
+    got = result.set_index(["FUNCTION_UNIT", "CALENDAR_YEAR"])["HEADCOUNT"]
+    pd.testing.assert_series_equal(got, expected, check_names=False, check_dtype=False)
+    table = snowflake_connector.cube_to_headcount_table(result)
+    assert list(table.columns) == ["Function Unit"] + [str(y) for y in range(YEARS[0], YEARS[1] + 1)]
+
+    # Filters and the full default cube
+    sales = cube(dimensions=("zone", "year"), filters={"function": "Sales", "zone": ["AOA", "EUR"]})
+    subset = view[(view["FUNCTION_UNIT"] == "Sales") & view["ZONE_NIM_GEO"].isin(["AOA", "EUR"])]
+    assert sales["HEADCOUNT"].sum() == subset.groupby(["ZONE_NIM_GEO", "CALENDAR_YEAR"])[
+        "EMPLOYEE_PERSONNEL_NUMBER"].nunique().sum()
+    full, full_seconds = timed(cube)
+
+    # Filters matching nothing: empty cube with the cube's columns, on both paths
+    for empty in (cube(dimensions=("function", "year"), filters={"zone": "NOWHERE"}),
+                  snowflake_connector.fetch_headcount_cube(
+                      EmptyArrowConnection(conn), dimensions=("function", "year"), filters={"zone": "NOWHERE"},
+                      table="pd_headcount_v", paramstyle="qmark", years=YEARS)):
+        assert list(empty.columns) == ["FUNCTION_UNIT", "CALENDAR_YEAR", "HEADCOUNT"], list(empty.columns)
+        empty_table = snowflake_connector.cube_to_headcount_table(empty)
+        assert empty_table.empty and list(empty_table.columns) == ["Function Unit"]
+
+    print(f"{len(view):,} view rows, {args.employees:,} employees x {YEARS[1] - YEARS[0] + 1} years")
+    print(f"{'extract + pandas nunique':<36}{extract_seconds:>8.3f}s")
+    print(f"{'cube (function, year)':<36}{cube_seconds:>8.3f}s {len(result):>8} rows")
+    print(f"{'cube (default dimensions)':<36}{full_seconds:>8.3f}s {len(full):>8} rows")
+
+
+if __name__ == "__main__":
+    main()
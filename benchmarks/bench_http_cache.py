@@ -0,0 +1,184 @@
+# benchmarks/bench_http_cache.py
+#
+# Serves stub World Bank indicator responses (with ETag / Last-Modified) on
+# localhost and measures modules/http_cache behind modules/fetch_engine:
+# upstream requests on a cold start, after a restart and from several worker
+# processes sharing the cache file, 304 revalidation after the TTL, LRU size
+# eviction, cached "no data" (404) answers, and stale answers while the
+# source is down.
+#
+#   python benchmarks/bench_http_cache.py --urls 200 --workers 4
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import fetch_engine, http_cache
+
+LAST_MODIFIED = "Tue, 01 Jul 2025 00:00:00 GMT"
+
+
+def body_of(path):
+    years = [{"date": str(y), "value": (hash(path) % 1000) * 1e3 + y} for y in range(1960, 2024)]
+    return json.dumps([{"page": 1, "source": path}, years]).encode("utf-8")
+
+
+def start_stub(delay):
+    """
+    Counts full answers (200), revalidations (304) and "no data" answers
+    (404, for paths under /missing/).
+    """
+    counts = {"200": 0, "304": 0, "404": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            if self.path.startswith("/missing/"):
+                with lock:
+                    counts["404"] += 1
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = body_of(self.path)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with lock:
+                    counts["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            with lock:
+                counts["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+
+def indicator_urls(base, n):
+    return [f"{base}/country/C{i % 50:02d}/indicator/IND{i // 50}?format=json&per_page=100" for i in range(n)]
+
+
+def fetch_all(urls, cache_path, ttl=3600, max_bytes=http_cache.HTTP_CACHE_MAX_BYTES, missing=None):
+    """
+    One app process: a fresh Fetcher fetching every URL. Returns the bodies
+    and the fetcher's stats.
+    """
+    cache = http_cache.ResponseCache(cache_path, max_bytes=max_bytes) if cache_path else None
+    fetcher = fetch_engine.Fetcher(cache=cache, default_ttl=ttl, timeout=(1, 2), retries=1, backoff=0.05,
+                                   missing=missing)
+    results = {url: result for url, result, _ in fetcher.stream(fetcher.get_json, urls)}
+    fetcher.shutdown()
+    return [results[url] for url in urls], fetcher.stats
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="app processes sharing the cache")
+    parser.add_argument("--delay", type=float, default=0.1, help="stub response time in seconds")
+    args = parser.parse_args()
+
+    server, counts = start_stub(args.delay)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = indicator_urls(base, args.urls)
+    expected = [json.loads(body_of(u[len(base):])) for u in urls]
+    rows = []
+
+    def measure(label, fn, *fn_args, **fn_kwargs):
+        before = dict(counts)
+        result, seconds = timed(fn, *fn_args, **fn_kwargs)
+        rows.append((label, seconds, counts["200"] - before["200"], counts["304"] - before["304"]))
+        return result
+
+    with tempfile.TemporaryDirectory() as root:
+        cache_path = os.path.join(root, "http_cache.sqlite")
+
+        # Old behaviour: per-process in-memory cache, empty after every restart
+        with ProcessPoolExecutor(args.workers) as pool:
+            measure(f"no shared cache, {args.workers} workers start", lambda: list(
+                pool.map(fetch_all, [urls] * args.workers, [None] * args.workers)))
+
+        results, _ = measure("shared cache, cold start", fetch_all, urls, cache_path)
+        assert results == expected
+        results, stats = measure("shared cache, after restart", fetch_all, urls, cache_path)
+        assert results == expected and stats["cache_hits"] == len(urls)
+        with ProcessPoolExecutor(args.workers) as pool:
+            outputs = measure(f"shared cache, {args.workers} workers start", lambda: list(
+                pool.map(fetch_all, [urls] * args.workers, [cache_path] * args.workers)))
+        assert all(r == expected for r, _ in outputs)
+
+        # Past the TTL: conditional requests, answered 304 without a body
+        expired_path = os.path.join(root, "expired.sqlite")
+        fetch_all(urls, expired_path, ttl=0)
+        results, stats = measure("expired, revalidated (304)", fetch_all, urls, expired_path, ttl=0)
+        assert results == expected and stats["revalidated"] == len(urls)
+
+        # Size bound: the most recently used entries survive
+        entry_bytes = len(body_of(urls[0][len(base):]))
+        budget = entry_bytes * (args.urls // 4)
+        small = http_cache.ResponseCache(os.path.join(root, "small.sqlite"), max_bytes=budget)
+        measure("size-bounded cache fill", fetch_all, urls, small.path, max_bytes=budget)
+        n_entries, n_bytes = small.size()
+        assert n_bytes <= budget, (n_bytes, budget)
+        _, stats = fetch_all(urls[-n_entries:], small.path, max_bytes=budget)
+        assert stats["cache_hits"] >= n_entries - 1, stats
+
+        # "No data" answers are cached too, so a rerun doesn't ask again
+        missing_urls = [f"{base}/missing/{i}" for i in range(args.urls // 4)]
+        no_data = {urlsplit(base).netloc: ({404}, 3600)}
+        before = counts["404"]
+        for _ in range(2):
+            results, stats = fetch_all(missing_urls, cache_path, missing=no_data)
+            assert results == [None] * len(missing_urls)
+        assert counts["404"] - before == len(missing_urls) and stats["cache_hits"] == len(missing_urls)
+
+        # Source down: stale copies answer instead of errors
+        server.shutdown()
+        server.server_close()
+        results, stats = measure("source down, stale answers", fetch_all, urls, expired_path, ttl=0)
+        assert results == expected and stats["stale"] == len(urls)
+
+    print(f"{args.urls} World Bank URLs, stub delay {args.delay:.2f}s, {args.workers} worker processes")
+    print(f"{'':<36}{'seconds':>9}{'200s':>7}{'304s':>7}")
+    for label, seconds, full, revalidated in rows:
+        print(f"{label:<36}{seconds:>9.3f}{full:>7}{revalidated:>7}")
+    print(f"size bound {budget / 1024:.0f} KiB: kept {n_entries} of {args.urls} entries ({n_bytes / 1024:.0f} KiB)")
+    print(f"404 answers cached: {len(missing_urls)} URLs fetched twice, {len(missing_urls)} upstream requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_kpi_extraction.py
+#
+# Generates a multi-hundred-page annual report with PyMuPDF - prose, ruled KPI
+# tables, year-header series and KPI sentences using report wording of the
+# predefined driver names - then times modules/kpi_engine in-process and with a
+# process pool and scores the pre-filled driver table against the known values.
+#
+#   python benchmarks/bench_kpi_extraction.py --pages 300 --workers 8
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import fitz
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import kpi_engine
+from modules.driver_definition import PREDEFINED_DRIVERS
+
+# Driver -> wording used in the report
+REPORT_LABELS = {
+    "e-Intensity (%)": "e-Intensity",
+    "e-NNS": "E-NNS",
+    "E-Commerce growth": "E-commerce growth",
+    "Marketing spend in Digital media (%)": "Digital media marketing spend",
+    "Finished Good Inventory (# of days)": "Finished goods inventory days",
+    "Organic Growth(%)": "Organic growth",
+    "Customer Order Fulfillment(%)": "Customer order fulfilment",
+    "On-Time In Full(%)": "On Time In Full",
+    "Raw & Pack Inventory (# of days)": "Raw and pack inventory",
+    "No of M&As": "Number of M&As"
+}
+DISTRACTORS = ["Net sales", "Trading operating profit", "Number of factories", "Underlying earnings per share"]
+WORDS = ("growth nutrition coffee portfolio consumers factories people capital investment "
+         "sustainability innovation categories pricing brands markets").split()
+YEARS = [2021, 2022, 2023, 2024]
+
+
+def draw_table(page, rows, x0=50, y0=420, width=110, height=16):
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            w = width * 2 if c == 0 else width / 1.6
+            x = x0 if c == 0 else x0 + width * 2 + (c - 1) * width / 1.6
+            rect = fitz.Rect(x, y0 + r * height, x + w, y0 + (r + 1) * height)
+            page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+            page.insert_text((rect.x0 + 3, rect.y1 - 4), cell, fontsize=8)
+
+
+def write_report(path, n_pages, seed=0):
+    """
+    Returns {(driver, year): value} for every KPI printed in the report.
+    """
+    rng = np.random.default_rng(seed)
+    truth = {(d, y): round(float(rng.uniform(1, 500)), 1) for d in REPORT_LABELS for y in YEARS}
+    noise = {(d, y): round(float(rng.uniform(1, 500)), 1) for d in DISTRACTORS for y in YEARS}
+    values = {**truth, **noise}
+    labels = {**REPORT_LABELS, **{d: d for d in DISTRACTORS}}
+    names = list(labels)
+
+    doc = fitz.open()
+    for p in range(n_pages):
+        page = doc.new_page()
+        page.set_cropbox(page.rect)
+        lines = [f"Annual Review - page {p + 1}"] + [" ".join(rng.choice(WORDS, 12)) for _ in range(24)]
+        picked = [names[i] for i in rng.choice(len(names), 4, replace=False)]
+        if p % 7 == 3:
+            lines.append(" ".join(str(y) for y in YEARS))
+            lines += [f"{labels[d]} " + " ".join(f"{values[d, y]:,}" for y in YEARS) for d in picked]
+        if p % 11 == 5:
+            lines += [f"{labels[d]} {y}: {values[d, y]:,}%" for d in picked[:2] for y in YEARS[-2:]]
+        page.insert_text((40, 40), "\n".join(lines), fontsize=8)
+        if p % 10 == 0:
+            draw_table(page, [["KPI"] + [str(y) for y in YEARS]] +
+                       [[labels[d]] + [f"{values[d, y]:,}" for y in YEARS] for d in picked])
+    doc.save(path)
+    doc.close()
+    return truth
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        pdf_path = os.path.join(root, "annual_report.pdf")
+        truth = write_report(pdf_path, args.pages)
+        cache_dir = os.path.join(root, "cache")
+
+        serial, serial_seconds = timed(kpi_engine.extract_kpis, pdf_path, 1)
+        pooled, pooled_seconds = timed(kpi_engine.extract_kpis, pdf_path, args.workers)
+        assert serial.equals(pooled)
+        kpi_engine.kpi_records(pdf_path, workers=args.workers, cache_dir=cache_dir)
+        cached, cached_seconds = timed(kpi_engine.kpi_records, pdf_path, workers=args.workers, cache_dir=cache_dir)
+        assert cached.equals(pooled)
+
+        (history, matches), match_seconds = timed(kpi_engine.driver_history, pooled, PREDEFINED_DRIVERS, YEARS)
+
+    found = {(row["Business Driver"], int(year)): row[str(year)]
+             for _, row in history.iterrows() for year in YEARS if row[str(year)] == row[str(year)]}
+    correct = sum(1 for key, value in found.items() if truth.get(key) == value)
+    wrong = len(found) - correct
+
+    print(f"{args.pages} pages, {len(pooled):,} KPI records, {pooled['Label'].nunique()} distinct labels")
+    print(f"{'extract in-process':<36}{serial_seconds:>8.3f}s {serial_seconds / args.pages * 1e3:>8.1f} ms/page")
+    print(f"{f'extract process pool ({args.workers})':<36}{pooled_seconds:>8.3f}s "
+          f"{pooled_seconds / args.pages * 1e3:>8.1f} ms/page")
+    print(f"{'cached re-upload':<36}{cached_seconds:>8.3f}s")
+    print(f"{'match + build driver table':<36}{match_seconds:>8.3f}s")
+    print(f"cells filled {correct}/{len(truth)} correct, {wrong} wrong")
+    assert wrong == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_monte_carlo.py
+#
+# Throughput of the Monte Carlo scenario simulator in modules/scenario_engine
+# (paths per second) and its peak memory on synthetic roles, for a few chunk
+# sizes, with and without per-role percentile bands.
+#
+#   python benchmarks/bench_monte_carlo.py --roles 200 --years 5 --paths 20000
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import scenario_engine
+
+
+def synthetic_roles(n_roles, n_years, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(10, 500, (n_roles, n_years)).astype(float)
+    attrition = rng.integers(0, 100, n_roles) / 1000
+    retirement = rng.integers(0, 60, n_roles) / 1000
+    pipeline = rng.integers(0, 20, n_roles).astype(float)
+    return base, attrition, retirement, pipeline
+
+
+def page_inputs(base, attrition, retirement, pipeline):
+    """
+    The same roles as the Scenario Planning page passes them to simulate_scenario.
+    """
+    roles = [f"Role {i}" for i in range(len(base))]
+    df_forecast = pd.DataFrame(base, columns=[f"Forecast {2025 + i}" for i in range(base.shape[1])])
+    df_forecast.insert(0, "Role", roles)
+    rate_df = pd.DataFrame({"Attrition Rate": attrition, "Retirement Rate": retirement,
+                            "Pipeline": pipeline}, index=roles)
+    return df_forecast, rate_df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--paths", type=int, default=20000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1_000_000, 5_000_000, 20_000_000],
+                        help="max_cells values to try")
+    args = parser.parse_args()
+
+    inputs = synthetic_roles(args.roles, args.years)
+    print(f"{args.roles:,} roles x {args.years} years, {args.paths:,} paths")
+    for max_cells in args.chunks:
+        for role_bands in (False, True):
+            tracemalloc.start()
+            start = time.perf_counter()
+            totals, by_role = scenario_engine.simulate_paths(
+                *inputs, growth_mean=0.03, n_paths=args.paths,
+                max_cells=max_cells, role_bands=role_bands
+            )
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert (by_role is not None) == role_bands
+            label = f"max_cells={max_cells:,}" + (" + role bands" if role_bands else "")
+            print(f"{label:<36}{seconds:>8.3f}s {args.paths / seconds:>12,.0f} paths/s {peak / 1024 ** 2:>8.0f} MB peak")
+
+    # Page entry point: per-role bands only when asked for, totals the same either way
+    df_forecast, rate_df = page_inputs(*inputs)
+    totals, by_role = scenario_engine.simulate_scenario(df_forecast, rate_df, n_paths=2000)
+    assert by_role is None and len(totals) == 3 * args.years
+    banded_totals, by_role = scenario_engine.simulate_scenario(df_forecast, rate_df, n_paths=2000, role_bands=True)
+    assert len(by_role) == 3 * args.years * args.roles and set(by_role["Role"]) == set(df_forecast["Role"])
+    pd.testing.assert_frame_equal(totals, banded_totals)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_pdf_ingestion.py
+#
+# Builds a synthetic annual report with PyMuPDF and compares the old
+# read-everything / join-every-page extraction with modules/pdf_engine:
+# inline, process pool, time to the first page, and a cached re-upload.
+#
+#   python benchmarks/bench_pdf_ingestion.py --pages 400 --workers 8
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import fitz
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import pdf_engine
+
+WORDS = ("growth sales volume market brands nutrition coffee portfolio consumers supply chain "
+         "factories people capital investment sustainability innovation categories pricing").split()
+KPIS = ["Sales Volume", "Organic Growth", "Revenue", "Operating Profit", "Headcount",
+        "Number of Factories", "Capital Expenditure", "Marketing Spend"]
+
+
+def write_synthetic_report(path, n_pages, seed=0):
+    """
+    Prose pages with a KPI table every few pages, e.g.
+    "Sales Volume 2024: 93,351 million" / "Organic Growth 2024: 2.2%".
+    """
+    rng = np.random.default_rng(seed)
+    doc = fitz.open()
+    for p in range(n_pages):
+        page = doc.new_page()
+        lines = [f"Annual Review - page {p + 1}"]
+        for _ in range(40):
+            lines.append(" ".join(rng.choice(WORDS, 11)))
+        if p % 5 == 0:
+            year = 2020 + p % 5
+            for kpi in KPIS:
+                if kpi in ("Organic Growth",):
+                    lines.append(f"{kpi} {year}: {rng.uniform(-2, 9):.1f}%")
+                else:
+                    lines.append(f"{kpi} {year}: {rng.integers(1_000, 200_000):,} million")
+        page.insert_text((40, 40), "\n".join(lines), fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_extract(path):
+    with open(path, "rb") as f:
+        data = io.BytesIO(f.read())
+    doc = fitz.open(stream=data.read(), filetype="pdf")
+    return "\n".join([page.get_text() for page in doc])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def first_page_seconds(path, digest, workers, cache_dir):
+    start = time.perf_counter()
+    pages = pdf_engine.iter_pdf_pages(path, digest, workers, cache_dir)
+    next(pages)
+    seconds = time.perf_counter() - start
+    pages.close()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        pdf_path = os.path.join(root, "annual_report.pdf")
+        write_synthetic_report(pdf_path, args.pages)
+        size_mb = os.path.getsize(pdf_path) / 1024 ** 2
+        cache_dir = os.path.join(root, "cache")
+
+        expected, legacy = timed(legacy_extract, pdf_path)
+
+        with open(pdf_path, "rb") as f:
+            (spooled, digest), spool = timed(pdf_engine.spool_upload, f, root)
+        os.remove(spooled)
+
+        text, inline = timed(pdf_engine.pdf_text, pdf_path, digest, 1, os.path.join(root, "inline"))
+        assert text == expected
+        first_inline = first_page_seconds(pdf_path, digest, 1, os.path.join(root, "first"))
+
+        text, pooled = timed(pdf_engine.pdf_text, pdf_path, digest, args.workers, cache_dir)
+        assert text == expected
+        first_pooled = first_page_seconds(pdf_path, digest, args.workers, os.path.join(root, "first"))
+
+        text, cached = timed(pdf_engine.pdf_text, pdf_path, digest, args.workers, cache_dir)
+        assert text == expected
+        assert not [f for f in os.listdir(cache_dir) if f.endswith(".tmp")]
+
+    print(f"{args.pages} pages, {size_mb:.1f} MB")
+    print(f"{'legacy read + join':<36}{legacy:>8.3f}s")
+    print(f"{'spool + sha256':<36}{spool:>8.3f}s")
+    print(f"{'engine inline':<36}{inline:>8.3f}s  first page {first_inline:.3f}s")
+    print(f"{f'engine process pool ({args.workers})':<36}{pooled:>8.3f}s  first page {first_pooled:.3f}s")
+    print(f"{'engine cached re-upload':<36}{cached:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
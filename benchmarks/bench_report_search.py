@@ -0,0 +1,111 @@
+# benchmarks/bench_report_search.py
+#
+# Indexes a synthetic library of annual reports (one per year) with
+# modules/nlp_engine on a blank spaCy pipeline, then compares index search
+# latency with scanning every page's text, checking both find the same pages.
+#
+#   python benchmarks/bench_report_search.py --reports 30 --pages 150 --processes 4
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import nlp_engine
+
+WORDS = ("growth nutrition coffee portfolio consumers factories people capital investment sustainability "
+         "innovation categories pricing brands markets channels retail digital water pet care confectionery "
+         "dairy infant formula emerging developed volume margin cost inflation supply").split()
+PHRASES = ["E-commerce growth reached {p}% of sales", "Organic growth was {p}%",
+           "Net sales of CHF {m} billion", "Marketing spend in digital media rose to {p} per cent",
+           "Capital expenditure of USD {m} million"]
+QUERIES = ["e-commerce growth", "organic growth", "digital media", "capital expenditure", "infant formula",
+           "coffee pricing", "pet care margin", "water"]
+
+
+def synthetic_pages(n_pages, rng):
+    pages = []
+    for _ in range(n_pages):
+        sentences = [" ".join(rng.choice(WORDS, rng.integers(8, 16))).capitalize() + "." for _ in range(20)]
+        for _ in range(rng.integers(0, 3)):
+            phrase = PHRASES[rng.integers(len(PHRASES))]
+            sentences.insert(rng.integers(len(sentences)), phrase.format(p=round(rng.uniform(1, 20), 1),
+                                                                          m=round(rng.uniform(1, 100), 1)) + ".")
+        pages.append(" ".join(sentences))
+    return pages
+
+
+def scan(library, query, nlp):
+    """
+    Every page containing all query words, by regex over the raw text.
+    """
+    words = [w for w in re.findall(r"[a-z0-9]+", query.lower()) if w not in nlp.Defaults.stop_words]
+    patterns = [re.compile(rf"\b{re.escape(w)}\b") for w in words]
+    return {(name, page + 1) for name, pages in library.items() for page, text in enumerate(pages)
+            if all(p.search(text.lower()) for p in patterns)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=150)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    library = {f"Annual Review {1995 + i}": synthetic_pages(args.pages, rng) for i in range(args.reports)}
+    nlp = nlp_engine.load_nlp("not_installed_model")   # blank English pipeline
+
+    with tempfile.TemporaryDirectory() as root:
+        index_path = os.path.join(root, "index.sqlite")
+        start = time.perf_counter()
+        for name, pages in library.items():
+            digest = hashlib.sha256("\n".join(pages).encode("utf-8")).hexdigest()
+            nlp_engine.index_report(pages, digest, name, int(name[-4:]), index_path, nlp, n_process=1)
+        index_seconds = time.perf_counter() - start
+
+        # One long report in-process and in the spawn-context pool (first call includes pool start-up)
+        long_report = [p for pages in list(library.values())[:4] for p in pages]
+        timings, analysed = {}, {}
+        for n_process in sorted({1, args.processes}):
+            start = time.perf_counter()
+            analysed[n_process] = list(nlp_engine.analyse_pages(long_report, nlp, n_process=n_process))
+            timings[n_process] = time.perf_counter() - start
+        assert analysed[args.processes] == analysed[1]
+
+        rows = []
+        for query in QUERIES:
+            found = nlp_engine.search(query, index_path, limit=10 ** 6, nlp=nlp)
+            expected = scan(library, query, nlp)
+            assert set(zip(found["Report"], found["Page"])) == expected, query
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                nlp_engine.search(query, index_path, limit=20, nlp=nlp)
+            indexed = (time.perf_counter() - start) / args.repeat
+            start = time.perf_counter()
+            scan(library, query, nlp)
+            scanned = time.perf_counter() - start
+            rows.append((query, len(expected), indexed, scanned))
+        size_mb = os.path.getsize(index_path) / 1024 ** 2
+
+    total_pages = args.reports * args.pages
+    print(f"{args.reports} reports x {args.pages} pages, index {size_mb:.1f} MB")
+    print(f"{'index all reports':<36}{index_seconds:>8.2f}s {total_pages / index_seconds:>8.0f} pages/s")
+    for n_process, seconds in timings.items():
+        print(f"{f'analyse n_process={n_process} ({len(long_report)} pages)':<36}{seconds:>8.2f}s "
+              f"{len(long_report) / seconds:>8.0f} pages/s")
+    print(f"{'query':<24}{'pages':>7}{'index ms':>10}{'scan ms':>10}")
+    for query, n, indexed, scanned in rows:
+        print(f"{query:<24}{n:>7}{indexed * 1e3:>10.2f}{scanned * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_scenario_projection.py
+#
+# Times modules/scenario_engine supply projection on synthetic roles: the
+# closed form against the rounded year-by-year recurrence used by the
+# Scenario Planning page, a growth x attrition sweep, and the original
+# per-role .loc loop on a smaller role count (checked to give the same tables).
+#
+#   python benchmarks/bench_scenario_projection.py --roles 10000 --years 20
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import scenario_engine
+
+
+def synthetic_scenario(n_roles, n_years, seed=0):
+    rng = np.random.default_rng(seed)
+    years = [str(2025 + i) for i in range(n_years)]
+    roles = [f"Role {i}" for i in range(n_roles)]
+    df_forecast = pd.DataFrame({
+        "Role": roles,
+        **{f"Forecast {y}": rng.integers(10, 500, n_roles).astype(float) for y in years}
+    })
+    rate_df = pd.DataFrame({
+        "Role": roles,
+        "Attrition Rate": rng.integers(0, 100, n_roles) / 1000,
+        "Retirement Rate": rng.integers(0, 60, n_roles) / 1000,
+        "Pipeline": rng.integers(0, 20, n_roles).astype(float)
+    }).set_index("Role")
+    return df_forecast, rate_df
+
+
+def timed(fn, *args, repeat=3, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def legacy_projection(df_forecast, rate_df, growth_rate):
+    forecast_years = scenario_engine.forecast_years_of(df_forecast)
+    roles = df_forecast["Role"].unique().tolist()
+    base_cols = [f"Forecast {y}" for y in forecast_years]
+    base_by_role = df_forecast[["Role"] + base_cols].set_index("Role")
+    scenario_demand_by_role = base_by_role.copy()
+    for i, year in enumerate(forecast_years):
+        col = f"Forecast {year}"
+        scenario_demand_by_role[col] = base_by_role[col] * ((1 + growth_rate) ** i)
+
+    supply_by_role = base_by_role.copy()
+    for i, year in enumerate(forecast_years[1:], start=1):
+        col, prev_col = f"Forecast {year}", f"Forecast {forecast_years[i - 1]}"
+        for role in roles:
+            if role not in supply_by_role.index or role not in rate_df.index:
+                continue
+            prev_val = supply_by_role.loc[role, prev_col]
+            attr = rate_df.loc[role]["Attrition Rate"]
+            retire = rate_df.loc[role]["Retirement Rate"]
+            inflow = rate_df.loc[role]["Pipeline"]
+            supply_by_role.loc[role, col] = round(prev_val * (1 - attr - retire) + inflow, 1)
+
+    role_gap = scenario_demand_by_role.copy()
+    for year in forecast_years:
+        role_gap[f"Gap {year}"] = (
+            scenario_demand_by_role[f"Forecast {year}"].astype(float).round(0) -
+            supply_by_role[f"Forecast {year}"].astype(float).round(0)
+        )
+    role_gap["Role"] = role_gap.index
+    role_gap.reset_index(drop=True, inplace=True)
+    return scenario_demand_by_role, supply_by_role, role_gap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--growth", type=float, default=0.05)
+    parser.add_argument("--grid", type=int, nargs=2, default=[61, 31], metavar=("GROWTH", "MULTIPLIERS"),
+                        help="sweep grid size")
+    parser.add_argument("--legacy-roles", type=int, default=500,
+                        help="role count to run the original .loc loop on")
+    args = parser.parse_args()
+
+    df_forecast, rate_df = synthetic_scenario(args.roles, args.years)
+    initial = df_forecast.iloc[:, 1].to_numpy()
+    rates = (rate_df["Attrition Rate"].to_numpy(), rate_df["Retirement Rate"].to_numpy(), rate_df["Pipeline"].to_numpy())
+
+    print(f"{args.roles:,} roles x {args.years} years")
+    closed, seconds = timed(scenario_engine.project_supply, initial, *rates, args.years)
+    print(f"{'supply, closed form':<42}{seconds:>8.4f}s")
+    stepped, seconds = timed(scenario_engine.project_supply, initial, *rates, args.years, decimals=1)
+    print(f"{'supply, rounded recurrence':<42}{seconds:>8.4f}s")
+    print(f"{'max |closed - rounded|':<42}{np.abs(closed - stepped).max():>8.3f} FTE")
+    _, seconds = timed(scenario_engine.project_scenario, df_forecast, rate_df, args.growth)
+    print(f"{'project_scenario (page tables)':<42}{seconds:>8.4f}s")
+
+    growth_grid = np.linspace(-0.1, 0.2, args.grid[0])
+    multiplier_grid = np.linspace(0.5, 2.0, args.grid[1])
+    _, seconds = timed(scenario_engine.sweep_scenarios, df_forecast, rate_df, growth_grid, multiplier_grid)
+    print(f"{f'sweep ({args.grid[0]} x {args.grid[1]} grid)':<42}{seconds:>8.4f}s")
+
+    small_forecast, small_rates = synthetic_scenario(args.legacy_roles, args.years)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        legacy, seconds = timed(legacy_projection, small_forecast, small_rates, args.growth, repeat=1)
+    engine, engine_seconds = timed(scenario_engine.project_scenario, small_forecast, small_rates, args.growth)
+    for expected, actual in zip(legacy, engine):
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+    print(f"{f'original loop ({args.legacy_roles:,} roles)':<42}{seconds:>8.4f}s")
+    print(f"{f'project_scenario ({args.legacy_roles:,} roles)':<42}{engine_seconds:>8.4f}s")
+
+
+if __name__ == "__main__":
+    main()
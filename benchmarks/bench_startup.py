@@ -0,0 +1,84 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start cost of the app's imports, measured in fresh interpreters with
+# `python -X importtime`:
+#   - eager: every page module imported up front (the old final.py)
+#   - lazy: the core modules plus the landing page through page_registry
+#   - each page loaded on top of the core modules (the cost of first selection)
+# and a per-package breakdown of the heaviest imports (self time summed by
+# top-level package, so pandas' own modules count as pandas wherever they
+# were pulled in from).
+#
+#   python benchmarks/bench_startup.py --repeat 5 --top 15
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from modules import page_registry
+
+CORE = "from modules import auth, logger, page_registry"
+EAGER = "import requests; from modules import auth, logger, ui; " + "; ".join(
+    f"import {target.split(':')[0]}" for target in page_registry.PAGES.values()
+)
+LAZY = CORE + "; page_registry.load_page('Landing Page')"
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def importtime(statement):
+    """
+    Runs `statement` in a fresh interpreter and returns
+    (total seconds, {top-level package: cumulative seconds}).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            packages[match.group(3).split(".")[0]] += int(match.group(1)) / 1e6
+    return sum(packages.values()), dict(packages)
+
+
+def best_of(statement, repeat):
+    runs = [importtime(statement) for _ in range(repeat)]
+    return min(runs, key=lambda run: run[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=12, help="packages to list in the breakdown")
+    args = parser.parse_args()
+
+    eager_total, eager_packages = best_of(EAGER, args.repeat)
+    lazy_total, lazy_packages = best_of(LAZY, args.repeat)
+    print(f"{'eager (all pages)':<40}{eager_total:>8.3f}s")
+    print(f"{'lazy (core + landing page)':<40}{lazy_total:>8.3f}s")
+
+    core_total, _ = best_of(CORE, args.repeat)
+    print(f"\nfirst selection of each page, on top of the core modules ({core_total:.3f}s)")
+    for title in page_registry.PAGES:
+        total, _ = best_of(f"{CORE}; page_registry.load_page({title!r})", args.repeat)
+        print(f"  {title:<38}{total - core_total:>8.3f}s")
+
+    print("\nheaviest packages, eager start (self time; lazy start alongside)")
+    ranked = sorted(eager_packages.items(), key=lambda item: -item[1])[:args.top]
+    for package, seconds in ranked:
+        print(f"  {package:<38}{seconds:>8.3f}s {lazy_packages.get(package, 0.0):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
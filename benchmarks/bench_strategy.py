@@ -0,0 +1,111 @@
+# benchmarks/bench_strategy.py
+#
+# Times the 4Bs rule tables in modules/strategy_engine on a synthetic
+# year-expanded gap table, after checking them against the original
+# row-wise assign_strategy / classify_quadrant / override lambdas on a sample
+# that includes boundary and missing values.
+#
+#   python benchmarks/bench_strategy.py --rows 1000000 --roles 5000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import strategy_engine
+
+
+def assign_strategy(gap_pct, strategic_score):
+    if strategic_score >= 4:
+        return "Buy" if gap_pct >= 50 else "Build"
+    elif 2 <= strategic_score < 4:
+        return "Borrow" if gap_pct >= 50 else "Boost"
+    else:
+        return "Boost"
+
+
+def classify_quadrant(row):
+    if row["Gap %"] < 50 and row["Strategic Impact"] < 4:
+        return "Boost"
+    elif row["Gap %"] < 50 and row["Strategic Impact"] >= 4:
+        return "Build"
+    elif row["Gap %"] >= 50 and row["Strategic Impact"] >= 4:
+        return "Buy"
+    elif row["Gap %"] >= 50 and row["Strategic Impact"] < 4:
+        return "Borrow"
+    return "Other"
+
+
+def synthetic_gap_table(n_rows, n_roles, seed=0, edge_values=False):
+    rng = np.random.default_rng(seed)
+    if edge_values:
+        gap_pct = rng.choice([-20.0, 0.0, 49.9, 50.0, 50.1, 120.0, np.nan], n_rows)
+        score = rng.choice([1.0, 1.5, 2.0, 3.0, 3.99, 4.0, 5.0, np.nan], n_rows)
+    else:
+        gap_pct = np.round(rng.uniform(-100, 200, n_rows), 1)
+        score = rng.integers(1, 6, n_rows).astype(float)
+    return pd.DataFrame({
+        "Critical Role": rng.choice([f"Role {i}" for i in range(n_roles)], n_rows),
+        "Year": rng.choice([str(2025 + i) for i in range(4)], n_rows),
+        "Gap": np.round(gap_pct / 10, 1),
+        "Gap %": gap_pct,
+        "Strategic Impact": score
+    })
+
+
+def check_against_original(n_rows=20000, n_roles=30):
+    df = synthetic_gap_table(n_rows, n_roles, edge_values=True)
+    auto = df.apply(lambda row: assign_strategy(row["Gap %"], row["Strategic Impact"]), axis=1)
+    assert (auto.to_numpy() == strategy_engine.assign_strategies(df["Gap %"], df["Strategic Impact"])).all()
+    quadrant = df.apply(classify_quadrant, axis=1)
+    assert (quadrant.to_numpy() == strategy_engine.classify_quadrants(df["Gap %"], df["Strategic Impact"])).all()
+
+    df["Auto Strategy"] = auto
+    overrides = {f"Role {i}": "Buy" if i % 3 == 0 else strategy_engine.USE_AUTO for i in range(n_roles)}
+    final = df.apply(
+        lambda row: overrides.get(row["Critical Role"])
+        if overrides.get(row["Critical Role"]) != strategy_engine.USE_AUTO
+        else row["Auto Strategy"],
+        axis=1
+    )
+    assert (final.to_numpy() == strategy_engine.apply_overrides(df, overrides).to_numpy()).all()
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    print(f"{label:<36}{seconds:>8.3f}s")
+    return result, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--roles", type=int, default=5000)
+    args = parser.parse_args()
+
+    check_against_original()
+    print("rule tables match the original row-wise functions")
+
+    df = synthetic_gap_table(args.rows, args.roles)
+    overrides = {f"Role {i}": "Buy" for i in range(0, args.roles, 7)}
+    print(f"{args.rows:,} gap rows, {args.roles:,} roles")
+    total = 0.0
+    df["Auto Strategy"], seconds = timed("assign_strategies", strategy_engine.assign_strategies, df["Gap %"], df["Strategic Impact"])
+    total += seconds
+    df["Final Strategy"], seconds = timed("apply_overrides", strategy_engine.apply_overrides, df, overrides)
+    total += seconds
+    _, seconds = timed("classify_quadrants", strategy_engine.classify_quadrants, df["Gap %"], df["Strategic Impact"])
+    total += seconds
+    print(f"{'classification total':<36}{total:>8.3f}s")
+    timed("strategy_summary", strategy_engine.strategy_summary, df)
+
+
+if __name__ == "__main__":
+    main()
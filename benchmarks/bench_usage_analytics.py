@@ -0,0 +1,102 @@
+# benchmarks/bench_usage_analytics.py
+#
+# Writes a synthetic rotated access log, builds the usage aggregates from
+# scratch, appends a small batch of new rows and times the incremental update.
+# The incremental result must equal a full rebuild.
+#
+#   python benchmarks/bench_usage_analytics.py --rows 1000000 --new-rows 10000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules import logger, page_registry, usage_engine
+
+PAGES = list(page_registry.PAGES)
+STEPS = np.array([5, 20, 45, 90, 240, 600, 2400])  # seconds between a user's events
+
+
+def synthetic_rows(n_rows, n_users, start, seed):
+    """
+    Users walking the page list in order with random pauses, logins and
+    occasional jumps back, merged into one time-ordered log.
+    """
+    rng = np.random.default_rng(seed)
+    users = rng.integers(0, n_users, n_rows)
+    steps = STEPS[rng.integers(0, len(STEPS), n_rows)]
+    order = np.lexsort((np.arange(n_rows), users))
+    clock = np.empty(n_rows, dtype=np.int64)
+    clock[order] = pd.Series(steps[order]).groupby(users[order]).cumsum().to_numpy()
+    position = pd.Series(rng.random(n_rows) < 0.8).groupby(users).cumsum().to_numpy() % len(PAGES)
+
+    pages = np.array(PAGES, dtype=object)[position]
+    pages[rng.random(n_rows) < 0.05] = "Login (email_region=gh, ip_region=gh, admin=False)"
+    times = (pd.Timestamp(start) + pd.to_timedelta(clock, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+    df = pd.DataFrame({"Email": [f"user{u}@gh.nestle.com" for u in users], "DateTime": times, "Page": pages})
+    return df.sort_values("DateTime", kind="stable"), pd.Timestamp(start) + pd.Timedelta(seconds=int(clock.max()))
+
+
+def write_log(sink, df, batch=50_000):
+    for i in range(0, len(df), batch):
+        sink.write(df.iloc[i:i + batch].to_numpy().tolist())
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--new-rows", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--max-mb", type=float, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        log_file = os.path.join(root, "access_log.csv")
+        sink = logger.CsvSink(log_file, max_bytes=int(args.max_mb * 1024 ** 2), backup_count=1000)
+        history, last = synthetic_rows(args.rows, args.users, "2025-01-01", seed=0)
+        write_log(sink, history)
+
+        (state, n_read), full_seconds = timed(usage_engine.update_from_logs, log_file, usage_engine.new_state(),
+                                              backup_count=1000)
+        state_file = os.path.join(root, "state.pkl")
+        _, save_seconds = timed(usage_engine.save_state, state, state_file)
+
+        new_rows, _ = synthetic_rows(args.new_rows, args.users, last, seed=1)
+        write_log(sink, new_rows)
+        files = len(logger.rotated_files(log_file, 1000))
+
+        start = time.perf_counter()
+        state = usage_engine.load_state(state_file)
+        state, n_new = usage_engine.update_from_logs(log_file, state, backup_count=1000)
+        incremental_seconds = time.perf_counter() - start
+
+        rebuilt, _ = usage_engine.update_from_logs(log_file, usage_engine.new_state(), backup_count=1000)
+        now = pd.Timestamp("2100-01-01")
+        for name, table in usage_engine.usage_report(state, now).items():
+            pd.testing.assert_frame_equal(table, usage_engine.usage_report(rebuilt, now)[name], check_dtype=False)
+
+        _, report_seconds = timed(usage_engine.usage_report, state)
+
+    assert n_read == args.rows and n_new == args.new_rows
+    print(f"{args.rows:,} rows + {args.new_rows:,} new rows, {args.users:,} users, {files} log files")
+    print(f"{'full build':<36}{full_seconds:>8.3f}s {args.rows / full_seconds:>12,.0f} rows/s")
+    print(f"{'save state':<36}{save_seconds:>8.3f}s")
+    print(f"{'incremental update (load + read new)':<36}{incremental_seconds:>8.3f}s "
+          f"{args.new_rows / incremental_seconds:>12,.0f} rows/s")
+    print(f"{'report tables':<36}{report_seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
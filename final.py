@@ -6,32 +6,14 @@ load_dotenv()
 import sys
 import os
 import streamlit as st
-from collections import OrderedDict
 from datetime import datetime, timedelta
-import feedparser
-import requests
 
 
 # Add root path for import resolution
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# === Import all modules ===
-from modules import (
-    auth,
-    logger,
-    ui,
-    landing_page,
-    driver_definition,
-    workforce_model,
-    business_correlation,
-    elasticity_modeling,
-    headcount_forecast,
-    scenario_planning,
-    gap_analysis,
-    gap_management,
-    gap_strategy_analysis,
-    action_planning,
-)
+# === Import core modules (pages are loaded on selection) ===
+from modules import auth, logger, page_registry
 
 # === Inject Custom Styles ===
 def inject_custom_styles():
@@ -73,13 +55,7 @@ if not authenticated:
 
 # === Helper functions for welcome banner ===
 def get_ip_region():
-    try:
-        response = requests.get("https://ipapi.co/json", timeout=3)
-        if response.status_code == 200:
-            return response.json().get("country_code", "").lower()
-    except:
-        pass
-    return ""
+    return auth.get_user_country_code()
 
 def extract_user_info(email):
     try:
@@ -112,19 +88,7 @@ def show_welcome_banner():
             st.warning("VPN? IP region ≠ email region")
 
 # === Define all pages ===
-PAGES = OrderedDict({
-    "Landing Page": landing_page.render_landing_page,
-    "Business Demand Driver": driver_definition.render_driver_definition,
-    "Workforce Data Insights": workforce_model.render_headcount_input,
-    "Workforce Correlation": business_correlation.render_driver_headcount_correlation,
-    "Elasticity Modeling": elasticity_modeling.render_elasticity_modeling,
-    "Critical Workforce Forecast": headcount_forecast.render_critical_workforce_forecasting,
-    "Scenario Planning": scenario_planning.render_scenario_planning,
-    "Gap Analysis": gap_analysis.render_gap_analysis,
-    "Workforce Strategy": gap_management.render_gap_management,
-    "Gap Strategy Analysis": gap_strategy_analysis.render_gap_strategy_analysis,
-    "Action Planning": action_planning.render_action_planning
-})
+PAGES = page_registry.PAGES
 
 # === Auto-refresh news every 2 minutes ===
 NEWS_REFRESH_MINUTES = 2
@@ -140,12 +104,26 @@ else:
 with st.sidebar:
     st.header("📁 Navigate Modules")
 
+    page_options = list(PAGES.keys())
+    if st.session_state.get("user_email") in auth.ADMIN_EMAILS:
+        page_options += list(page_registry.ADMIN_PAGES.keys())
+    if st.session_state.get("current_page") not in page_options:
+        st.session_state["current_page"] = page_options[0]
+
     selected_page = st.selectbox(
-        "", list(PAGES.keys()),
-        index=list(PAGES.keys()).index(st.session_state.get("current_page", list(PAGES.keys())[0]))
+        "", page_options,
+        index=page_options.index(st.session_state["current_page"])
     )
     st.session_state["current_page"] = selected_page
 
+    # Snowflake pool reuse for admins, once a page has used Snowflake (the
+    # connector is not imported just for this)
+    snowflake = sys.modules.get("modules.snowflake_connector")
+    if snowflake is not None and st.session_state.get("user_email") in auth.ADMIN_EMAILS:
+        pool = snowflake.get_pool().metrics()
+        st.caption(f"🔌 Snowflake pool: {pool['reused']} reused / {pool['opened']} opened "
+                   f"({pool['reuse_ratio']:.0%} reuse), {pool['in_use']} in use, {pool['idle']} idle")
+
     # === Logout Button ===
     st.markdown("---")
     st.subheader("🔐 Account")
@@ -172,11 +150,11 @@ if st.session_state.get("authenticated", False):
         logger.log_access(st.session_state["user_email"], page=current_page)
         st.session_state["last_logged_page"] = current_page
 
-    PAGES[current_page]()  # Render the selected page
+    page_registry.render_page(current_page)  # Import on first use and render the selected page
 
 # === Continue Button ===
 page_keys = list(PAGES.keys())
-current_idx = page_keys.index(st.session_state["current_page"])
+current_idx = page_keys.index(st.session_state["current_page"]) if st.session_state["current_page"] in page_keys else len(page_keys) - 1
 
 if current_idx < len(page_keys) - 1:
     if st.button("➡️ Continue", key=f"continue_{current_idx}"):
@@ -1,9 +1,8 @@
 # modules/auth.py
 
 import streamlit as st
-import requests
 import re
-from modules import logger
+from modules import geo, logger
 
 # 🔐 Admin override list
 ADMIN_EMAILS = {
@@ -28,15 +27,10 @@ def is_valid_nestle_email(email):
 
 def get_user_country_code():
     """
-    Fetches the user's country code using IP geolocation.
+    Returns the user's country code from the geo-IP cache or the offline table.
+    The network lookup runs in the background, so login never waits on it.
     """
-    try:
-        response = requests.get("https://ipapi.co/json", timeout=3)
-        if response.status_code == 200:
-            return response.json().get("country_code", "").lower()
-    except:
-        pass
-    return ""
+    return geo.country_for_session()
 
 
 def extract_region_from_email(email):
@@ -67,6 +61,9 @@ def email_authenticate():
         st.session_state['user_email'] = None
 
     if not st.session_state['authenticated']:
+        # Resolve the client's country while the user types
+        geo.get_resolver().prefetch(geo.client_ip())
+
         email = st.text_input("Enter your Nestlé email")
         login_button = st.button("Login")
 
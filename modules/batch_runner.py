@@ -0,0 +1,241 @@
+# modules/batch_runner.py
+#
+# Headless SWP chain for many markets:
+#   correlation -> elasticity -> forecast -> scenario -> gap -> 4Bs -> action plan
+#
+# Each market is a folder holding drivers.csv ("Business Driver" + year
+# columns), headcount.csv ("Function Unit" + year columns) and an optional
+# config.json with the choices made on the pages (see run_market).
+#
+#   python -m modules.batch_runner markets/ --output plans/ --workers 8
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from modules import (
+    correlation_engine,
+    elasticity_engine,
+    forecast_engine,
+    forecast_models,
+    gap_engine,
+    scenario_engine,
+    strategy_engine,
+)
+
+DRIVERS_FILE = "drivers.csv"
+HEADCOUNT_FILE = "headcount.csv"
+CONFIG_FILE = "config.json"
+
+# Scenario Planning page defaults, in percent / FTE per year
+DEFAULT_RATES = {"attrition": 5.0, "retirement": 2.0, "pipeline": 5.0}
+
+def default_role_weights(clean_drivers, role_func_map):
+    """
+    Splits each driver's weight evenly over the roles whose function unit the
+    driver is mapped to.
+    """
+    weights = {}
+    for item in clean_drivers:
+        roles = [r for r, f in role_func_map.items() if f in item["Function_Units"]]
+        if roles:
+            weights[item["Driver"]] = {r: 100.0 / len(roles) for r in roles}
+    return weights
+
+def rate_table(roles, rates=None):
+    """
+    Attrition / retirement / pipeline per role in the Scenario Planning layout,
+    from {role: {"attrition": %, "retirement": %, "pipeline": FTE}}.
+    """
+    rates = rates or {}
+    rows = []
+    for role in roles:
+        role_rates = {**DEFAULT_RATES, **rates.get(role, {})}
+        rows.append({
+            "Role": role,
+            "Attrition Rate": role_rates["attrition"] / 100,
+            "Retirement Rate": role_rates["retirement"] / 100,
+            "Pipeline": role_rates["pipeline"]
+        })
+    return pd.DataFrame(rows, columns=["Role", "Attrition Rate", "Retirement Rate", "Pipeline"]).set_index("Role")
+
+def run_market(df_drivers, df_headcount, config=None):
+    """
+    Runs the full chain for one market. `config` keys (all optional except
+    role_func_map):
+        headcount_years, driver_function_mapping, selection_method,
+        intercorrelation_threshold, bootstrap_resamples, confidence_level,
+        role_func_map {role: function unit}, driver_role_weights
+        {driver: {role: %}}, forecast_model, growth_rate, rates
+        {role: {attrition, retirement, pipeline}}, strategic_scores
+        {role: 1-5}, strategy_overrides {role: strategy}, strategy_thresholds.
+    Returns a dict of output tables keyed like the session state artifacts.
+    """
+    config = config or {}
+    headcount_years = config.get("headcount_years") or sorted(
+        str(c) for c in df_headcount.columns if c != "Function Unit"
+    )
+    df_headcount = df_headcount.rename(columns=str)
+    df_drivers = df_drivers.rename(columns=str)
+
+    # Correlation and driver selection
+    mapping = config.get("driver_function_mapping") or correlation_engine.default_mapping(
+        df_drivers["Business Driver"].tolist(), df_headcount["Function Unit"].unique().tolist()
+    )
+    df_corr, driver_values, headcount_values, intercorrelation = correlation_engine.correlation_analysis(
+        df_drivers, df_headcount, headcount_years, mapping
+    )
+    if df_corr.empty:
+        raise ValueError("❌ No mapped driver has enough data to correlate with headcount.")
+    corr_matrix = intercorrelation.round(2)
+    selected = correlation_engine.select_drivers(
+        corr_matrix, df_corr.set_index("Driver").loc[corr_matrix.columns, "Correlation"],
+        method=config.get("selection_method"),
+        threshold=config.get("intercorrelation_threshold", correlation_engine.INTERCORRELATION_THRESHOLD)
+    )
+    if not selected:
+        raise ValueError("❌ No drivers meet the intercorrelation threshold.")
+    clean_drivers = correlation_engine.clean_driver_records(selected, driver_values, headcount_values, mapping)
+
+    # Elasticity
+    df_elasticity, _ = elasticity_engine.estimate_elasticities(
+        clean_drivers,
+        n_resamples=config.get("bootstrap_resamples", elasticity_engine.BOOTSTRAP_RESAMPLES),
+        level=config.get("confidence_level", elasticity_engine.CONFIDENCE_LEVEL)
+    )
+    if df_elasticity.empty:
+        raise ValueError("❌ No valid elasticity values could be estimated.")
+
+    # Critical role forecast
+    role_func_map = config.get("role_func_map")
+    if not role_func_map:
+        raise ValueError("❌ config.json needs role_func_map ({role: function unit}).")
+    driver_role_weights = config.get("driver_role_weights") or default_role_weights(clean_drivers, role_func_map)
+
+    model_name = config.get("forecast_model", "Linear")
+    driver_kpis = None
+    if model_name != "Linear":
+        driver_kpis = {
+            item["Driver"]: forecast_models.run_model(
+                model_name, item["Driver_Values"].to_numpy(), item["Driver_Values"].index.tolist()
+            )
+            for item in clean_drivers if item["Driver"] in driver_role_weights
+        }
+    df_forecast = forecast_engine.forecast_to_wide(forecast_engine.forecast_critical_roles(
+        clean_drivers, df_elasticity, df_headcount, headcount_years,
+        role_func_map, driver_role_weights, driver_kpis=driver_kpis
+    ))
+    if df_forecast.empty:
+        raise ValueError("❌ No forecast generated. Check role mapping and weights.")
+
+    # Scenario, gap, 4Bs and action plan
+    rate_df = rate_table(df_forecast["Role"].unique().tolist(), config.get("rates"))
+    demand, supply, role_gap = scenario_engine.project_scenario(df_forecast, rate_df, config.get("growth_rate", 0.0))
+    scenario_output, role_gap_summary = scenario_engine.summarize_scenario(demand, supply, role_gap)
+
+    df_gap = gap_engine.role_gap_table(
+        df_forecast, role_gap_summary.set_index("Role"),
+        rate_df["Attrition Rate"].to_dict(), rate_df["Retirement Rate"].to_dict(), rate_df["Pipeline"].to_dict()
+    )
+    df_strategy = strategy_engine.classify_gap_table(
+        df_gap, config.get("strategic_scores", {}),
+        config.get("strategy_overrides"), config.get("strategy_thresholds")
+    )
+    gap_strategy = strategy_engine.gap_strategy_table(df_strategy)
+
+    return {
+        "correlation_summary": df_corr,
+        "elasticity_table": df_elasticity,
+        "function_impact_mapping": elasticity_engine.most_impactful_drivers(df_elasticity),
+        "critical_role_forecast": df_forecast,
+        "scenario_planning_output": scenario_output,
+        "scenario_plan_role_table": role_gap_summary,
+        "workforce_role_gap_table": df_gap,
+        "gap_management_output": df_strategy,
+        "gap_strategy_output": gap_strategy,
+        "action_plan_table": strategy_engine.action_plan_table(gap_strategy)
+    }
+
+def find_markets(input_dir, names=None):
+    """
+    Market folders under `input_dir` that contain both input tables.
+    """
+    markets = []
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if names and name not in names:
+            continue
+        if all(os.path.isfile(os.path.join(path, f)) for f in (DRIVERS_FILE, HEADCOUNT_FILE)):
+            markets.append(path)
+    return markets
+
+def process_market(market_dir, output_dir):
+    """
+    Reads one market folder, runs the chain and writes every output table to
+    <output_dir>/<market>/<table>.csv. Returns (market, error or None, seconds).
+    """
+    market = os.path.basename(os.path.normpath(market_dir))
+    start = time.perf_counter()
+    try:
+        df_drivers = pd.read_csv(os.path.join(market_dir, DRIVERS_FILE))
+        df_headcount = pd.read_csv(os.path.join(market_dir, HEADCOUNT_FILE))
+        config = {}
+        config_path = os.path.join(market_dir, CONFIG_FILE)
+        if os.path.isfile(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+
+        outputs = run_market(df_drivers, df_headcount, config)
+
+        target = os.path.join(output_dir, market)
+        os.makedirs(target, exist_ok=True)
+        for name, table in outputs.items():
+            table.to_csv(os.path.join(target, f"{name}.csv"), index=False)
+    except Exception as e:
+        return market, str(e), time.perf_counter() - start
+    return market, None, time.perf_counter() - start
+
+def run_batch(market_dirs, output_dir, workers=None):
+    """
+    Processes markets in a process pool (inline when workers == 1).
+    Yields (market, error, seconds) as each market finishes.
+    """
+    if workers == 1:
+        for market_dir in market_dirs:
+            yield process_market(market_dir, output_dir)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_market, m, output_dir) for m in market_dirs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SWP chain for every market folder.")
+    parser.add_argument("input_dir", help="folder with one sub-folder per market")
+    parser.add_argument("--output", default="batch_output", help="where to write per-market tables")
+    parser.add_argument("--markets", nargs="+", help="only run these market folders")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 1 = inline)")
+    args = parser.parse_args(argv)
+
+    market_dirs = find_markets(args.input_dir, args.markets)
+    if not market_dirs:
+        print(f"❌ No market folders with {DRIVERS_FILE} and {HEADCOUNT_FILE} in {args.input_dir}")
+        return 1
+
+    start = time.perf_counter()
+    failed = 0
+    for market, error, seconds in run_batch(market_dirs, args.output, args.workers):
+        if error:
+            failed += 1
+            print(f"❌ {market}: {error.lstrip('❌ ')}")
+        else:
+            print(f"✅ {market} ({seconds:.2f}s)")
+    print(f"{len(market_dirs) - failed}/{len(market_dirs)} markets done in {time.perf_counter() - start:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-from scipy.stats import pearsonr
 import plotly.express as px
+from modules import correlation_engine, pipeline
 
 def render_driver_headcount_correlation():
     st.markdown("""
@@ -41,11 +40,10 @@ def render_driver_headcount_correlation():
     if "driver_function_mapping" not in st.session_state:
         st.session_state["driver_function_mapping"] = {}
 
+    suggested = correlation_engine.default_mapping(unique_drivers, unique_functions)
     updated_mapping = {}
     for driver in unique_drivers:
-        default = st.session_state["driver_function_mapping"].get(
-            driver, [f for f in unique_functions if driver.lower() in f.lower()]
-        )
+        default = st.session_state["driver_function_mapping"].get(driver, suggested[driver])
         updated_mapping[driver] = st.multiselect(
             f"Function Units for Driver: **{driver}**",
             options=unique_functions,
@@ -55,89 +53,54 @@ def render_driver_headcount_correlation():
     st.session_state["driver_function_mapping"] = updated_mapping
 
     st.subheader("📊 Correlation Summary with Headcount ")
-    driver_vectors = {}
-    driver_headcounts = {}
-    driver_mappings = {}
-    correlation_summary = []
-
-    for driver, funcs in updated_mapping.items():
-        if not funcs:
-            continue
-
-        try:
-            driver_vals = pd.to_numeric(
-                df_drivers[df_drivers["Business Driver"] == driver][headcount_years].iloc[0], errors="coerce"
-            )
-        except:
-            continue
-
-        hc_vals = df_headcount[df_headcount["Function Unit"].isin(funcs)][headcount_years]
-        hc_sum = pd.to_numeric(hc_vals.apply(pd.to_numeric, errors="coerce").sum(), errors="coerce")
-
-        # Remove zero or NaN years from both
-        valid_years = [y for y in headcount_years
-                       if pd.notna(driver_vals[y]) and pd.notna(hc_sum[y]) and driver_vals[y] != 0]
-
-        if len(valid_years) < 2:
-            continue
-
-        x = driver_vals[valid_years]
-        y = hc_sum[valid_years]
-
-        try:
-            r, p = pearsonr(x, y)
-            # if abs(r) >= 0.5:  # High correlation threshold
-            correlation_summary.append({
-                    "Driver": driver,
-                    "Function Units": ", ".join(funcs),
-                    "Correlation": round(r, 3),
-                    "p-value": round(p, 4),
-                    "Significant": "✅ Yes" if p < 0.05 else "⚠️ No"
-                })
-            driver_vectors[driver] = x
-            driver_headcounts[driver] = y
-            driver_mappings[driver] = funcs
-        except:
-            continue
-
-    df_corr = pd.DataFrame(correlation_summary)
+    df_corr, driver_values, headcount_values, intercorrelation = pipeline.run_stage(
+        "Workforce Correlation", correlation_engine.correlation_analysis,
+        df_drivers, df_headcount, headcount_years, updated_mapping
+    )
     st.dataframe(df_corr)
 
-    if not driver_vectors:
+    if df_corr.empty:
         st.warning("No valid drivers with strong correlation to headcount.")
         return
 
     st.subheader("🧭 Intercorrelation Matrix (Drivers Only)")
-    df_driver_matrix = pd.DataFrame(driver_vectors).T
-    corr_matrix = df_driver_matrix.T.corr(method="pearson").round(2)
+    corr_matrix = intercorrelation.round(2)
     st.plotly_chart(
         px.imshow(corr_matrix, text_auto=True, color_continuous_scale="RdBu", zmin=-1, zmax=1,
                   title="Driver Intercorrelation Matrix, Threshold < 0.5"),
         use_container_width=True
     )
 
-    st.subheader("✅ Filter Drivers with Intercorrelation < 0.5")
-    threshold = 0.5
-    corr_abs = corr_matrix.abs()
-    clean_drivers = [
-        d for d in corr_abs.columns if all(corr_abs[d].drop(d) < threshold)
-    ]
+    st.subheader("✅ Select Drivers with Low Intercorrelation")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        method = st.radio(
+            "Selection method",
+            list(correlation_engine.SELECTION_METHODS.keys()),
+            key="driver_selection_method"
+        )
+    with col2:
+        threshold = st.slider(
+            "Intercorrelation threshold", 0.1, 1.0,
+            correlation_engine.INTERCORRELATION_THRESHOLD, 0.05,
+            key="intercorrelation_threshold"
+        )
+
+    clean_drivers = correlation_engine.select_drivers(
+        corr_matrix, df_corr.set_index("Driver").loc[corr_matrix.columns, "Correlation"],
+        method=method, threshold=threshold
+    )
 
     if not clean_drivers:
-        st.warning("No drivers meet the intercorrelation threshold (< 0.5).")
+        st.warning(f"No drivers meet the intercorrelation threshold (< {threshold}).")
         return
 
     st.success(f"{len(clean_drivers)} driver(s) passed the intercorrelation filter.")
     st.write("Drivers:", clean_drivers)
 
     # Save clean drivers and their aligned vectors for use in the next module
-    clean_driver_data = []
-    for d in clean_drivers:
-        clean_driver_data.append({
-            "Driver": d,
-            "Driver_Values": driver_vectors[d],
-            "Headcount_Values": driver_headcounts[d],
-            "Function_Units": driver_mappings[d]
-        })
+    clean_driver_data = correlation_engine.clean_driver_records(
+        clean_drivers, driver_values, headcount_values, updated_mapping
+    )
 
-    st.session_state["clean_driver_data"] = clean_driver_data
+    pipeline.publish("Workforce Correlation", clean_driver_data=clean_driver_data)
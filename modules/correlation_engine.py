@@ -0,0 +1,208 @@
+# modules/correlation_engine.py
+import numpy as np
+import pandas as pd
+from scipy.special import betainc
+
+SIGNIFICANCE_LEVEL = 0.05
+INTERCORRELATION_THRESHOLD = 0.5
+
+def driver_headcount_matrices(df_drivers, df_headcount, headcount_years, mapping):
+    """
+    Stacks every mapped driver into one (n_drivers, n_years) array, with the
+    summed headcount of its function units alongside.
+    Returns (drivers, driver_values, headcount_values).
+    """
+    first_rows = df_drivers.drop_duplicates("Business Driver").set_index("Business Driver")
+    drivers = [d for d, funcs in mapping.items() if funcs and d in first_rows.index]
+
+    x = first_rows.reindex(index=drivers, columns=headcount_years)
+    x = x.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+    # Missing headcount counts as 0 in the sum, as pandas .sum() does
+    hc = df_headcount[headcount_years].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=float)
+    units = df_headcount["Function Unit"].to_numpy()
+    membership = np.array([np.isin(units, mapping[d]) for d in drivers], dtype=float).reshape(len(drivers), len(units))
+    y = membership @ hc
+
+    return drivers, x.reshape(len(drivers), len(headcount_years)), y
+
+def masked_pearson(x, y, mask):
+    """
+    Row-wise Pearson r and two-sided p-value over the points where `mask` is
+    True, matching scipy.stats.pearsonr (NaN for constant input, p = 1 for
+    two points). Returns (r, p, n).
+    """
+    n = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0).sum(axis=1) / n
+        y_mean = np.where(mask, y, 0).sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, y - y_mean[:, None], 0)
+        r = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+        r = np.clip(r, -1.0, 1.0)
+
+        # t-test on r expressed through the regularised incomplete beta function
+        dof = n - 2
+        p = betainc(np.where(dof > 0, dof, 1) / 2.0, 0.5, 1 - r * r)
+
+    p = np.where(dof == 0, 1.0, p)
+    p = np.where(np.isnan(r) | (n < 2), np.nan, p)
+    return r, p, n
+
+def pairwise_correlation(values, mask):
+    """
+    Pairwise-complete Pearson matrix between rows (what DataFrame.corr does on
+    columns). Rows are grouped by their missing-year pattern, so every block
+    is one centred matrix product and memory stays at the size of the output.
+    """
+    n_rows = values.shape[0]
+    out = np.full((n_rows, n_rows), np.nan)
+    if n_rows == 0:
+        return out
+
+    patterns, inverse = np.unique(mask, axis=0, return_inverse=True)
+    groups = [np.flatnonzero(inverse.ravel() == k) for k in range(len(patterns))]
+
+    for a in range(len(patterns)):
+        for b in range(a, len(patterns)):
+            common = patterns[a] & patterns[b]
+            if common.sum() < 2:
+                continue
+            blocks = []
+            for rows in (groups[a], groups[b]):
+                block = values[np.ix_(rows, common)]
+                block = block - block.mean(axis=1, keepdims=True)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    block = block / np.linalg.norm(block, axis=1, keepdims=True)
+                blocks.append(block)
+            corr = np.clip(blocks[0] @ blocks[1].T, -1.0, 1.0)
+            out[np.ix_(groups[a], groups[b])] = corr
+            out[np.ix_(groups[b], groups[a])] = corr.T
+    return out
+
+def correlation_analysis(df_drivers, df_headcount, headcount_years, mapping):
+    """
+    All driver <-> headcount correlations, p-values and the driver
+    intercorrelation matrix from one stacked array.
+
+    Years where the driver is missing or zero, or the headcount is missing, are
+    masked out per driver; drivers with fewer than 2 usable years are dropped.
+    Returns (summary, driver_values, headcount_values, intercorrelation) where
+    the value frames hold one row per kept driver with NaN for masked years.
+    """
+    drivers, x, y = driver_headcount_matrices(df_drivers, df_headcount, headcount_years, mapping)
+    mask = np.isfinite(x) & np.isfinite(y) & (x != 0)
+    r, p, n = masked_pearson(x, y, mask)
+
+    keep = n >= 2
+    kept = [d for d, k in zip(drivers, keep) if k]
+    r, p, mask = r[keep], p[keep], mask[keep]
+
+    summary = pd.DataFrame({
+        "Driver": kept,
+        "Function Units": [", ".join(mapping[d]) for d in kept],
+        "Correlation": np.round(r, 3),
+        "p-value": np.round(p, 4),
+        "Significant": np.where(p < SIGNIFICANCE_LEVEL, "✅ Yes", "⚠️ No")
+    })
+    driver_values = pd.DataFrame(np.where(mask, x[keep], np.nan), index=kept, columns=headcount_years)
+    headcount_values = pd.DataFrame(np.where(mask, y[keep], np.nan), index=kept, columns=headcount_years)
+    intercorrelation = pd.DataFrame(pairwise_correlation(x[keep], mask), index=kept, columns=kept)
+
+    return summary, driver_values, headcount_values, intercorrelation
+
+def default_mapping(drivers, function_units):
+    """
+    Function units whose name contains the driver name, per driver.
+    """
+    return {d: [f for f in function_units if d.lower() in f.lower()] for d in drivers}
+
+def clean_driver_records(drivers, driver_values, headcount_values, mapping):
+    """
+    Selected drivers with their aligned driver / headcount series, in the
+    clean_driver_data layout used by the elasticity and forecast steps.
+    """
+    return [{
+        "Driver": d,
+        "Driver_Values": driver_values.loc[d].dropna(),
+        "Headcount_Values": headcount_values.loc[d].dropna(),
+        "Function_Units": mapping[d]
+    } for d in drivers]
+
+def correlation_graph(corr, threshold=INTERCORRELATION_THRESHOLD):
+    """
+    Boolean adjacency matrix linking drivers with |r| >= threshold.
+    Undefined correlations (too few shared years) are not treated as links.
+    """
+    corr = np.asarray(corr, dtype=float)
+    with np.errstate(invalid="ignore"):
+        adjacency = np.abs(corr) >= threshold
+    np.fill_diagonal(adjacency, False)
+    return adjacency
+
+def _ranking(scores):
+    scores = np.nan_to_num(np.abs(np.asarray(scores, dtype=float)), nan=0.0)
+    return np.argsort(-scores, kind="stable")
+
+def greedy_independent_set(corr, scores, threshold=INTERCORRELATION_THRESHOLD):
+    """
+    Walks drivers from strongest to weakest headcount correlation and keeps each
+    one not linked to a driver already kept (a greedy maximal independent set).
+    Returns positions in ranking order.
+    """
+    adjacency = correlation_graph(corr, threshold)
+    blocked = np.zeros(len(adjacency), dtype=bool)
+    selected = []
+    for i in _ranking(scores):
+        if not blocked[i]:
+            selected.append(i)
+            blocked |= adjacency[i]
+    return np.array(selected, dtype=int)
+
+def cluster_representatives(corr, scores, threshold=INTERCORRELATION_THRESHOLD):
+    """
+    Splits the correlation graph into connected components and keeps the driver
+    most correlated with headcount in each. Components are grown breadth-first
+    from the best remaining driver, one adjacency-row block per step.
+    Returns positions in ranking order.
+    """
+    adjacency = correlation_graph(corr, threshold)
+    assigned = np.zeros(len(adjacency), dtype=bool)
+    selected = []
+    for i in _ranking(scores):
+        if assigned[i]:
+            continue
+        selected.append(i)
+        assigned[i] = True
+        frontier = adjacency[i] & ~assigned
+        while frontier.any():
+            assigned |= frontier
+            frontier = adjacency[frontier].any(axis=0) & ~assigned
+    return np.array(selected, dtype=int)
+
+def strict_filter(corr, scores=None, threshold=INTERCORRELATION_THRESHOLD):
+    """
+    Original rule: keep a driver only if |r| < threshold against every other
+    driver (an undefined r also fails). Returns positions in input order.
+    """
+    corr = np.asarray(corr, dtype=float)
+    with np.errstate(invalid="ignore"):
+        passes = np.abs(corr) < threshold
+    np.fill_diagonal(passes, True)
+    return np.flatnonzero(passes.all(axis=1))
+
+# Label -> selection function, in the order offered on the correlation page
+SELECTION_METHODS = {
+    "Greedy (rank by headcount correlation)": greedy_independent_set,
+    "Best driver per correlation cluster": cluster_representatives,
+    "Strict (all pairs below threshold)": strict_filter
+}
+
+def select_drivers(intercorrelation, scores, method=None, threshold=INTERCORRELATION_THRESHOLD):
+    """
+    Picks a low-intercorrelation driver set from a labelled intercorrelation
+    matrix and per-driver headcount correlations (aligned to its columns).
+    """
+    select = SELECTION_METHODS[method or next(iter(SELECTION_METHODS))]
+    positions = select(intercorrelation.to_numpy(dtype=float), np.asarray(scores, dtype=float), threshold)
+    return [intercorrelation.columns[i] for i in positions]
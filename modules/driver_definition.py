@@ -1,6 +1,8 @@
+import os
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from modules import kpi_engine, pdf_engine, pipeline
 
 # Custom styling
 def inject_custom_styles():
@@ -31,6 +33,21 @@ def section_header(title: str):
         </div>
     """, unsafe_allow_html=True)
 
+# Drivers offered in the multiselect; also the names report KPIs are matched to
+PREDEFINED_DRIVERS = [
+    "e-Intensity (%)", "e-NNS",
+     "E-Commerce growth", "Marketing spend in Digital media (%)",
+    "Finished Good Inventory (# of days)", "Organic Growth(%)",
+    "Customer Order Fulfillment(%)", "On-Time In Full(%)",
+    "Raw & Pack Inventory (# of days)","No of M&As",
+    "Total number of Applications", "Projects Started",
+    "# of Changes - Change and Release Management","# Sustain tickets in ServiceNow",
+    "No more critical incidents (P1/P2) than end of last year","Increase % of average of consecutive days without critical incidents (P1/P2)",
+    "Meet expected system availability target","Complete number of operational importance site mapping",
+    "Meet % of all incident failures and requests solved/closed in less than 24 hours by Q4 2024",
+    "Meet Security and Compliance Index target"
+]
+
 # Get last N years
 def get_recent_years(n=4):
     current_year = datetime.today().year
@@ -41,20 +58,6 @@ def render_driver_definition():
     inject_custom_styles()
     section_header("Business Demand Drivers")
 
-    predefined_drivers = [
-        "e-Intensity (%)", "e-NNS",
-         "E-Commerce growth", "Marketing spend in Digital media (%)",
-        "Finished Good Inventory (# of days)", "Organic Growth(%)",
-        "Customer Order Fulfillment(%)", "On-Time In Full(%)",
-        "Raw & Pack Inventory (# of days)","No of M&As",
-        "Total number of Applications", "Projects Started",
-        "# of Changes - Change and Release Management","# Sustain tickets in ServiceNow",
-        "No more critical incidents (P1/P2) than end of last year","Increase % of average of consecutive days without critical incidents (P1/P2)",
-        "Meet expected system availability target","Complete number of operational importance site mapping",
-        "Meet % of all incident failures and requests solved/closed in less than 24 hours by Q4 2024",
-        "Meet Security and Compliance Index target"
-    ]
-
     # Reset logic
     if st.button(" Reset Driver Input"):
         st.session_state.pop("selected_driver_list", None)
@@ -68,7 +71,7 @@ def render_driver_definition():
 
         selected = st.multiselect(
             "Select from pre-defined drivers",
-            options=predefined_drivers,
+            options=PREDEFINED_DRIVERS,
             default=[],
             key="driver_multiselect_temp"
         )
@@ -114,6 +117,45 @@ def render_driver_definition():
             {"Business Driver": d, **{y: "" for y in years}} for d in all_drivers
         ])
 
+    # 📄 Pre-fill blank cells from an annual report
+    with st.expander("📄 Pre-fill from Annual Report (PDF)"):
+        report = st.file_uploader("Upload annual report", type="pdf", key="annual_report_upload")
+        if report is not None and st.session_state.get("annual_kpis_id") != report.file_id:
+            path, digest = pdf_engine.spool_upload(report)
+            try:
+                with st.spinner("Extracting KPI tables from the report..."):
+                    st.session_state["annual_kpis"] = kpi_engine.kpi_records(path, digest)
+                st.session_state["annual_kpis_id"] = report.file_id
+            except Exception as e:
+                # Don't keep showing the previous report's KPIs for this upload
+                st.session_state.pop("annual_kpis", None)
+                st.session_state.pop("annual_kpis_id", None)
+                st.error(f"❌ Could not read the PDF: {e}")
+            finally:
+                os.remove(path)
+
+        if report is not None:
+            records = st.session_state.get("annual_kpis")
+        elif st.session_state.get("annual_text"):
+            st.caption("Using the text of the uploaded annual report.")
+            records = kpi_engine.records_from_text(st.session_state["annual_text"])
+        else:
+            records = None
+
+        if records is not None:
+            history, matches = kpi_engine.driver_history(records, all_drivers, years)
+            if matches.empty:
+                st.info("ℹ️ No KPI in the report matched the selected drivers for these years.")
+            else:
+                st.dataframe(matches, use_container_width=True)
+                if st.button("⬇️ Fill Blank Cells"):
+                    pipeline.publish(
+                        "Business Demand Driver",
+                        business_driver_table=kpi_engine.prefill_driver_table(df_editable, history),
+                        driver_years=years
+                    )
+                    st.rerun()
+
     # 🚧 Editable Table UI
     edited_df = st.data_editor(
         df_editable,
@@ -124,8 +166,7 @@ def render_driver_definition():
 
     # ✅ Save manually via button
     if st.button("💾 Save Driver Data"):
-        st.session_state["business_driver_table"] = edited_df
-        st.session_state["driver_years"] = years
+        pipeline.publish("Business Demand Driver", business_driver_table=edited_df, driver_years=years)
 
     # ✅ Show current saved table
     if "business_driver_table" in st.session_state:
@@ -0,0 +1,126 @@
+# modules/elasticity_engine.py
+import numpy as np
+import pandas as pd
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+
+def stack_driver_pairs(clean_drivers):
+    """
+    Aligns every driver's values with its headcount on shared years and stacks
+    them into (n_drivers, n_years) arrays. Years where either side is missing
+    or zero are masked out. Returns (drivers, x, y, mask).
+    """
+    drivers = [item["Driver"] for item in clean_drivers]
+    x = pd.DataFrame([pd.Series(item["Driver_Values"], dtype=float) for item in clean_drivers])
+    y = pd.DataFrame([pd.Series(item["Headcount_Values"], dtype=float) for item in clean_drivers])
+    years = x.columns.union(y.columns)
+    x = x.reindex(columns=years).to_numpy(dtype=float).reshape(len(drivers), len(years))
+    y = y.reindex(columns=years).to_numpy(dtype=float).reshape(len(drivers), len(years))
+    mask = np.isfinite(x) & np.isfinite(y) & (x != 0) & (y != 0)
+    return drivers, x, y, mask
+
+def masked_elasticity(x, y, mask):
+    """
+    Slope of the least-squares line (cov / var) and the elasticity at the means,
+    slope * mean(x) / mean(y), along the last axis over masked points.
+    Works on any leading shape. Returns (elasticity, slope, x_mean, y_mean, n).
+    """
+    n = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0).sum(axis=-1) / n
+        y_mean = np.where(mask, y, 0).sum(axis=-1) / n
+        dx = np.where(mask, x - x_mean[..., None], 0)
+        dy = np.where(mask, y - y_mean[..., None], 0)
+        slope = (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+        slope = np.where(np.isfinite(slope), slope, np.nan)
+        elasticity = slope * (x_mean / y_mean)
+    return elasticity, slope, x_mean, y_mean, n
+
+def bootstrap_intervals(x, y, mask, n_resamples=BOOTSTRAP_RESAMPLES, level=CONFIDENCE_LEVEL,
+                        seed=0, max_cells=20_000_000):
+    """
+    Percentile bootstrap interval for every driver's elasticity. Each driver's
+    valid points are resampled with replacement `n_resamples` times in one
+    (drivers, resamples, points) broadcast, processed in chunks of at most
+    `max_cells` elements. Resamples with no spread in x are ignored.
+    Returns (low, high).
+    """
+    n_drivers, n_points = x.shape
+    n = mask.sum(axis=1)
+    low = np.full(n_drivers, np.nan)
+    high = np.full(n_drivers, np.nan)
+    if n_drivers == 0 or n_points == 0:
+        return low, high
+
+    # Move each row's valid points to the front so index i < n picks a valid one
+    order = np.argsort(~mask, axis=1, kind="stable")
+    x_valid = np.take_along_axis(x, order, axis=1)
+    y_valid = np.take_along_axis(y, order, axis=1)
+
+    rng = np.random.default_rng(seed)
+    samples = np.empty((n_drivers, n_resamples))
+    chunk = max(1, max_cells // (n_drivers * n_points))
+    resample_mask = np.arange(n_points) < n[:, None, None]
+    rows = np.arange(n_drivers)[:, None, None]
+
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        idx = (rng.random((n_drivers, size, n_points)) * n[:, None, None]).astype(int)
+        idx = np.minimum(idx, n_points - 1)
+        mask_b = np.broadcast_to(resample_mask, idx.shape)
+        samples[:, start:start + size] = masked_elasticity(x_valid[rows, idx], y_valid[rows, idx], mask_b)[0]
+
+    tail = (1 - level) / 2 * 100
+    enough = (n >= 2) & np.isfinite(samples).any(axis=1)
+    if enough.any():
+        low[enough], high[enough] = np.nanpercentile(samples[enough], [tail, 100 - tail], axis=1)
+    return low, high
+
+def estimate_elasticities(clean_drivers, n_resamples=BOOTSTRAP_RESAMPLES, level=CONFIDENCE_LEVEL, seed=0):
+    """
+    Elasticity per driver in one pass, with bootstrap confidence bounds.
+    Returns (results, skipped) where `skipped` lists drivers with fewer than
+    2 usable points.
+    """
+    columns = ["Driver", "Function Units", "Elasticity", "CI Low", "CI High",
+               "Mean Driver", "Mean Headcount", "Data Points Used"]
+    if not clean_drivers:
+        return pd.DataFrame(columns=columns), []
+
+    drivers, x, y, mask = stack_driver_pairs(clean_drivers)
+    elasticity, _, x_mean, y_mean, n = masked_elasticity(x, y, mask)
+    keep = n >= 2
+    low, high = bootstrap_intervals(x[keep], y[keep], mask[keep], n_resamples, level, seed)
+
+    results = pd.DataFrame({
+        "Driver": np.array(drivers, dtype=object)[keep],
+        "Function Units": [", ".join(item["Function_Units"]) for item, k in zip(clean_drivers, keep) if k],
+        "Elasticity": np.round(elasticity[keep], 3),
+        "CI Low": np.round(low, 3),
+        "CI High": np.round(high, 3),
+        "Mean Driver": np.round(x_mean[keep], 2),
+        "Mean Headcount": np.round(y_mean[keep], 2),
+        "Data Points Used": n[keep]
+    }, columns=columns)
+    skipped = [d for d, k in zip(drivers, keep) if not k]
+    return results, skipped
+
+def most_impactful_drivers(results):
+    """
+    Driver with the largest |elasticity| for every function unit, in order of
+    first appearance (earlier drivers win ties).
+    """
+    columns = ["Function Unit", "Most Impactful Driver", "Elasticity"]
+    if results.empty:
+        return pd.DataFrame(columns=columns)
+
+    exploded = results.assign(**{"Function Unit": results["Function Units"].str.split(", ")})
+    exploded = exploded.explode("Function Unit", ignore_index=True)
+    strength = exploded["Elasticity"].abs().fillna(-1)
+    best = strength.groupby(exploded["Function Unit"], sort=False).idxmax()
+    return (
+        exploded.loc[best.values, ["Function Unit", "Driver", "Elasticity"]]
+        .rename(columns={"Driver": "Most Impactful Driver"})
+        .reset_index(drop=True)
+    )
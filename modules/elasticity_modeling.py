@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+from modules import elasticity_engine, pipeline
 
 def render_elasticity_modeling():
     st.markdown("""
@@ -33,78 +32,33 @@ def render_elasticity_modeling():
     clean_drivers = st.session_state["clean_driver_data"]
     st.subheader(" Elasticity Estimates Using Simplified Linear Model")
 
-    elasticity_results = []
-
-    for item in clean_drivers:
-        driver = item["Driver"]
-        funcs = item["Function_Units"]
-
-        try:
-            x_vals = pd.Series(item["Driver_Values"])
-            y_vals = pd.Series(item["Headcount_Values"])
-            x_vals, y_vals = x_vals.align(y_vals, join="inner")
-
-            # Remove pairs where driver is zero or headcount is zero
-            valid_mask = (x_vals != 0) & (y_vals != 0) & x_vals.notna() & y_vals.notna()
-            x_clean = x_vals[valid_mask]
-            y_clean = y_vals[valid_mask]
-
-            if len(x_clean) < 2:
-                st.warning(f"⚠️ Skipped driver '{driver}' – not enough valid (non-zero) data points.")
-                continue
-
-            # Calculate slope (ΔY / ΔX using linear regression)
-            x_mean = x_clean.mean()
-            y_mean = y_clean.mean()
-            cov = np.mean((x_clean - x_mean) * (y_clean - y_mean))
-            var_x = np.mean((x_clean - x_mean) ** 2)
-            slope = cov / var_x
-
-            # Simplified elasticity formula
-            elasticity = slope * (x_mean / y_mean)
-
-            elasticity_results.append({
-                "Driver": driver,
-                "Function Units": ", ".join(funcs),
-                "Elasticity": round(elasticity, 3),
-                "Mean Driver": round(x_mean, 2),
-                "Mean Headcount": round(y_mean, 2),
-                "Data Points Used": len(x_clean)
-            })
-
-        except Exception as e:
-            st.error(f" Elasticity calc failed for driver '{driver}': {e}")
-            continue
-
-    if not elasticity_results:
+    col1, col2 = st.columns(2)
+    with col1:
+        n_resamples = st.number_input(
+            "Bootstrap resamples", 200, 20000, elasticity_engine.BOOTSTRAP_RESAMPLES, 200,
+            key="elasticity_bootstrap_resamples"
+        )
+    with col2:
+        level = st.slider("Confidence level (%)", 80, 99, int(elasticity_engine.CONFIDENCE_LEVEL * 100), 1,
+                          key="elasticity_confidence_level")
+
+    df_results, skipped = pipeline.run_stage(
+        "Elasticity Modeling", elasticity_engine.estimate_elasticities,
+        clean_drivers, n_resamples=int(n_resamples), level=level / 100
+    )
+    for driver in skipped:
+        st.warning(f"⚠️ Skipped driver '{driver}' – not enough valid (non-zero) data points.")
+
+    if df_results.empty:
         st.warning(" No valid elasticity values could be estimated.")
         return
 
-    df_results = pd.DataFrame(elasticity_results)
     st.dataframe(df_results, use_container_width=True)
-    st.session_state["elasticity_table"] = df_results
 
     st.subheader("💥 Most Impactful Driver per Function Unit")
 
-    func_impacts = {}
-    for row in elasticity_results:
-        for func in row["Function Units"].split(", "):
-            if func not in func_impacts or abs(row["Elasticity"]) > abs(func_impacts[func]["Elasticity"]):
-                func_impacts[func] = {
-                    "Driver": row["Driver"],
-                    "Elasticity": row["Elasticity"]
-                }
-
-    df_impact = pd.DataFrame([
-        {
-            "Function Unit": func,
-            "Most Impactful Driver": data["Driver"],
-            "Elasticity": data["Elasticity"]
-        }
-        for func, data in func_impacts.items()
-    ])
+    df_impact = elasticity_engine.most_impactful_drivers(df_results)
     st.dataframe(df_impact, use_container_width=True)
-    st.session_state["function_impact_mapping"] = df_impact
 
     st.subheader("🗣️ Business Planning Insights")
     narratives = []
@@ -121,5 +75,8 @@ def render_elasticity_modeling():
     for n in narratives:
         st.markdown(n)
 
-    st.session_state["insight_narratives"] = narratives
+    pipeline.publish(
+        "Elasticity Modeling",
+        elasticity_table=df_results, function_impact_mapping=df_impact, insight_narratives=narratives
+    )
 
@@ -43,33 +43,59 @@ def section_header(title: str):
     """, unsafe_allow_html=True)
 
 
+import os
 import streamlit as st
 import pandas as pd
 import requests
 import plotly.express as px
-from modules import ui
+from urllib.parse import urlsplit
+from modules import fetch_engine, http_cache, ui
 
 # Constants
-WBG_COUNTRY_LIST_URL = "https://api.worldbank.org/v2/country?format=json&per_page=300"
+WORLDBANK_API_URL = os.getenv("WORLDBANK_API_URL", "https://api.worldbank.org/v2")
+WBG_COUNTRY_LIST_URL = f"{WORLDBANK_API_URL}/country?format=json&per_page=300"
 POP_IND = "SP.POP.TOTL"
 UNEMP_IND = "SL.UEM.TOTL.ZS"
-ADZUNA_SALARY_URL = "https://api.adzuna.com/v1/api/salaries"
+ADZUNA_SALARY_URL = os.getenv("ADZUNA_SALARY_URL", "https://api.adzuna.com/v1/api/salaries")
 APP_ID = st.secrets.get("ADZUNA_APP_ID")
 APP_KEY = st.secrets.get("ADZUNA_APP_KEY")
 
-@st.cache_data
+# Adzuna's quota is per minute: a full burst plus a minute of refill stays within it
+ADZUNA_REQUESTS_PER_MINUTE = float(os.getenv("ADZUNA_REQUESTS_PER_MINUTE", 20))
+ADZUNA_BURST = 5
+ADZUNA_CONCURRENCY = 2
+# Seconds the page waits for lookups on top of the time the rate limit needs
+# to let every role through (burst + rate * wait >= roles)
+BENCHMARK_DEADLINE = float(os.getenv("BENCHMARK_DEADLINE", 120))
+
+# Seconds responses are reused before revalidation; World Bank indicators
+# are published yearly, salary benchmarks move faster
+WORLDBANK_TTL = int(os.getenv("WORLDBANK_TTL", 30 * 24 * 3600))
+ADZUNA_TTL = int(os.getenv("ADZUNA_TTL", 7 * 24 * 3600))
+# "No benchmark for this role / country" (400 / 404) is remembered for a day
+ADZUNA_MISSING_TTL = int(os.getenv("ADZUNA_MISSING_TTL", 24 * 3600))
+
+@st.cache_resource
+def get_fetcher():
+    adzuna = urlsplit(ADZUNA_SALARY_URL).netloc
+    return fetch_engine.Fetcher(
+        host_limits={adzuna: ADZUNA_CONCURRENCY},
+        rate_limits={adzuna: (ADZUNA_REQUESTS_PER_MINUTE / 60, ADZUNA_BURST)},
+        cache=http_cache.ResponseCache(),
+        ttls={urlsplit(WORLDBANK_API_URL).netloc: WORLDBANK_TTL, adzuna: ADZUNA_TTL},
+        missing={adzuna: ({400, 404}, ADZUNA_MISSING_TTL)}
+    )
+
 def get_wb_countries():
-    resp = requests.get(WBG_COUNTRY_LIST_URL).json()
+    resp = get_fetcher().get_json(WBG_COUNTRY_LIST_URL)
     return [(c["id"], c["name"]) for c in resp[1]]
 
-@st.cache_data
 def fetch_worldbank(indicator, country_code):
-    url = f"https://api.worldbank.org/v2/country/{country_code}/indicator/{indicator}?format=json&per_page=100"
-    res = requests.get(url).json()
-    data = res[1] if isinstance(res, list) else []
+    url = f"{WORLDBANK_API_URL}/country/{country_code}/indicator/{indicator}?format=json&per_page=100"
+    res = get_fetcher().get_json(url)
+    data = res[1] if isinstance(res, list) and len(res) > 1 and res[1] else []
     return {d["date"]: d["value"] for d in data if d["value"] is not None}
 
-@st.cache_data
 def fetch_salary_role_country(role, country_code):
     """Query Adzuna API for average salary of a role in a country (USD)."""
     if not (APP_ID and APP_KEY):
@@ -81,13 +107,27 @@ def fetch_salary_role_country(role, country_code):
         "where": country_code,
         "content-type": "application/json"
     }
-    res = requests.get(ADZUNA_SALARY_URL, params=params)
-    if res.status_code != 200:
-        return None
-    data = res.json()
-    avg = data.get("mean")
+    # None (cached) when there is no benchmark; quota and server errors propagate
+    data = get_fetcher().get_json(ADZUNA_SALARY_URL, params=params)
+    avg = data.get("mean") if isinstance(data, dict) else None
     return round(avg, 2) if isinstance(avg, (int, float)) else None
 
+def salary_table(salaries, roles):
+    """
+    Benchmark rows in role order; `salaries` holds a number or a status text
+    for each role fetched so far.
+    """
+    rows = []
+    for role in roles:
+        value = salaries.get(role, "⏳ Loading...")
+        found = isinstance(value, (int, float))
+        rows.append({
+            "Role": role,
+            "Avg Salary (USD)": f"${value:,}" if found else "",
+            "Status": "✅" if found else value
+        })
+    return pd.DataFrame(rows)
+
 def render_external_benchmarking():
     inject_custom_styles()
     st.header("🌍 External Benchmarking & Critical Role Context")
@@ -101,26 +141,46 @@ def render_external_benchmarking():
     st.write(roles)
 
     # Choose geography
-    countries = get_wb_countries()
+    try:
+        countries = get_wb_countries()
+    except requests.RequestException as e:
+        st.error(f"❌ Could not load the World Bank country list: {e}")
+        return
     country_code, country_name = st.selectbox(
         "Select Country",
         options=countries,
         format_func=lambda x: x[1]
     )
-    wb_pop = fetch_worldbank(POP_IND, country_code)
-    wb_unemp = fetch_worldbank(UNEMP_IND, country_code)
+    fetcher = get_fetcher()
+    deadline = BENCHMARK_DEADLINE + fetcher.wait_estimate(urlsplit(ADZUNA_SALARY_URL).netloc, len(roles))
+    wb_futures = {ind: fetcher.submit(fetch_worldbank, ind, country_code) for ind in (POP_IND, UNEMP_IND)}
 
-    # Salary benchmarking
-    bench_rows = []
-    for role in roles:
-        salary = fetch_salary_role_country(role, country_name)
-        bench_rows.append({
-            "Role": role,
-            "Avg Salary (USD)": f"${salary:,}" if salary else ""
-        })
-    bench_df = pd.DataFrame(bench_rows)
+    # Salary benchmarking: rows fill in as each lookup returns
     st.subheader(f"📊 Salary Benchmark in {country_name}")
-    st.dataframe(bench_df, use_container_width=True)
+    progress = st.progress(0.0, text="Fetching salary benchmarks...")
+    table = st.empty()
+    salaries = {}
+    for done, (role, salary, error) in enumerate(
+            fetcher.stream(lambda r: fetch_salary_role_country(r, country_name), roles, timeout=deadline), 1):
+        if error is not None:
+            salaries[role] = "⚠️ Unavailable"
+        else:
+            salaries[role] = salary if salary else "— No data"
+        progress.progress(done / len(roles), text=f"Fetched {done} of {len(roles)} roles")
+        table.dataframe(salary_table(salaries, roles), use_container_width=True)
+    progress.empty()
+    bench_df = salary_table(salaries, roles).drop(columns="Status")
+    if not roles:
+        table.dataframe(bench_df, use_container_width=True)
+    elif any(v == "⚠️ Unavailable" for v in salaries.values()):
+        st.warning("⚠️ Some salary benchmarks could not be fetched. Reload the page to retry them.")
+
+    wb_pop, wb_unemp = {}, {}
+    try:
+        wb_pop = wb_futures[POP_IND].result(timeout=BENCHMARK_DEADLINE)
+        wb_unemp = wb_futures[UNEMP_IND].result(timeout=BENCHMARK_DEADLINE)
+    except Exception as e:
+        st.warning(f"⚠️ World Bank data unavailable: {e}")
 
     # Population & unemployment trend
     years = sorted(set(wb_pop.keys()) & set(wb_unemp.keys()))[-5:]
@@ -0,0 +1,274 @@
+# modules/fetch_engine.py
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from modules import http_cache
+
+CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("FETCH_READ_TIMEOUT", 10))
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5        # seconds before the first retry, doubled each attempt
+BACKOFF_MAX = 8.0
+MAX_WORKERS = 16
+HOST_CONCURRENCY = 4      # requests in flight per host unless configured otherwise
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts of up to
+    `capacity`. Thread-safe; acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None, cancel=None):
+        """
+        Takes one token, waiting at most `timeout` seconds. Returns False if
+        none can become free in time, or once the `cancel` event is set.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            if cancel is None:
+                time.sleep(wait)
+            elif cancel.wait(wait):
+                return False
+
+    def seconds_for(self, n):
+        """
+        Shortest time in which `n` requests can pass, starting from a full bucket.
+        """
+        return max(0.0, n - self.capacity) / self.rate
+
+def retry_after(response):
+    """
+    Seconds asked for by a Retry-After header (delay or HTTP date), or None.
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class Fetcher:
+    """
+    JSON over HTTP for pages that call external APIs. Requests run in a
+    shared thread pool; each host gets a concurrency limit and optionally a
+    token-bucket rate limit. Every request has connect/read timeouts, and
+    connection errors, timeouts, 429 and 5xx answers are retried with
+    exponential backoff and jitter (honouring Retry-After up to
+    `max_backoff`).
+
+    With a `cache` (http_cache.ResponseCache) responses are kept for the
+    TTL of their host in `ttls`; expired entries are revalidated with
+    If-None-Match / If-Modified-Since, and served stale if the source
+    cannot be reached. `missing` maps a host to (statuses, ttl): answers
+    with those statuses mean "no data", return None and are cached for ttl.
+    """
+
+    def __init__(self, workers=MAX_WORKERS, host_limits=None, rate_limits=None,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=MAX_RETRIES,
+                 backoff=BACKOFF_BASE, max_backoff=BACKOFF_MAX, cache=None, ttls=None,
+                 default_ttl=http_cache.DEFAULT_TTL, missing=None):
+        self.host_limits = dict(host_limits or {})
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.missing = dict(missing or {})
+        self._buckets = {host: TokenBucket(rate, capacity) for host, (rate, capacity) in (rate_limits or {}).items()}
+        self._semaphores = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        self.stats = {"requests": 0, "retries": 0, "failed": 0, "cache_hits": 0, "revalidated": 0, "stale": 0,
+                      "missing": 0}
+
+    def _session(self):
+        # requests.Session is not thread-safe; one per worker keeps connections alive
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = self._local.session = requests.Session()
+        return session
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.host_limits.get(host, HOST_CONCURRENCY))
+            return self._semaphores[host]
+
+    def wait_estimate(self, host, n):
+        """
+        Seconds the rate limit of `host` needs to let `n` requests through.
+        """
+        bucket = self._buckets.get(host)
+        return bucket.seconds_for(n) if bucket else 0.0
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_json(self, url, params=None):
+        """
+        Parsed JSON body of GET `url`, from the cache while fresh, or None
+        for a "no data" status of the host's `missing` entry. Raises
+        requests' HTTPError for other error statuses that are not retried (or
+        still failing after the last retry) and its ConnectionError / Timeout
+        when the host is unreachable - unless a stale cached copy can answer.
+        """
+        import requests
+
+        host = urlsplit(url).netloc
+        key = http_cache.cache_key(url, params) if self.cache else None
+        entry = self.cache.get(key) if self.cache else None
+        if entry and entry["fresh"]:
+            self._count("cache_hits")
+            return json.loads(entry["body"])
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = self._request(host, url, params, headers)
+        except requests.RequestException as e:
+            statuses, missing_ttl = self.missing.get(host, ((), None))
+            if e.response is not None and e.response.status_code in statuses:
+                # Cached as a JSON null so reruns don't spend quota asking again
+                self._count("missing")
+                if self.cache:
+                    self.cache.put(key, http_cache.cache_url(url, params), b"null", missing_ttl)
+                return None
+            if entry is None:
+                raise
+            self._count("stale")
+            return json.loads(entry["body"])
+
+        ttl = self.ttls.get(host, self.default_ttl)
+        if response.status_code == 304 and entry:
+            self._count("revalidated")
+            self.cache.refresh(key, ttl)
+            return json.loads(entry["body"])
+        data = response.json()
+        if self.cache:
+            self.cache.put(key, http_cache.cache_url(url, params), response.content, ttl,
+                           response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return data
+
+    def _request(self, host, url, params=None, headers=None):
+        # One GET with the host's limits, retried; returns a 2xx / 304 response
+        import requests
+
+        # Set by stream(): give up once the caller's deadline passes or it stops listening
+        deadline = getattr(self._local, "deadline", None)
+        cancel = getattr(self._local, "cancel", None)
+        bucket = self._buckets.get(host)
+        for attempt in range(self.retries + 1):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if (cancel is not None and cancel.is_set()) or (remaining is not None and remaining <= 0):
+                raise requests.Timeout(f"{host} lookup cancelled or past its deadline")
+            if bucket is not None and not bucket.acquire(timeout=remaining, cancel=cancel):
+                raise requests.Timeout(f"no {host} rate-limit slot before the deadline")
+            response, error = None, None
+            with self._semaphore(host):
+                self._count("requests")
+                try:
+                    response = self._session().get(url, params=params, headers=headers, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+
+            if response is not None and response.status_code not in RETRY_STATUS:
+                if not response.ok:
+                    self._count("failed")
+                response.raise_for_status()
+                return response
+
+            if attempt == self.retries:
+                self._count("failed")
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            self._count("retries")
+            delay = retry_after(response)
+            if delay is None:
+                delay = random.uniform(0.5, 1.0) * min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay = min(delay, self.max_backoff, remaining if remaining is not None else delay)
+            if cancel is None:
+                time.sleep(delay)
+            else:
+                cancel.wait(delay)
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def _run(self, fn, item, deadline, cancel):
+        self._local.deadline, self._local.cancel = deadline, cancel
+        try:
+            return fn(item)
+        finally:
+            self._local.deadline = self._local.cancel = None
+
+    def stream(self, fn, items, timeout=None):
+        """
+        Runs fn(item) for every item in the pool and yields (item, result,
+        error) as each finishes. Items still running after `timeout` seconds
+        are yielded with a TimeoutError, so one stuck endpoint cannot hold
+        up the caller. Requests made by fn stop waiting for rate-limit slots
+        and retries at the deadline, and as soon as the generator is closed
+        (e.g. Streamlit stops the script), when queued items are cancelled.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        cancel = threading.Event()
+        futures = {self.submit(self._run, fn, item, deadline, cancel): item for item in items}
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                pending.discard(future)
+                error = future.exception()
+                yield futures[future], (None if error else future.result()), error
+        except FuturesTimeout:
+            for future in [f for f in futures if f in pending]:
+                if future.done():
+                    error = future.exception()
+                    yield futures[future], (None if error else future.result()), error
+                else:
+                    yield futures[future], None, TimeoutError(f"no answer within {timeout:g}s")
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
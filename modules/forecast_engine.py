@@ -0,0 +1,146 @@
+# modules/forecast_engine.py
+import warnings
+import numpy as np
+import pandas as pd
+
+FORECAST_HORIZON = 4
+
+def fit_linear_trends(x, y):
+    """
+    Least-squares line through every row of `y` at once.
+    `x` and `y` are (n_series, n_points) arrays; NaN marks a missing point.
+    Returns (slopes, intercepts), NaN where a row has fewer than 2 points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x = np.broadcast_to(x, y.shape)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = mask.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(mask, x, 0).sum(axis=1) / n
+        y_mean = np.where(mask, y, 0).sum(axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, y - y_mean[:, None], 0)
+        slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+        intercepts = y_mean - slopes * x_mean
+
+    slopes[n < 2] = np.nan
+    intercepts[n < 2] = np.nan
+    return slopes, intercepts
+
+def _driver_arrays(drivers):
+    """
+    Stacks driver histories (dict or Series keyed by year) into padded arrays.
+    """
+    series = [pd.Series(d["Driver_Values"], dtype=float) for d in drivers]
+    width = max((len(s) for s in series), default=0)
+    x = np.full((len(series), width), np.nan)
+    y = np.full((len(series), width), np.nan)
+    for i, s in enumerate(series):
+        x[i, :len(s)] = [int(yr) for yr in s.index]
+        y[i, :len(s)] = s.values
+    return x, y
+
+def function_baselines(df_headcount, headcount_years):
+    """
+    Mean historical headcount per function unit. Function units that appear on
+    more than one row are ambiguous and left out.
+    """
+    counts = df_headcount["Function Unit"].value_counts()
+    unique = df_headcount[df_headcount["Function Unit"].isin(counts[counts == 1].index)]
+    values = unique[headcount_years].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        base = np.nanmean(values, axis=1) if len(values) else np.array([])
+    return pd.Series(base, index=unique["Function Unit"].values)
+
+def forecast_critical_roles(clean_drivers, elasticity_df, df_headcount, headcount_years,
+                            role_func_map, driver_role_weights, horizon=FORECAST_HORIZON,
+                            driver_kpis=None):
+    """
+    Role x driver x year demand forecast as one broadcast:
+    function baseline x role weight x (1 + elasticity x KPI growth).
+
+    All driver trends are fitted together with fit_linear_trends unless
+    `driver_kpis` (driver -> forecast KPI values from another model) is given.
+    Returns a tidy frame with one row per role, driver and forecast year.
+    """
+    columns = ["Role", "Function Unit", "Driver", "Elasticity", "Weight (%)", "Year", "KPI", "Forecast"]
+    forecast_years = [str(int(headcount_years[-1]) + i) for i in range(1, horizon + 1)]
+
+    elasticities = elasticity_df.drop_duplicates("Driver").set_index("Driver")["Elasticity"]
+    drivers = [d for d in clean_drivers
+               if d["Driver"] in driver_role_weights and d["Driver"] in elasticities.index
+               and (driver_kpis is None or d["Driver"] in driver_kpis)]
+    if not drivers:
+        return pd.DataFrame(columns=columns)
+
+    # Driver KPI trends: one masked least-squares solve for every driver
+    x, y = _driver_arrays(drivers)
+    if driver_kpis is None:
+        slopes, intercepts = fit_linear_trends(x, y)
+        future = np.nanmax(x, axis=1)[:, None] + np.arange(1, horizon + 1)
+        kpis = np.round(slopes[:, None] * future + intercepts[:, None], 2)
+    else:
+        kpis = np.array([np.asarray(driver_kpis[d["Driver"]], dtype=float)[:horizon] for d in drivers])
+    base_kpi = np.nanmean(y, axis=1)
+    growth = (kpis - base_kpi[:, None]) / base_kpi[:, None]
+    elasticity = elasticities.loc[[d["Driver"] for d in drivers]].to_numpy(dtype=float)
+
+    # Role x driver pairs with a usable function baseline
+    baselines = function_baselines(df_headcount, headcount_years)
+    pairs = [
+        (i, role, role_func_map.get(role), wt)
+        for i, d in enumerate(drivers)
+        for role, wt in driver_role_weights[d["Driver"]].items()
+    ]
+    pairs = [p for p in pairs if p[2] in baselines.index and baselines[p[2]] > 0]
+    if not pairs:
+        return pd.DataFrame(columns=columns)
+
+    driver_idx = np.array([p[0] for p in pairs], dtype=int)
+    roles = np.array([p[1] for p in pairs], dtype=object)
+    funcs = np.array([p[2] for p in pairs], dtype=object)
+    weights = np.array([p[3] for p in pairs], dtype=float)
+    base_hc = baselines.loc[funcs].to_numpy(dtype=float)
+
+    forecast = np.rint(
+        base_hc[:, None] * (1 + elasticity[driver_idx, None] * growth[driver_idx]) * (weights[:, None] / 100.0)
+    )
+
+    # Drivers whose trend could not be fitted produce no forecast
+    valid = np.isfinite(forecast).all(axis=1)
+    driver_idx, roles, funcs, weights, forecast = (
+        a[valid] for a in (driver_idx, roles, funcs, weights, forecast)
+    )
+
+    n_pairs = len(driver_idx)
+    return pd.DataFrame({
+        "Role": np.repeat(roles, horizon),
+        "Function Unit": np.repeat(funcs, horizon),
+        "Driver": np.repeat([drivers[i]["Driver"] for i in driver_idx], horizon),
+        "Elasticity": np.repeat(np.round(elasticity[driver_idx], 3), horizon),
+        "Weight (%)": np.repeat(weights, horizon),
+        "Year": np.tile(forecast_years, n_pairs),
+        "KPI": kpis[driver_idx].ravel(),
+        "Forecast": forecast.ravel()
+    })
+
+def forecast_to_wide(tidy):
+    """
+    Pivots the tidy forecast into the one-row-per-role-and-driver layout used in
+    session state ("KPI <year>" / "Forecast <year>" columns).
+    """
+    keys = ["Role", "Function Unit", "Driver", "Elasticity", "Weight (%)"]
+    if tidy.empty:
+        return pd.DataFrame(columns=keys)
+
+    years = list(dict.fromkeys(tidy["Year"]))
+    wide = tidy.set_index(keys + ["Year"])[["KPI", "Forecast"]].unstack("Year")
+    wide = wide.reindex(pd.MultiIndex.from_frame(tidy[keys].drop_duplicates()))
+    wide.columns = [f"{metric} {year}" for metric, year in wide.columns]
+    ordered = [f"{metric} {year}" for year in years for metric in ("KPI", "Forecast")]
+    wide = wide[ordered].reset_index()
+    wide[[f"Forecast {y}" for y in years]] = wide[[f"Forecast {y}" for y in years]].astype(int)
+    return wide
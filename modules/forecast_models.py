@@ -0,0 +1,188 @@
+# modules/forecast_models.py
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+
+from modules.forecast_engine import FORECAST_HORIZON
+
+# name -> fn(values, years, horizon) returning `horizon` forecast values
+FORECAST_MODELS = {}
+
+def register_model(name):
+    def decorator(fn):
+        FORECAST_MODELS[name] = fn
+        return fn
+    return decorator
+
+def _future_years(years, horizon):
+    return [int(years[-1]) + i for i in range(1, horizon + 1)]
+
+@register_model("Linear")
+def linear_forecast(values, years, horizon=FORECAST_HORIZON):
+    x = np.array([int(y) for y in years])
+    y = np.array(values)
+    coef = np.polyfit(x, y, 1)
+    future_years = _future_years(years, horizon)
+    return np.round(coef[0] * np.array(future_years) + coef[1], 2)
+
+@register_model("Damped Trend")
+def damped_trend_forecast(values, years, horizon=FORECAST_HORIZON, alpha=0.5, beta=0.3, phi=0.8):
+    """
+    Holt's additive trend with damping: the trend fades by `phi` each year
+    instead of extrapolating a straight line forever.
+    """
+    y = np.asarray(values, dtype=float)
+    level, trend = y[0], y[1] - y[0]
+    for value in y[1:]:
+        prev_level = level
+        level = alpha * value + (1 - alpha) * (level + phi * trend)
+        trend = beta * (level - prev_level) + (1 - beta) * phi * trend
+    damping = np.cumsum(phi ** np.arange(1, horizon + 1))
+    return np.round(level + damping * trend, 2)
+
+@register_model("Prophet")
+def prophet_forecast(values, years, horizon=FORECAST_HORIZON):
+    from prophet import Prophet
+
+    history = pd.DataFrame({
+        "ds": pd.to_datetime([f"{int(y)}-12-31" for y in years]),
+        "y": np.asarray(values, dtype=float)
+    })
+    model = Prophet(yearly_seasonality=False, weekly_seasonality=False, daily_seasonality=False)
+    model.fit(history)
+    future = pd.DataFrame({"ds": pd.to_datetime([f"{y}-12-31" for y in _future_years(years, horizon)])})
+    return np.round(model.predict(future)["yhat"].to_numpy(), 2)
+
+@register_model("XGBoost")
+def xgboost_forecast(values, years, horizon=FORECAST_HORIZON):
+    """
+    Linear trend plus an XGBoost model of the year-on-year residual, since
+    trees alone cannot extrapolate past the last observed year.
+    """
+    from xgboost import XGBRegressor
+
+    x = np.array([int(y) for y in years], dtype=float)
+    y = np.asarray(values, dtype=float)
+    coef = np.polyfit(x, y, 1)
+    residuals = y - np.polyval(coef, x)
+
+    model = XGBRegressor(n_estimators=50, max_depth=2, learning_rate=0.3, n_jobs=1)
+    model.fit(residuals[:-1].reshape(-1, 1), residuals[1:])
+
+    future_years = np.array(_future_years(years, horizon), dtype=float)
+    last, preds = residuals[-1], []
+    for year in future_years:
+        last = float(model.predict(np.array([[last]]))[0])
+        preds.append(np.polyval(coef, year) + last)
+    return np.round(np.array(preds), 2)
+
+def run_model(name, values, years, horizon=FORECAST_HORIZON):
+    return np.asarray(FORECAST_MODELS[name](values, years, horizon), dtype=float)
+
+def series_key(name, values, years, horizon=FORECAST_HORIZON):
+    """
+    Content hash identifying one model fit.
+    """
+    payload = json.dumps([name, [float(v) for v in values], [str(y) for y in years], horizon])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Fitted forecasts (least recently used dropped past MAX_RESULTS) and in-flight
+# fits, shared by every session in the process
+MAX_RESULTS = 4096
+_RESULTS = OrderedDict()
+_PENDING = {}   # key -> (future, executor it ran on, attempts)
+_LOCK = threading.Lock()
+_EXECUTOR = None
+
+def get_executor(max_workers=None, reset=False, broken=None):
+    """
+    Lazily starts the process pool. "spawn" avoids forking the threaded
+    Streamlit server. `reset` replaces the pool; with `broken` it is only
+    replaced if that is still the current pool.
+    """
+    global _EXECUTOR
+    with _LOCK:
+        if reset and _EXECUTOR is not None and broken in (None, _EXECUTOR):
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+        if _EXECUTOR is None:
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _EXECUTOR
+
+def _remember(key, forecast):
+    with _LOCK:
+        _RESULTS[key] = forecast
+        _RESULTS.move_to_end(key)
+        while len(_RESULTS) > MAX_RESULTS:
+            _RESULTS.popitem(last=False)
+
+def _submit(key, args, attempts):
+    executor = get_executor()
+    try:
+        future = executor.submit(*args)
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a fresh pool
+        executor = get_executor(reset=True, broken=executor)
+        future = executor.submit(*args)
+    with _LOCK:
+        _PENDING[key] = (future, executor, attempts)
+    return future
+
+def collect_forecasts(name, series, horizon=FORECAST_HORIZON):
+    """
+    Non-blocking batch fit. `series` maps a label to (values, years).
+    Cached and finished fits are returned straight away; the rest are submitted
+    to the process pool once and picked up on a later rerun. A fit lost to a
+    crashed worker is resubmitted once on a fresh pool; other failures are
+    reported and dropped, so a later rerun tries again.
+    Returns (results, pending_labels, errors).
+    """
+    results, pending, errors = {}, [], {}
+    for label, (values, years) in series.items():
+        key = series_key(name, values, years, horizon)
+        with _LOCK:
+            if key in _RESULTS:
+                _RESULTS.move_to_end(key)
+                results[label] = _RESULTS[key]
+                continue
+            future, executor, attempts = _PENDING.get(key, (None, None, 0))
+
+        args = (run_model, name, list(values), list(years), horizon)
+        if future is None:
+            if name == "Linear":
+                # Cheap enough to fit inline
+                results[label] = run_model(name, values, years, horizon)
+                _remember(key, results[label])
+                continue
+            future = _submit(key, args, 1)
+
+        if not future.done():
+            pending.append(label)
+            continue
+
+        try:
+            forecast = future.result()
+        except BrokenProcessPool as e:
+            get_executor(reset=True, broken=executor)
+            if attempts < 2:
+                _submit(key, args, attempts + 1)
+                pending.append(label)
+                continue
+            errors[label] = f"worker process crashed: {e}"
+        except Exception as e:
+            errors[label] = str(e)
+        else:
+            _remember(key, forecast)
+            results[label] = forecast
+        with _LOCK:
+            _PENDING.pop(key, None)
+
+    return results, pending, errors
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from modules import gap_engine, pipeline
 
 def inject_custom_styles():
     st.markdown("""
@@ -46,46 +46,11 @@ def render_gap_analysis():
     retirement_rates = assumptions.get("retirement_rates", {})
     internal_pipeline = assumptions.get("internal_pipeline", {})
 
-    forecast_years = sorted({
-        col.split()[-1] for col in demand_df.columns if col.startswith("Forecast ")
-    })
-
     roles = demand_df["Role"].unique()
-    rows = []
-
-    for role in roles:
-        for year in forecast_years:
-            demand_col = f"Forecast {year}"
-            gap_col = f"Gap {year}"
-
-            scenario_demand_series = demand_df[demand_df["Role"] == role][demand_col]
-            scenario_demand = scenario_demand_series.sum() if not scenario_demand_series.empty else 0
-
-            if year == forecast_years[0]:
-                projected_supply = supply_df.at[role, gap_col] + scenario_demand if (role in supply_df.index and gap_col in supply_df.columns) else 0
-            else:
-                prev_year = forecast_years[forecast_years.index(year) - 1]
-                prev_supply = rows[-1]["Projected Supply"]
-                attr = attrition_rates.get(role, 0)
-                retire = retirement_rates.get(role, 0)
-                inflow = internal_pipeline.get(role, 0)
-                projected_supply = prev_supply * (1 - attr - retire) + inflow
-
-            gap = (scenario_demand) - (projected_supply)
-            gap_pct = (gap / scenario_demand * 100) if scenario_demand else 0
-            status = "Shortfall" if gap > 0 else "Surplus" if gap < 0 else "Balanced"
-
-            rows.append({
-                "Critical Role": role,
-                "Year": year,
-                "Scenario Demand": round(scenario_demand, 1),
-                "Projected Supply": round(projected_supply, 1),
-                "Gap": round(gap, 1),
-                "Gap %": round(gap_pct, 1),
-                "Status": status
-            })
-
-    df_gap = pd.DataFrame(rows)
+    df_gap = pipeline.run_stage(
+        "Gap Analysis", gap_engine.role_gap_table,
+        demand_df, supply_df, attrition_rates, retirement_rates, internal_pipeline
+    )
 
     st.subheader("🎯 Filter by Role")
     selected_roles = st.multiselect("Select Critical Role(s)", sorted(roles), default=sorted(roles))
@@ -106,4 +71,4 @@ def render_gap_analysis():
     )
     st.plotly_chart(fig, use_container_width=True)
 
-    st.session_state["workforce_role_gap_table"] = df_gap
+    pipeline.publish("Gap Analysis", workforce_role_gap_table=df_gap)
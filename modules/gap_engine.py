@@ -0,0 +1,92 @@
+# modules/gap_engine.py
+import numpy as np
+import pandas as pd
+
+GAP_COLUMNS = ["Critical Role", "Year", "Scenario Demand", "Projected Supply", "Gap", "Gap %", "Status"]
+
+def _rates(rates, roles):
+    return np.array([rates.get(role, 0) for role in roles], dtype=float)
+
+def _role_sums(demand_df, roles, cols):
+    """
+    Per-role column sums equal to demand_df[demand_df["Role"] == role][col].sum():
+    one-row roles are taken as is, the others are summed as 1-D arrays so numpy
+    adds them in the same (pairwise) order as Series.sum.
+    """
+    codes, uniques = pd.factorize(demand_df["Role"])
+    values = demand_df[cols].to_numpy(dtype=float)
+    values[np.isnan(values)] = 0
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    by_role = values[order].T.copy()
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else order
+    stops = np.r_[starts[1:], len(order)]
+
+    sums = by_role[:, starts].T.copy()
+    for i in np.flatnonzero(stops - starts > 1):
+        sums[i] = by_role[:, starts[i]:stops[i]].sum(axis=1)
+    return pd.DataFrame(sums, index=uniques).reindex(roles, fill_value=0).to_numpy(dtype=float)
+
+def _round_python(values):
+    """
+    round(v, 1) as Python floats do it (exact decimal halves). Same as np.round
+    except where v * 10 is within float error of a half, which falls back to round().
+    """
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    near_half = np.isfinite(values) & (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_half] = [round(float(v), 1) for v in values[near_half]]
+    return rounded
+
+def role_gap_table(demand_df, supply_df, attrition_rates, retirement_rates, internal_pipeline):
+    """
+    Role x year gap table for the Gap Analysis page.
+
+    Demand is the per-role sum of the scenario forecast. Supply starts at the
+    role's first-year scenario gap plus demand and then follows
+    s[t] = round(s[t-1], 1) * (1 - attrition - retirement) + pipeline for all
+    roles at once. `supply_df` is the scenario role gap summary indexed by Role.
+
+    The result is identical to the original per-role loop, including its
+    rounding: numpy rounding for roles in the scenario table (numpy scalars
+    there), Python's round() for roles missing from it (plain floats).
+    """
+    forecast_years = sorted({col.split()[-1] for col in demand_df.columns if col.startswith("Forecast ")})
+    roles = demand_df["Role"].unique()
+    if len(roles) == 0 or not forecast_years:
+        return pd.DataFrame(columns=GAP_COLUMNS)
+
+    cols = [f"Forecast {y}" for y in forecast_years]
+    demand = _role_sums(demand_df, roles, cols)
+    keep = 1 - _rates(attrition_rates, roles) - _rates(retirement_rates, roles)
+    inflow = _rates(internal_pipeline, roles)
+
+    first_gap_col = f"Gap {forecast_years[0]}"
+    in_table = np.zeros(len(roles), dtype=bool)
+    first_gap = np.zeros(len(roles))
+    if first_gap_col in supply_df.columns:
+        in_table = pd.Index(roles).isin(supply_df.index)
+        first_gap = supply_df[first_gap_col].reindex(roles).to_numpy(dtype=float)
+
+    def round_supply(values):
+        return np.where(in_table, np.round(values, 1), _round_python(values))
+
+    supply = np.empty_like(demand)
+    supply[:, 0] = np.where(in_table, first_gap + demand[:, 0], 0.0)
+    for t in range(1, len(forecast_years)):
+        supply[:, t] = round_supply(supply[:, t - 1]) * keep + inflow
+
+    gap = demand - supply
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gap_pct = np.where(demand != 0, gap / demand * 100, 0.0)
+
+    return pd.DataFrame({
+        "Critical Role": np.repeat(roles, len(forecast_years)),
+        "Year": np.tile(forecast_years, len(roles)),
+        "Scenario Demand": np.round(demand, 1).ravel(),
+        "Projected Supply": round_supply(supply.T).T.ravel(),
+        "Gap": np.round(gap, 1).ravel(),
+        "Gap %": np.round(gap_pct, 1).ravel(),
+        "Status": np.select([gap > 0, gap < 0], ["Shortfall", "Surplus"], "Balanced").ravel()
+    }, columns=GAP_COLUMNS)
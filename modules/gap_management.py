@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from modules import pipeline, strategy_engine
 
 def inject_custom_styles():
     st.markdown("""
@@ -29,14 +29,6 @@ def section_header(title: str):
         </div>
     """, unsafe_allow_html=True)
 
-def assign_strategy(gap_pct, strategic_score):
-    if strategic_score >= 4:
-        return "Buy" if gap_pct >= 50 else "Build"
-    elif 2 <= strategic_score < 4:
-        return "Borrow" if gap_pct >= 50 else "Boost"
-    else:
-        return "Boost"
-
 def render_gap_management():
     inject_custom_styles()
     section_header("🎯 Workforce Gap Management with 4Bs Strategy")
@@ -62,29 +54,27 @@ def render_gap_management():
 
     st.session_state["strategic_scores"] = strategic_scores
 
-    df_gap["Strategic Impact"] = df_gap["Critical Role"].map(strategic_scores)
-    df_gap["Auto Strategy"] = df_gap.apply(
-        lambda row: assign_strategy(row["Gap %"], row["Strategic Impact"]), axis=1
-    )
+    with st.expander("⚙️ 4Bs Strategy Thresholds"):
+        defaults = strategy_engine.STRATEGY_THRESHOLDS
+        thresholds = {
+            "gap_pct": st.number_input("Gap % at or above which to Buy / Borrow", -100.0, 500.0, float(defaults["gap_pct"]), 5.0),
+            "high_score": st.slider("High strategic impact from score", 1, 5, defaults["high_score"]),
+            "low_score": st.slider("Mid strategic impact from score", 1, 5, defaults["low_score"])
+        }
 
     # Manual override
     st.subheader("🛠️ Optional Manual Strategy Override")
-    strategy_options = ["Buy", "Build", "Borrow", "Boost"]
+    strategy_options = strategy_engine.STRATEGIES
     strategy_overrides = {}
 
     for role in df_gap["Critical Role"].unique():
         strategy_overrides[role] = st.selectbox(
             f"Override Strategy for **{role}**",
-            options=["(Use Auto)"] + strategy_options,
+            options=[strategy_engine.USE_AUTO] + strategy_options,
             key=f"{role}_manual_strategy"
         )
 
-    df_gap["Final Strategy"] = df_gap.apply(
-        lambda row: strategy_overrides.get(row["Critical Role"])
-        if strategy_overrides.get(row["Critical Role"]) != "(Use Auto)"
-        else row["Auto Strategy"],
-        axis=1
-    )
+    df_gap = strategy_engine.classify_gap_table(df_gap, strategic_scores, strategy_overrides, thresholds)
 
     # Filter
     st.subheader("🔎 Filter by Strategy")
@@ -108,19 +98,7 @@ def render_gap_management():
     # Strategy Distribution Summary (WITH critical roles)
     st.subheader("📊 Strategy Distribution Summary")
 
-    summary_rows = []
-    grouped = filtered_df.groupby(["Final Strategy", "Year"])
-    for (strategy, year), group in grouped:
-        roles = group["Critical Role"].unique().tolist()
-        summary_rows.append({
-            "Strategy": strategy,
-            "Year": year,
-            "Roles": len(roles),
-            "Total_Gap": round(group["Gap"].sum(), 1),
-            "Critical Roles": ", ".join(roles)
-        })
-
-    strategy_summary = pd.DataFrame(summary_rows)
+    strategy_summary = strategy_engine.strategy_summary(filtered_df)
     st.dataframe(strategy_summary, use_container_width=True)
 
     # Strategic Quadrant View
@@ -130,19 +108,9 @@ def render_gap_management():
         chart_data = df_gap.copy()
         chart_data["Gap"] = chart_data["Gap"].abs().clip(upper=10) 
 
-
-        def classify_quadrant(row):
-            if row["Gap %"] < 50 and row["Strategic Impact"] < 4:
-                return "Boost"
-            elif row["Gap %"] < 50 and row["Strategic Impact"] >= 4:
-                return "Build"
-            elif row["Gap %"] >= 50 and row["Strategic Impact"] >= 4:
-                return "Buy"
-            elif row["Gap %"] >= 50 and row["Strategic Impact"] < 4:
-                return "Borrow"
-            return "Other"
-
-        chart_data["Quadrant"] = chart_data.apply(classify_quadrant, axis=1)
+        chart_data["Quadrant"] = strategy_engine.classify_quadrants(
+            chart_data["Gap %"], chart_data["Strategic Impact"], thresholds
+        )
         chart_data["Size"] = chart_data["Gap"].abs().clip(lower=1)
 
         fig = px.scatter(
@@ -174,4 +142,4 @@ def render_gap_management():
         st.error(f"Bubble plot failed: {e}")
 
     # Save final gap table
-    st.session_state["gap_management_output"] = df_gap
+    pipeline.publish("Workforce Strategy", gap_management_output=df_gap)
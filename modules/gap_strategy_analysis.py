@@ -46,7 +46,7 @@ def section_header(title: str):
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from modules import ui
+from modules import pipeline, strategy_engine, ui
 
 def inject_custom_styles():
     st.markdown("""
@@ -73,18 +73,6 @@ def section_header(title: str):
         </div>
     """, unsafe_allow_html=True)
 
-# 🔍 Strategy mapping logic
-def suggest_action(strategy, impact, gap):
-    if strategy == "Buy":
-        return "Hire externally (urgently)" if gap >= 50 else "Hire externally"
-    elif strategy == "Build":
-        return "Upskill internally (targeted programs)"
-    elif strategy == "Borrow":
-        return "Use contractors or redeploy from low-impact areas"
-    elif strategy == "Boost":
-        return "Monitor and retain existing staff"
-    return "No action required"
-
 def render_gap_strategy_analysis():
     inject_custom_styles()
     section_header("🧠 Intelligent Gap Strategy Prioritization")
@@ -94,33 +82,9 @@ def render_gap_strategy_analysis():
         return
 
     df = st.session_state["gap_management_output"].copy()
+    role_summary = strategy_engine.gap_strategy_table(df)
     df["Gap"] = df["Gap"].abs()
 
-    # Step 1: Identify peak year of gap per role
-    role_summary = df.groupby("Critical Role").agg({
-        "Gap": "sum",
-        "Strategic Impact": "mean",
-        "Final Strategy": "first"
-    }).reset_index()
-
-    peak_years = df.loc[df.groupby("Critical Role")["Gap"].idxmax()][["Critical Role", "Year"]]
-    role_summary = role_summary.merge(peak_years, on="Critical Role", how="left")
-    role_summary.rename(columns={"Gap": "Total Gap", "Year": "Peak Year"}, inplace=True)
-
-    # Step 2: AI-inspired action recommendation
-    role_summary["Recommended Action"] = role_summary.apply(
-        lambda row: suggest_action(row["Final Strategy"], row["Strategic Impact"], row["Total Gap"]),
-        axis=1
-    )
-
-    # Step 3: Priority Score 
-    role_summary["Priority Score"] = (
-        role_summary["Total Gap"] * 0.5 +
-        role_summary["Strategic Impact"] * 10
-    ).round(1)
-
-    role_summary = role_summary.sort_values(by="Priority Score", ascending=False)
-
     # Display strategy table
     st.subheader(" Recommended Strategic Actions by Role")
     st.dataframe(role_summary[[
@@ -137,5 +101,5 @@ def render_gap_strategy_analysis():
     st.plotly_chart(fig, use_container_width=True)
 
     # Save for action planning
-    st.session_state["gap_strategy_output"] = role_summary
+    pipeline.publish("Gap Strategy Analysis", gap_strategy_output=role_summary)
     
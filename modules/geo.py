@@ -0,0 +1,226 @@
+# modules/geo.py
+import bisect
+import csv
+import ipaddress
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+
+# Lookup service; {ip} is the client address. SELF_URL is used when the client
+# address is unknown or private (local runs), and resolves the server's own IP.
+GEO_IP_URL = os.getenv("GEO_IP_URL", "https://ipapi.co/{ip}/json/")
+GEO_SELF_URL = os.getenv("GEO_SELF_URL", "https://ipapi.co/json/")
+
+# Offline CIDR -> country table: CSV with "network" and "country_code" columns
+# (GeoLite2 "country_iso_code" is accepted too), networks not overlapping.
+GEO_IP_DB = os.getenv("GEO_IP_DB", os.path.join("data", "ip_country.csv"))
+
+CACHE_TTL = 24 * 3600     # seconds a resolved country is reused
+FAILURE_TTL = 300         # seconds before a failed lookup is retried
+CACHE_SIZE = 10_000       # client IPs kept in memory
+REQUEST_TIMEOUT = 3
+
+class CidrTable:
+    """
+    Sorted, non-overlapping IP ranges per address family. A lookup is one
+    binary search over the range starts.
+    """
+
+    def __init__(self, rows=()):
+        ranges = {4: [], 6: []}
+        for network, country in rows:
+            try:
+                net = ipaddress.ip_network(network.strip(), strict=False)
+            except ValueError:
+                continue
+            ranges[net.version].append((int(net.network_address), int(net.broadcast_address), country.strip().lower()))
+        self._starts, self._ends, self._codes = {}, {}, {}
+        for version, items in ranges.items():
+            items.sort()
+            self._starts[version] = [s for s, _, _ in items]
+            self._ends[version] = [e for _, e, _ in items]
+            self._codes[version] = [c for _, _, c in items]
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Loads a CIDR table; a missing file gives an empty table.
+        """
+        if not path or not os.path.isfile(path):
+            return cls()
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            country_col = "country_code" if "country_code" in (reader.fieldnames or []) else "country_iso_code"
+            return cls((row["network"], row.get(country_col) or "") for row in reader if row.get("network"))
+
+    def __len__(self):
+        return sum(len(s) for s in self._starts.values())
+
+    def lookup(self, ip):
+        """
+        Country code (lower case) of the range holding `ip`, or "".
+        """
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return ""
+        value = int(addr)
+        starts = self._starts[addr.version]
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= self._ends[addr.version][i]:
+            return self._codes[addr.version][i]
+        return ""
+
+def is_public(ip):
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+def fetch_country(url, timeout=REQUEST_TIMEOUT):
+    """
+    Blocking call to the lookup service. Returns the country code or "".
+    """
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    if response.status_code == 200:
+        return (response.json().get("country_code") or "").lower()
+    return ""
+
+class GeoResolver:
+    """
+    Client IP -> country code without blocking the caller. Results are cached
+    per IP for `ttl` seconds; a miss answers from the offline CIDR table and
+    queues a background lookup whose result later replaces it.
+    """
+
+    def __init__(self, url=GEO_IP_URL, self_url=GEO_SELF_URL, table=None, ttl=CACHE_TTL,
+                 failure_ttl=FAILURE_TTL, max_size=CACHE_SIZE, timeout=REQUEST_TIMEOUT,
+                 workers=2, fetch=fetch_country):
+        self.url = url
+        self.self_url = self_url
+        self.table = table if table is not None else CidrTable()
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self._fetch = fetch
+        self._cache = OrderedDict()  # key -> (country, expires_at), least recently used first
+        self._pending = {}           # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geo")
+        self.stats = {"hits": 0, "misses": 0, "offline": 0, "fetched": 0, "failed": 0}
+
+    def _key(self, ip):
+        # Private and unknown clients share the server's own lookup
+        return ip if ip and is_public(ip) else ""
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[0]
+
+    def _store(self, key, country, ttl):
+        self._cache[key] = (country, time.monotonic() + ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _resolve_remote(self, key):
+        url = self.url.format(ip=key) if key else self.self_url
+        try:
+            country = self._fetch(url, self.timeout)
+        except Exception:
+            country = ""
+        with self._lock:
+            if country:
+                self.stats["fetched"] += 1
+                self._store(key, country, self.ttl)
+            else:
+                # Keep the offline answer, but retry the service sooner
+                self.stats["failed"] += 1
+                self._store(key, self.table.lookup(key) if key else "", self.failure_ttl)
+            self._pending.pop(key, None)
+        return country
+
+    def prefetch(self, ip):
+        """
+        Starts a background lookup for `ip` unless it is cached or in flight.
+        Returns the Future, or None.
+        """
+        key = self._key(ip)
+        with self._lock:
+            if self._cached(key) is not None:
+                return None
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._resolve_remote, key)
+                self._pending[key] = future
+            return future
+
+    def resolve(self, ip, wait=0):
+        """
+        Country code for `ip` ("" if unknown). Never waits longer than `wait`
+        seconds on the network; until the background lookup lands the offline
+        table answers.
+        """
+        key = self._key(ip)
+        with self._lock:
+            country = self._cached(key)
+            if country is not None:
+                self.stats["hits"] += 1
+                return country
+            self.stats["misses"] += 1
+
+        future = self.prefetch(ip)
+        if future is not None and wait > 0:
+            try:
+                future.result(timeout=wait)
+            except Exception:
+                pass
+            with self._lock:
+                country = self._cached(key)
+            if country is not None:
+                return country
+
+        offline = self.table.lookup(key) if key else ""
+        if offline:
+            with self._lock:
+                self.stats["offline"] += 1
+        return offline
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+@st.cache_resource
+def get_resolver():
+    return GeoResolver(table=CidrTable.from_csv(GEO_IP_DB))
+
+def client_ip():
+    """
+    Address of the browser behind the current session, when Streamlit knows it.
+    """
+    try:
+        return st.context.ip_address
+    except Exception:
+        return None
+
+def country_for_session(wait=0):
+    """
+    Country code of the current session's client, from cache or the offline
+    table; the first call for an IP starts the network lookup in the background.
+    """
+    return get_resolver().resolve(client_ip(), wait=wait)
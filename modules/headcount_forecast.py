@@ -2,13 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-
-def linear_forecast(values, years):
-    x = np.array([int(y) for y in years])
-    y = np.array(values)
-    coef = np.polyfit(x, y, 1)
-    future_years = [int(years[-1]) + i for i in range(1, 5)]
-    return np.round(coef[0] * np.array(future_years) + coef[1], 2)
+from modules import forecast_engine, forecast_models, pipeline
 
 def render_critical_workforce_forecasting():
     st.markdown("## 👷 Critical Workforce Forecasting")
@@ -106,59 +100,41 @@ def render_critical_workforce_forecasting():
     </div>
     """, unsafe_allow_html=True)
 
-    results = []
+    model_name = st.selectbox(
+        "Driver KPI forecast model",
+        list(forecast_models.FORECAST_MODELS.keys()),
+        key="forecast_model"
+    )
 
-    for item in clean_drivers:
-        driver = item["Driver"]
-        if driver not in driver_role_weights:
-            continue
-
-        try:
-            elasticity = elasticity_df[elasticity_df["Driver"] == driver]["Elasticity"].values[0]
-        except:
-            continue
-
-        driver_vals = pd.Series(item["Driver_Values"])
-        valid_years = driver_vals.index.tolist()
-        forecasted_kpis = linear_forecast(driver_vals.values, valid_years)
-        base_kpi = np.mean(driver_vals.values)
-
-        for role, wt in driver_role_weights[driver].items():
-            func = role_func_map[role]
-            func_df = df_headcount[df_headcount["Function Unit"] == func]
-            if func_df.empty or func_df.shape[0] > 1:
-                continue
-
-            base_hc_vals = pd.to_numeric(func_df[headcount_years].iloc[0], errors="coerce")
-            base_hc = np.nanmean(base_hc_vals)
-            if base_hc <= 0 or np.isnan(base_hc):
-                continue
-
-            row = {
-                "Role": role,
-                "Function Unit": func,
-                "Driver": driver,
-                "Elasticity": round(elasticity, 3),
-                "Weight (%)": wt
-            }
-
-            for i, yr in enumerate(forecast_years):
-                kpi_val = forecasted_kpis[i]
-                growth = (kpi_val - base_kpi) / base_kpi
-                forecasted = base_hc * (1 + elasticity * growth) * (wt / 100.0)
-                row[f"KPI {yr}"] = round(kpi_val, 2)
-                row[f"Forecast {yr}"] = round(forecasted)
-
-            results.append(row)
-
-    df_results = pd.DataFrame(results)
+    driver_kpis = None
+    if model_name != "Linear":
+        series = {
+            item["Driver"]: (pd.Series(item["Driver_Values"]).values, pd.Series(item["Driver_Values"]).index.tolist())
+            for item in clean_drivers if item["Driver"] in driver_role_weights
+        }
+        driver_kpis, pending, errors = forecast_models.collect_forecasts(model_name, series)
+        for driver, err in errors.items():
+            st.error(f"❌ {model_name} fit failed for '{driver}': {err}")
+        if pending:
+            st.info(f"⏳ Fitting {model_name} for {len(pending)} driver(s) in the background.")
+            st.button("🔄 Refresh Forecast", key="refresh_forecast_models")
+            return
+
+    df_forecast = pipeline.run_stage(
+        "Critical Workforce Forecast", forecast_engine.forecast_critical_roles,
+        clean_drivers, elasticity_df, df_headcount, headcount_years,
+        role_func_map, driver_role_weights, driver_kpis=driver_kpis
+    )
+    df_results = forecast_engine.forecast_to_wide(df_forecast)
     if df_results.empty:
         st.info("No forecast generated. Check inputs.")
         return
 
     st.dataframe(df_results, use_container_width=True)
-    st.session_state["critical_role_forecast"] = df_results
-    st.session_state["scenario_planning_forecast"] = df_results
+    pipeline.publish(
+        "Critical Workforce Forecast",
+        critical_role_forecast=df_results, scenario_planning_forecast=df_results
+    )
 
     # Step 5: Summarize Forecast by Function Unit
     st.subheader("📊 Summarized Forecast by Function Unit")
@@ -170,16 +146,10 @@ def render_critical_workforce_forecasting():
     # Visualization (Modified: Summed by Role)
     st.subheader("📉 Forecasted Headcount by Role")
     try:
-        chart_df = df_results[["Role"] + forecast_cols]
-        summed_df = chart_df.groupby("Role")[forecast_cols].sum().reset_index()
-
-        melt_df = summed_df.melt(
-            id_vars="Role",
-            value_vars=forecast_cols,
-            var_name="Year",
-            value_name="Forecasted Headcount"
+        melt_df = (
+            df_forecast.groupby(["Year", "Role"])["Forecast"].sum()
+            .rename("Forecasted Headcount").reset_index()
         )
-        melt_df["Year"] = melt_df["Year"].str.extract(r"(\d{4})")
 
         fig = px.line(
             melt_df,
@@ -0,0 +1,117 @@
+# modules/http_cache.py
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from urllib.parse import urlencode
+
+HTTP_CACHE_FILE = os.getenv("HTTP_CACHE_FILE", os.path.join(".cache", "http_cache.sqlite"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 64 * 1024 ** 2))
+DEFAULT_TTL = 24 * 3600
+TOUCH_INTERVAL = 60       # seconds between last_used updates of an entry read often
+
+# Credentials sent as query parameters; never part of a cache key or stored URL
+SECRET_PARAMS = {"app_id", "app_key", "api_key", "key", "token"}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, url TEXT, body BLOB, etag TEXT, last_modified TEXT,
+        fetched_at REAL, expires_at REAL, last_used REAL, size INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+def cache_url(url, params=None):
+    """
+    `url` with its query parameters in a stable order, credentials removed.
+    """
+    public = sorted((k, str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+    return f"{url}{'&' if '?' in url else '?'}{urlencode(public)}" if public else url
+
+def cache_key(url, params=None):
+    return hashlib.sha256(cache_url(url, params).encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    HTTP response bodies in a SQLite file shared by every worker process
+    (WAL mode, so readers never wait on a writer). Entries keep their ETag /
+    Last-Modified for revalidation once `expires_at` has passed, and the
+    least recently used ones are evicted when bodies exceed `max_bytes`.
+    """
+
+    def __init__(self, path=None, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.path = path or HTTP_CACHE_FILE
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key):
+        """
+        The cached entry as a dict (body, etag, last_modified, expires_at,
+        fresh), or None. Marks the entry as recently used (at most every
+        TOUCH_INTERVAL seconds, so hot reads stay read-only).
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, expires_at, last_used FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[4] > TOUCH_INTERVAL:
+                with conn:
+                    conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        body, etag, last_modified, expires_at, _ = row
+        return {"body": body, "etag": etag, "last_modified": last_modified,
+                "expires_at": expires_at, "fresh": expires_at > now}
+
+    def put(self, key, url, body, ttl=DEFAULT_TTL, etag=None, last_modified=None):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, body, etag, last_modified, now, now + ttl, now, len(body))
+                )
+            self._evict(conn)
+
+    def refresh(self, key, ttl=DEFAULT_TTL):
+        """
+        Extends an entry the server confirmed unchanged (304).
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE responses SET expires_at = ?, last_used = ? WHERE key = ?", (now + ttl, now, key))
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the bodies fit again
+        doomed, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        with conn:
+            conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    def size(self):
+        """
+        (entries, bytes of cached bodies).
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
@@ -0,0 +1,246 @@
+# modules/kpi_engine.py
+import os
+import re
+import uuid
+from difflib import SequenceMatcher
+import pandas as pd
+
+from modules import pdf_engine
+
+KPI_CACHE_DIR = os.getenv("KPI_CACHE_DIR", os.path.join(".cache", "pdf_kpis"))
+MATCH_THRESHOLD = 0.75
+RECORD_COLUMNS = ["Page", "Label", "Year", "Value", "Source"]
+
+# Tables are trusted over a KPI sentence, which is trusted over a bare series
+SOURCE_PRIORITY = {"table": 0, "text": 1, "series": 2}
+
+YEAR = r"(?:19|20)\d{2}"
+NUMBER = r"[-+−]?\(?\d[\d,]*(?:\.\d+)?\)?\s?%?"
+YEAR_RE = re.compile(rf"^{YEAR}$")
+NUMBER_RE = re.compile(rf"^{NUMBER}$")
+# "Organic Growth 2024: 2.2%", "Sales (2023) 93,351 million"
+KPI_LINE_RE = re.compile(
+    rf"^(?P<label>[A-Za-z#&][^\d:]*?)\s*[(\[]?(?P<year>{YEAR})[)\]]?\s*[:=–-]?\s*(?P<value>{NUMBER})"
+    rf"(?:\s*(?:million|billion|bn|m|days))?\s*$",
+    re.IGNORECASE
+)
+SERIES_RE = re.compile(rf"^(?P<label>[A-Za-z#&][^\d]*?)\s+(?P<values>(?:{NUMBER}\s+)*{NUMBER})$")
+STOPWORDS = {"of", "the", "in", "no", "number", "total", "and", "by", "a", "to", "than"}
+
+def parse_number(text):
+    """
+    "12,345" -> 12345.0, "(3.1)" -> -3.1, "2.2%" -> 2.2; None if not a number.
+    """
+    text = str(text).strip().replace("−", "-").replace(" ", "")
+    if not NUMBER_RE.match(text):
+        return None
+    negative = text.startswith("(") and text.rstrip("%").endswith(")")
+    value = float(text.strip("()%+").replace(",", "").strip("()"))
+    return -value if negative else value
+
+def _clean_label(label):
+    return re.sub(r"\s+", " ", str(label or "")).strip(" :-–")
+
+def table_records(table, page):
+    """
+    KPI rows of one extracted table: a header row with years, then one row per
+    label with a number under each year.
+    """
+    records = []
+    header = None
+    for row in table:
+        cells = [(c or "").strip() for c in row]
+        year_cols = {i: c for i, c in enumerate(cells) if YEAR_RE.match(c)}
+        if len(year_cols) >= 2:
+            header = year_cols
+            continue
+        if header is None or not cells or not cells[0]:
+            continue
+        for i, year in header.items():
+            value = parse_number(cells[i]) if i < len(cells) else None
+            if value is not None:
+                records.append((page, _clean_label(cells[0]), int(year), value, "table"))
+    return records
+
+def text_records(text, page):
+    """
+    KPI sentences ("Organic Growth 2024: 2.2%") and numeric series under a
+    line of years ("2021 2022 2023 2024" / "On-Time In Full 91.2% ... 94.1%").
+    """
+    records = []
+    years = None
+    for line in (text or "").splitlines():
+        line = line.strip()
+        tokens = line.split()
+        if len(tokens) >= 2 and sum(bool(YEAR_RE.match(t)) for t in tokens) >= 2 \
+                and sum(bool(YEAR_RE.match(t)) for t in tokens) >= len(tokens) - 1:
+            years = [int(t) for t in tokens if YEAR_RE.match(t)]
+            continue
+        match = KPI_LINE_RE.match(line)
+        if match:
+            value = parse_number(match["value"])
+            if value is not None:
+                records.append((page, _clean_label(match["label"]), int(match["year"]), value, "text"))
+            continue
+        match = SERIES_RE.match(line) if years else None
+        if match:
+            values = re.findall(NUMBER, match["values"])
+            if len(values) == len(years):
+                for year, value in zip(years, values):
+                    records.append((page, _clean_label(match["label"]), year, parse_number(value), "series"))
+    return records
+
+def records_from_text(text):
+    """
+    KPI records from already extracted text (e.g. the annual_text of the PDF
+    upload page), without page numbers.
+    """
+    return pd.DataFrame(text_records(text, -1), columns=RECORD_COLUMNS)
+
+def page_lines(page, tolerance=3):
+    """
+    Text lines of a PyMuPDF page rebuilt from word positions: words whose
+    baselines are within `tolerance` points form one line, left to right.
+    This keeps a label and its numbers together even when they sit in
+    separate text blocks (columns of a series).
+    """
+    words = sorted(page.get_text("words"), key=lambda w: (w[3], w[0]))
+    lines, current, baseline = [], [], None
+    for word in words:
+        if baseline is not None and abs(word[3] - baseline) > tolerance:
+            lines.append(" ".join(w[4] for w in sorted(current, key=lambda w: w[0])))
+            current = []
+        if not current:
+            baseline = word[3]
+        current.append(word)
+    if current:
+        lines.append(" ".join(w[4] for w in sorted(current, key=lambda w: w[0])))
+    return "\n".join(lines)
+
+def extract_range_kpis(path, start, stop):
+    """
+    KPI records of pages [start, stop). Runs in a worker process. Text comes
+    from PyMuPDF; pdfplumber's table finder only runs on pages with vector
+    drawings, since ruled tables are built from those lines.
+    """
+    import fitz
+
+    records = []
+    table_pages = []
+    with fitz.open(path) as doc:
+        for i in range(start, stop):
+            page = doc[i]
+            records.extend(text_records(page_lines(page), i))
+            if page.get_drawings():
+                table_pages.append(i)
+
+    if table_pages:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            for i in table_pages:
+                page = pdf.pages[i]
+                for table in page.extract_tables():
+                    records.extend(table_records(table, i))
+                page.close()
+    return sorted(records, key=lambda r: r[0])
+
+def extract_kpis(path, workers=None, pages_per_task=pdf_engine.PAGES_PER_TASK):
+    """
+    KPI records for every page, extracted range by range in pdf_engine's
+    process pool (in-process for short documents or workers=1).
+    """
+    ranges = pdf_engine.page_ranges(pdf_engine.page_count(path), pages_per_task)
+    if workers == 1 or len(ranges) * pages_per_task < pdf_engine.PARALLEL_MIN_PAGES:
+        chunks = [extract_range_kpis(path, start, stop) for start, stop in ranges]
+    else:
+        # Shares pdf_engine's spawn-context pool
+        futures = pdf_engine.submit_all(extract_range_kpis, [(path, start, stop) for start, stop in ranges], workers)
+        chunks = [future.result() for future in futures]
+    return pd.DataFrame([r for chunk in chunks for r in chunk], columns=RECORD_COLUMNS)
+
+def kpi_records(path, digest=None, workers=None, cache_dir=None):
+    """
+    extract_kpis with an on-disk cache keyed by the PDF's SHA-256.
+    """
+    digest = digest or pdf_engine.file_sha256(path)
+    target = os.path.join(cache_dir or KPI_CACHE_DIR, f"{digest}.json")
+    if os.path.isfile(target):
+        return pd.read_json(target, orient="split")
+
+    records = extract_kpis(path, workers)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+    records.to_json(tmp_path, orient="split", index=False)
+    os.replace(tmp_path, target)
+    return records
+
+def _tokens(name):
+    name = re.sub(r"\([^)]*\)", " ", name.lower())   # units such as "(%)" or "(# of days)"
+    words = re.findall(r"[a-z0-9&]+", name.replace("e-", "e"))
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in STOPWORDS]
+
+def match_score(label, driver):
+    """
+    Similarity of a report label and a driver name in [0, 1]: the better of
+    token overlap (Dice) and character-level similarity of the normalised names.
+    """
+    a, b = _tokens(label), _tokens(driver)
+    if not a or not b:
+        return 0.0
+    dice = 2 * len(set(a) & set(b)) / (len(set(a)) + len(set(b)))
+    return max(dice, SequenceMatcher(None, " ".join(a), " ".join(b)).ratio())
+
+def match_drivers(labels, drivers, threshold=MATCH_THRESHOLD):
+    """
+    Best driver for every distinct label scoring at least `threshold`.
+    Returns {label: (driver, score)}.
+    """
+    matches = {}
+    for label in set(labels):
+        scored = [(match_score(label, d), d) for d in drivers]
+        if scored:
+            score, driver = max(scored)
+            if score >= threshold:
+                matches[label] = (driver, round(score, 3))
+    return matches
+
+def driver_history(records, drivers, years, threshold=MATCH_THRESHOLD):
+    """
+    Matched KPI values per driver and year, in the business_driver_table
+    layout. Where a report states a value more than once, tables win over
+    sentences and series, then the earliest page. Returns (table, matches)
+    where `matches` lists every record kept.
+    """
+    years = [str(y) for y in years]
+    matches = match_drivers(records["Label"].unique(), drivers, threshold)
+    found = records[records["Label"].isin(matches) & records["Year"].astype(str).isin(years)].copy()
+    found["Business Driver"] = found["Label"].map(lambda l: matches[l][0])
+    found["Match Score"] = found["Label"].map(lambda l: matches[l][1])
+    found["Year"] = found["Year"].astype(str)
+    found["Priority"] = found["Source"].map(SOURCE_PRIORITY)
+    found = (found.sort_values(["Priority", "Match Score", "Page"], ascending=[True, False, True], kind="stable")
+             .drop_duplicates(["Business Driver", "Year"])
+             .sort_values(["Business Driver", "Year"]))
+
+    table = found.pivot(index="Business Driver", columns="Year", values="Value").reindex(columns=years)
+    table = table.reset_index().rename_axis(columns=None)
+    kept = found[["Business Driver", "Year", "Value", "Label", "Page", "Source", "Match Score"]]
+    return table, kept.reset_index(drop=True)
+
+def _as_cell(value):
+    # Cells of the driver editor hold text, as typed by users
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def prefill_driver_table(df_drivers, history):
+    """
+    Fills blank cells of a business_driver_table from driver_history; values
+    already typed in are kept.
+    """
+    df = df_drivers.copy()
+    lookup = history.set_index("Business Driver")
+    for year in [c for c in df.columns if c != "Business Driver" and c in lookup.columns]:
+        extracted = df["Business Driver"].map(lookup[year].dropna().map(_as_cell))
+        blank = df[year].isna() | (df[year].astype(str).str.strip() == "")
+        df[year] = df[year].astype(object).where(~(blank & extracted.notna()), extracted)
+    return df
@@ -1,23 +1,259 @@
 # modules/logger.py
 
+import atexit
 import csv
-from datetime import datetime
 import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# Access log location; point ACCESS_LOG_FILE at a shared folder in production
+LOG_FILE = os.getenv("ACCESS_LOG_FILE", os.path.join(".cache", "access_log.csv"))
+# "csv", "parquet" or "sqlite"; by default taken from the LOG_FILE extension
+LOG_SINK = os.getenv("ACCESS_LOG_SINK", "")
+
+LOG_COLUMNS = ["Email", "DateTime", "Page"]
+
+FLUSH_INTERVAL = 2.0         # seconds between background flushes
+BATCH_SIZE = 500             # rows that trigger an early flush
+MAX_BYTES = 10 * 1024 ** 2   # CSV size before rotation
+BACKUP_COUNT = 5             # rotated CSV files kept
+MAX_PENDING = 50_000         # rows held back while the sink is unreachable
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock on `path`.lock shared by every process appending to `path`.
+    """
+    with open(path + ".lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def rotated_path(path, n):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{n}{ext}"
+
+def rotated_files(path, backup_count=BACKUP_COUNT):
+    """
+    Existing log files, oldest first: access_log.5.csv ... access_log.1.csv, access_log.csv.
+    """
+    paths = [rotated_path(path, n) for n in range(backup_count, 0, -1)] + [path]
+    return [p for p in paths if os.path.isfile(p)]
+
+class CsvSink:
+    """
+    Appends rows under a file lock, so several processes can share one file,
+    and rotates it once it grows past `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def _rotate(self):
+        for n in range(self.backup_count - 1, 0, -1):
+            if os.path.isfile(rotated_path(self.path, n)):
+                os.replace(rotated_path(self.path, n), rotated_path(self.path, n + 1))
+        if self.backup_count > 0:
+            os.replace(self.path, rotated_path(self.path, 1))
+        else:
+            os.remove(self.path)
+
+    def write(self, rows):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with file_lock(self.path):
+            size = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+            if self.max_bytes and size >= self.max_bytes:
+                self._rotate()
+                size = 0
+            with open(self.path, mode="a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if size == 0:
+                    writer.writerow(LOG_COLUMNS)
+                writer.writerows(rows)
+
+class ParquetSink:
+    """
+    Writes each batch as its own part file in a `<name>.parquet` folder; part
+    names are unique per process, so concurrent writers never collide.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.path, exist_ok=True)
+        table = pa.table({name: [str(r[i]) for r in rows] for i, name in enumerate(LOG_COLUMNS)})
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name))
 
-#  Define the full path to the folder
-LOG_FILE = r"C:\Users\GHOSEIKW\NESTLE\PA Solutions Innovation and Data Science - Documents\Projects\eQ8-SWP Piloting\access_log.csv"
+class SqliteSink:
+    """
+    Inserts each batch in one transaction; SQLite serialises writers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS access_log (email TEXT, datetime TEXT, page TEXT)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def write(self, rows):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT INTO access_log VALUES (?, ?, ?)", rows)
+        finally:
+            conn.close()
+
+SINKS = {"csv": CsvSink, "parquet": ParquetSink, "sqlite": SqliteSink}
+
+def make_sink(path=None, kind=None):
+    path = path or LOG_FILE
+    kind = (kind or LOG_SINK).lower()
+    if not kind:
+        ext = os.path.splitext(path)[1].lower()
+        kind = {".parquet": "parquet", ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite"}.get(ext, "csv")
+    if kind not in SINKS:
+        raise ValueError(f"❌ Unknown log sink '{kind}'. Choose from {', '.join(SINKS)}.")
+    return SINKS[kind](path)
+
+class AccessLogWriter:
+    """
+    Background thread that drains a queue of rows and writes them in batches,
+    every `flush_interval` seconds or once `batch_size` rows are waiting.
+    Rows that fail to write are kept (up to MAX_PENDING) and retried.
+    """
+
+    def __init__(self, sink, flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._pending = []
+        self._logged = 0
+        self._written = 0
+        self._done = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+
+    def log(self, row):
+        with self._done:
+            self._logged += 1
+        self._queue.put(row)
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        try:
+            self.sink.write(self._pending)
+            written, self._pending = len(self._pending), []
+        except Exception as e:
+            print(f"[LOGGING ERROR] Could not write to log file: {e}")
+            written = max(0, len(self._pending) - MAX_PENDING)
+            del self._pending[:written]  # dropped rows count as done
+        with self._done:
+            self._written += written
+            self._done.notify_all()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            # None is the wake-up sent by flush() and close()
+            force = False
+            timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+                while True:
+                    if row is None:
+                        force = True
+                    else:
+                        self._pending.append(row)
+                    row = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            stopping = self._stop.is_set()
+            if force or stopping or len(self._pending) >= self.batch_size \
+                    or time.monotonic() - last_flush >= self.flush_interval:
+                self._write_pending()
+                last_flush = time.monotonic()
+            if stopping and self._queue.empty():
+                return
+
+    def flush(self, timeout=10):
+        """
+        Writes everything logged so far now; False if it is not written
+        within `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        with self._done:
+            target = self._logged
+        self._queue.put(None)
+        with self._done:
+            while self._written < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        self._stop.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AccessLogWriter(make_sink())
+            atexit.register(_writer.close)
+        return _writer
 
 def log_access(email, page=None):
+    """
+    Queues one access row; the background writer appends it to LOG_FILE.
+    """
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_accessed = page if page else "Login"
-
-    file_exists = os.path.isfile(LOG_FILE)
-
     try:
-        with open(LOG_FILE, mode='a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["Email", "DateTime", "Page"])
-            writer.writerow([email, now, page_accessed])
+        get_writer().log([email, now, page_accessed])
     except Exception as e:
-        print(f"[LOGGING ERROR] Could not write to log file: {e}")
+        print(f"[LOGGING ERROR] Could not queue log row: {e}")
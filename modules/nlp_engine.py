@@ -0,0 +1,268 @@
+# modules/nlp_engine.py
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextlib import closing
+import pandas as pd
+import spacy
+from spacy.language import Language
+from spacy.matcher import Matcher
+from spacy.tokens import Span
+from spacy.util import filter_spans
+
+from modules import kpi_engine, pdf_engine
+
+NLP_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+REPORT_INDEX = os.getenv("REPORT_INDEX_FILE", os.path.join(".cache", "report_index.sqlite"))
+BATCH_SIZE = 32
+PARALLEL_MIN_PAGES = 200     # nlp.pipe runs in-process below this
+MAX_PROCESSES = 4
+SNIPPET_CHARS = 240
+
+CURRENCIES = ["chf", "usd", "eur", "gbp", "$", "€", "£"]
+SCALES = ["thousand", "million", "billion", "bn", "m", "mn"]
+MENTION_PATTERNS = {
+    "MONEY": [
+        [{"LOWER": {"IN": CURRENCIES}}, {"LIKE_NUM": True}, {"LOWER": {"IN": SCALES}, "OP": "?"}],
+        [{"LIKE_NUM": True}, {"LOWER": {"IN": SCALES}, "OP": "?"}, {"LOWER": {"IN": CURRENCIES}}]
+    ],
+    "PERCENT": [
+        [{"LIKE_NUM": True}, {"ORTH": "%"}],
+        [{"LIKE_NUM": True}, {"LOWER": {"IN": ["percent", "pct"]}}],
+        [{"LIKE_NUM": True}, {"LOWER": "per"}, {"LOWER": "cent"}]
+    ]
+}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS reports (
+        report_id INTEGER PRIMARY KEY, sha256 TEXT UNIQUE, name TEXT, year INTEGER,
+        pages INTEGER, model TEXT, indexed_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS pages (
+        report_id INTEGER, page INTEGER, text TEXT, PRIMARY KEY (report_id, page)
+    );
+    CREATE TABLE IF NOT EXISTS postings (
+        term TEXT, report_id INTEGER, page INTEGER, tf INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+    CREATE TABLE IF NOT EXISTS mentions (
+        report_id INTEGER, page INTEGER, label TEXT, text TEXT, value REAL
+    );
+    CREATE INDEX IF NOT EXISTS mentions_report ON mentions (report_id, page);
+"""
+
+class MentionTagger:
+    """
+    Tags money and percent mentions in doc.spans["mentions"]. Works on a blank
+    pipeline, so mentions are found even when no trained model is installed.
+    A class rather than a closure so the pipeline pickles into worker processes.
+    """
+
+    def __init__(self, vocab):
+        self.matcher = Matcher(vocab)
+        for label, patterns in MENTION_PATTERNS.items():
+            self.matcher.add(label, patterns)
+
+    def __call__(self, doc):
+        spans = [Span(doc, start, end, label=match_id) for match_id, start, end in self.matcher(doc)]
+        doc.spans["mentions"] = filter_spans(spans)
+        return doc
+
+@Language.factory("money_percent_mentions")
+def create_mention_matcher(nlp, name):
+    return MentionTagger(nlp.vocab)
+
+_PIPELINES = {}
+
+def load_nlp(model=None):
+    """
+    The spaCy pipeline used for report text: `model` (SPACY_MODEL) without the
+    parser, or a blank English pipeline when the model is not installed.
+    """
+    model = model or NLP_MODEL
+    if model not in _PIPELINES:
+        try:
+            nlp = spacy.load(model, exclude=["parser", "lemmatizer"])
+        except OSError:
+            nlp = spacy.blank("en")
+        nlp.add_pipe("money_percent_mentions", last=True)
+        _PIPELINES[model] = nlp
+    return _PIPELINES[model]
+
+def pipeline_name(nlp):
+    return f"{nlp.meta.get('lang', 'en')}_{nlp.meta.get('name', 'pipeline')}"
+
+def terms_of(doc):
+    """
+    Lower-cased index terms: every token except punctuation, spaces and stop words.
+    """
+    return [t.lower_ for t in doc if not (t.is_punct or t.is_space or t.is_stop)]
+
+def analyse_pages(texts, nlp=None, batch_size=BATCH_SIZE, n_process=1):
+    """
+    Runs nlp.pipe over page texts. Yields one dict per page with term counts,
+    named entities (when the pipeline has NER) and money / percent mentions.
+    With n_process > 1 contiguous chunks of pages run in pdf_engine's
+    spawn-context pool instead of nlp.pipe's own (forking) processes.
+    """
+    nlp = nlp or load_nlp()
+    if n_process > 1:
+        yield from _analyse_in_pool(list(texts), nlp, batch_size, n_process)
+        return
+    for doc in nlp.pipe(texts, batch_size=batch_size):
+        mentions = [(s.label_, s.text, _mention_value(s)) for s in doc.spans["mentions"]]
+        mentions += [(e.label_, e.text, _mention_value(e) if e.label_ in ("MONEY", "PERCENT") else None)
+                     for e in doc.ents if not any(e.start < s.end and s.start < e.end for s in doc.spans["mentions"])]
+        yield {"terms": Counter(terms_of(doc)), "mentions": mentions}
+
+def analyse_chunk(nlp, texts, batch_size):
+    """
+    analyse_pages for one chunk of pages. Runs in a worker process.
+    """
+    return list(analyse_pages(texts, nlp, batch_size))
+
+def _analyse_in_pool(texts, nlp, batch_size, n_process):
+    size = max(batch_size, math.ceil(len(texts) / n_process))
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    futures = pdf_engine.submit_all(analyse_chunk, [(nlp, chunk, batch_size) for chunk in chunks], n_process)
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def _mention_value(span):
+    numbers = [t for t in span if t.like_num]
+    return kpi_engine.parse_number(numbers[0].text) if numbers else None
+
+def open_index(path=None):
+    path = path or REPORT_INDEX
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def guess_year(*texts):
+    """
+    Latest plausible report year in a file name or text, or None.
+    """
+    years = [int(y) for text in texts for y in re.findall(r"\b((?:19|20)\d{2})\b", text or "")]
+    years = [y for y in years if y <= time.localtime().tm_year]
+    return max(years) if years else None
+
+def index_report(page_texts, sha256, name, year=None, path=None, nlp=None, batch_size=BATCH_SIZE, n_process=None):
+    """
+    Adds a report's pages to the persistent inverted index. A report already
+    indexed (same SHA-256) is skipped. Long reports are analysed in several
+    (spawned) processes unless `n_process` says otherwise.
+    Returns (report_id, newly indexed).
+    """
+    nlp = nlp or load_nlp()
+    page_texts = list(page_texts)
+    if n_process is None:
+        n_process = min(MAX_PROCESSES, os.cpu_count() or 1) if len(page_texts) >= PARALLEL_MIN_PAGES else 1
+    with closing(open_index(path)) as conn:
+        row = conn.execute("SELECT report_id FROM reports WHERE sha256 = ?", (sha256,)).fetchone()
+        if row:
+            return row[0], False
+
+        postings, mentions = [], []
+        for page, result in enumerate(analyse_pages(page_texts, nlp, batch_size, n_process)):
+            postings.extend((term, page, tf) for term, tf in result["terms"].items())
+            mentions.extend((page, label, text, value) for label, text, value in result["mentions"])
+
+        with conn:
+            # Another session may have indexed the same report meanwhile; the
+            # insert takes the write lock, so only one of them adds the pages
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO reports (sha256, name, year, pages, model, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, name, year, len(page_texts), pipeline_name(nlp), time.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            if cursor.rowcount == 0:
+                row = conn.execute("SELECT report_id FROM reports WHERE sha256 = ?", (sha256,)).fetchone()
+                return row[0], False
+            report_id = cursor.lastrowid
+            conn.executemany("INSERT INTO pages VALUES (?, ?, ?)",
+                             [(report_id, page, text) for page, text in enumerate(page_texts)])
+            conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)",
+                             [(term, report_id, page, tf) for term, page, tf in postings])
+            conn.executemany("INSERT INTO mentions VALUES (?, ?, ?, ?, ?)",
+                             [(report_id, *m) for m in mentions])
+    return report_id, True
+
+def remove_report(report_id, path=None):
+    with closing(open_index(path)) as conn, conn:
+        for table in ("postings", "mentions", "pages", "reports"):
+            conn.execute(f"DELETE FROM {table} WHERE report_id = ?", (report_id,))
+
+def indexed_reports(path=None):
+    with closing(open_index(path)) as conn:
+        return pd.read_sql_query(
+            "SELECT report_id, name AS Report, year AS Year, pages AS Pages, model AS Model, "
+            "indexed_at AS Indexed FROM reports ORDER BY year, name", conn
+        )
+
+def _normalise(text):
+    return " " + re.sub(r"[^0-9a-z%]+", " ", text.lower()).strip() + " "
+
+def _snippet(text, query, terms, width=SNIPPET_CHARS):
+    # Centre on the phrase, else on the longest term found
+    lower = text.lower()
+    hits = [lower.find(t) for t in [query.lower()] + sorted(terms, key=len, reverse=True) if t in lower]
+    start = max(0, hits[0] - width // 3) if hits else 0
+    snippet = re.sub(r"\s+", " ", text[start:start + width]).strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(text) else "")
+
+def search(query, path=None, limit=20, nlp=None):
+    """
+    Pages containing every query term, ranked by tf-idf with a boost when the
+    query appears as a phrase. Returns Report, Year, Page (1-based), Score,
+    Snippet and the page's money / percent mentions.
+    """
+    columns = ["Report", "Year", "Page", "Score", "Snippet", "Mentions"]
+    nlp = nlp or load_nlp()
+    doc = nlp.make_doc(query)
+    terms = list(dict.fromkeys(terms_of(doc)))  # stop words are not indexed
+    if not terms:
+        return pd.DataFrame(columns=columns)
+
+    with closing(open_index(path)) as conn:
+        n_pages = conn.execute("SELECT COALESCE(SUM(pages), 0) FROM reports").fetchone()[0]
+        marks = ",".join("?" * len(terms))
+        df = dict(conn.execute(
+            f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+        ).fetchall())
+        if len(df) < len(terms):
+            return pd.DataFrame(columns=columns)
+
+        idf = {t: math.log((n_pages + 1) / (df[t] + 0.5)) for t in terms}
+        weight = " + ".join(f"CASE term WHEN ? THEN tf * {idf[t]!r} ELSE 0 END" for t in terms)
+        hits = conn.execute(
+            f"SELECT report_id, page, SUM({weight}) AS score FROM postings WHERE term IN ({marks}) "
+            f"GROUP BY report_id, page HAVING COUNT(DISTINCT term) = ? ORDER BY score DESC LIMIT ?",
+            terms + terms + [len(terms), max(limit * 5, 100)]
+        ).fetchall()
+        if not hits:
+            return pd.DataFrame(columns=columns)
+
+        phrase = _normalise(query)
+        rows = []
+        for report_id, page, score in hits:
+            name, year, text = conn.execute(
+                "SELECT r.name, r.year, p.text FROM pages p JOIN reports r USING (report_id) "
+                "WHERE p.report_id = ? AND p.page = ?", (report_id, page)
+            ).fetchone()
+            if len(terms) > 1 and phrase.strip() and phrase in _normalise(text):
+                score *= 2
+            found = conn.execute(
+                "SELECT text FROM mentions WHERE report_id = ? AND page = ? LIMIT 10", (report_id, page)
+            ).fetchall()
+            rows.append((name, year, page + 1, round(score, 3), _snippet(text, query, terms), ", ".join(m[0] for m in found)))
+
+    results = pd.DataFrame(rows, columns=columns)
+    return results.sort_values(["Score", "Year"], ascending=[False, False], kind="stable").head(limit).reset_index(drop=True)
@@ -0,0 +1,40 @@
+# modules/page_registry.py
+import importlib
+from collections import OrderedDict
+
+# Page title -> "module:render function". Modules are imported the first time
+# their page is selected, so a cold start only pays for the landing page.
+PAGES = OrderedDict({
+    "Landing Page": "modules.landing_page:render_landing_page",
+    "Annual Reports": "modules.pdf_parser:render_pdf_upload",
+    "Business Demand Driver": "modules.driver_definition:render_driver_definition",
+    "Workforce Data Insights": "modules.workforce_model:render_headcount_input",
+    "Workforce Correlation": "modules.business_correlation:render_driver_headcount_correlation",
+    "Elasticity Modeling": "modules.elasticity_modeling:render_elasticity_modeling",
+    "Critical Workforce Forecast": "modules.headcount_forecast:render_critical_workforce_forecasting",
+    "Scenario Planning": "modules.scenario_planning:render_scenario_planning",
+    "Gap Analysis": "modules.gap_analysis:render_gap_analysis",
+    "Workforce Strategy": "modules.gap_management:render_gap_management",
+    "Gap Strategy Analysis": "modules.gap_strategy_analysis:render_gap_strategy_analysis",
+    "Action Planning": "modules.action_planning:render_action_planning"
+})
+
+# Pages only offered to auth.ADMIN_EMAILS
+ADMIN_PAGES = OrderedDict({
+    "Usage Analytics": "modules.usage_analytics:render_usage_analytics"
+})
+
+_LOADED = {}
+
+def load_page(title):
+    """
+    Returns the render function for a page title, importing its module on
+    first use.
+    """
+    if title not in _LOADED:
+        module_name, func_name = {**PAGES, **ADMIN_PAGES}[title].split(":")
+        _LOADED[title] = getattr(importlib.import_module(module_name), func_name)
+    return _LOADED[title]
+
+def render_page(title):
+    load_page(title)()
@@ -0,0 +1,168 @@
+# modules/pdf_engine.py
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(".cache", "pdf_text"))
+PAGES_PER_TASK = 16          # pages extracted by one worker call
+SPOOL_CHUNK = 1024 * 1024    # bytes copied per read when spooling an upload
+PARALLEL_MIN_PAGES = 48      # smaller documents are extracted in-process
+
+def spool_upload(file, directory=None, chunk_size=SPOOL_CHUNK):
+    """
+    Copies an uploaded file-like object to a temporary .pdf in chunks, hashing
+    it on the way. Returns (path, sha256 hex digest); the caller removes the file.
+    """
+    digest = hashlib.sha256()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    with os.fdopen(fd, "wb") as out:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return path, digest.hexdigest()
+
+def file_sha256(path, chunk_size=SPOOL_CHUNK):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def page_count(path):
+    import fitz
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def page_ranges(n_pages, size=PAGES_PER_TASK):
+    return [(start, min(start + size, n_pages)) for start in range(0, n_pages, size)]
+
+_EXECUTORS = {}
+_LOCK = threading.Lock()
+
+def get_executor(max_workers=None, reset=False):
+    """
+    Lazily started process pool for PDF work, one per worker count and
+    reused across uploads. "spawn" avoids forking the threaded Streamlit
+    server, as in forecast_models.
+    """
+    with _LOCK:
+        if reset and max_workers in _EXECUTORS:
+            _EXECUTORS.pop(max_workers).shutdown(wait=False, cancel_futures=True)
+        if max_workers not in _EXECUTORS:
+            _EXECUTORS[max_workers] = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _EXECUTORS[max_workers]
+
+def submit_all(fn, calls, max_workers=None):
+    """
+    Submits fn(*args) for every args tuple to the shared pool, restarting
+    the pool once if an earlier worker crash left it broken.
+    """
+    try:
+        executor = get_executor(max_workers)
+        return [executor.submit(fn, *args) for args in calls]
+    except BrokenProcessPool:
+        executor = get_executor(max_workers, reset=True)
+        return [executor.submit(fn, *args) for args in calls]
+
+def extract_range(path, start, stop):
+    """
+    Text of pages [start, stop). Runs in a worker process, which opens its own
+    handle on the file.
+    """
+    import fitz
+
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+def extract_pages(path, workers=None, pages_per_task=PAGES_PER_TASK):
+    """
+    Yields (page number, text) in page order. Page ranges are extracted in a
+    process pool and handed out as soon as each range, in order, is done;
+    short documents (or workers=1) are read page by page in-process.
+    """
+    import fitz
+
+    with fitz.open(path) as doc:
+        n_pages = doc.page_count
+        if workers == 1 or n_pages < PARALLEL_MIN_PAGES:
+            for i in range(n_pages):
+                yield i, doc[i].get_text()
+            return
+
+    ranges = page_ranges(n_pages, pages_per_task)
+
+    futures = submit_all(extract_range, [(path, start, stop) for start, stop in ranges], workers)
+    try:
+        for (start, _), future in zip(ranges, futures):
+            yield from enumerate(future.result(), start)
+    finally:
+        for future in futures:
+            future.cancel()
+
+def cache_path(digest, cache_dir=None):
+    return os.path.join(cache_dir or PDF_CACHE_DIR, f"{digest}.jsonl")
+
+def cached_pages(digest, cache_dir=None):
+    """
+    Yields (page number, text) from the text cache, or nothing if the PDF has
+    not been extracted before.
+    """
+    path = cache_path(digest, cache_dir)
+    if not os.path.isfile(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["page"], record["text"]
+
+def iter_pdf_pages(path, digest=None, workers=None, cache_dir=None):
+    """
+    Yields (page number, text, n_pages) for a PDF on disk. A PDF seen before
+    (same SHA-256) is read back from the cache; otherwise pages are extracted
+    in parallel and written to the cache, which is only published once
+    every page is in.
+    """
+    digest = digest or file_sha256(path)
+    target = cache_path(digest, cache_dir)
+    if os.path.isfile(target):
+        pages = list(cached_pages(digest, cache_dir))
+        for page, text in pages:
+            yield page, text, len(pages)
+        return
+
+    n_pages = page_count(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for page, text in extract_pages(path, workers):
+                f.write(json.dumps({"page": page, "text": text}) + "\n")
+                yield page, text, n_pages
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def pdf_text(path, digest=None, workers=None, cache_dir=None):
+    """
+    Whole-document text, pages joined by newlines (the old render_pdf_upload output).
+    """
+    return "\n".join(text for _, text, _ in iter_pdf_pages(path, digest, workers, cache_dir))
+
+def clear_cache(cache_dir=None):
+    shutil.rmtree(cache_dir or PDF_CACHE_DIR, ignore_errors=True)
@@ -1,16 +1,88 @@
 # modules/pdf_parser.py
+import os
+import time
 import streamlit as st
-import fitz
+from modules import nlp_engine, pdf_engine
+
+PREVIEW_CHARS = 3000
 
 def render_pdf_upload():
     st.header("📄 Upload Nestlé Annual Report (PDF)")
     file = st.file_uploader("Upload PDF", type="pdf")
-    
+
     if file:
-        doc = fitz.open(stream=file.read(), filetype="pdf")
-        full_text = "\n".join([page.get_text() for page in doc])
-        st.session_state["annual_text"] = full_text
+        # Reruns keep the text of the upload already processed
+        if st.session_state.get("annual_pdf_id") != file.file_id:
+            path, digest = pdf_engine.spool_upload(file)
+            progress = st.progress(0.0, text="Extracting text...")
+            preview = st.empty()
+            texts = []
+            try:
+                for page, text, n_pages in pdf_engine.iter_pdf_pages(path, digest):
+                    texts.append(text)
+                    if (page + 1) % pdf_engine.PAGES_PER_TASK == 0 or page + 1 == n_pages:
+                        progress.progress((page + 1) / n_pages, text=f"Extracted {page + 1} of {n_pages} pages")
+                        preview.text("\n".join(texts)[:PREVIEW_CHARS])
+            except Exception as e:
+                st.error(f"❌ Could not read the PDF: {e}")
+                return
+            finally:
+                os.remove(path)
+            progress.empty()
+            preview.empty()
+
+            st.session_state["annual_text"] = "\n".join(texts)
+            st.session_state["annual_pages"] = texts
+            st.session_state["annual_pdf_id"] = file.file_id
+            st.session_state["annual_pdf_sha256"] = digest
+
+        full_text = st.session_state["annual_text"]
         st.success("PDF uploaded and text extracted.")
 
         with st.expander("Preview Extracted Text"):
-            st.text(full_text[:3000])
+            st.text(full_text[:PREVIEW_CHARS])
+
+        with st.expander("📚 Add to Report Index"):
+            name = st.text_input("Report name", value=os.path.splitext(file.name)[0])
+            year = st.number_input("Report year", min_value=1900, max_value=2100, step=1,
+                                   value=nlp_engine.guess_year(file.name, full_text[:PREVIEW_CHARS]) or 2024)
+            if st.button("📚 Index Report"):
+                with st.spinner("Running the NLP pipeline over every page..."):
+                    _, added = nlp_engine.index_report(
+                        st.session_state["annual_pages"], st.session_state["annual_pdf_sha256"], name, int(year)
+                    )
+                if added:
+                    st.success(f"✅ {name} added to the report index.")
+                else:
+                    st.info("ℹ️ This report is already in the index.")
+
+    render_report_search()
+
+def render_report_search():
+    st.subheader("🔎 Search Annual Reports")
+    reports = nlp_engine.indexed_reports()
+    if reports.empty:
+        st.info("ℹ️ No reports indexed yet. Upload a report and add it to the index.")
+        return
+    st.caption(f"{len(reports)} reports, {int(reports['Pages'].sum()):,} pages indexed "
+               f"({reports['Year'].min()}–{reports['Year'].max()})")
+
+    query = st.text_input("Search all indexed reports", placeholder="e.g. e-commerce growth")
+    if query:
+        start = time.perf_counter()
+        results = nlp_engine.search(query, limit=50)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if results.empty:
+            st.warning(f"⚠️ No page mentions every word of '{query}'.")
+        else:
+            st.caption(f"{len(results)} pages in {elapsed_ms:.0f} ms")
+            st.dataframe(results, use_container_width=True)
+
+    with st.expander("Indexed Reports"):
+        st.dataframe(reports.drop(columns="report_id"), use_container_width=True)
+        labels = {row.report_id: f"{row.Report} ({row.Year})" for row in reports.itertuples()}
+        report_id = st.selectbox("Report", options=list(labels), format_func=labels.get, key="remove_report_id")
+        if st.button("🗑️ Remove from Index"):
+            nlp_engine.remove_report(report_id)
+            st.toast(f"✅ {labels[report_id]} removed from the report index.")
+            st.rerun()
@@ -0,0 +1,176 @@
+# modules/pipeline.py
+import hashlib
+import pickle
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Page -> session keys it reads from upstream pages and the artifacts it
+# publishes, in page order. Widget state and per-page settings (mappings,
+# role weights, scores) are not artifacts and survive invalidation.
+STAGES = OrderedDict({
+    "Business Demand Driver": {
+        "inputs": [],
+        "outputs": ["business_driver_table", "driver_years"]
+    },
+    "Workforce Data Insights": {
+        "inputs": [],
+        "outputs": ["headcount_table", "headcount_years"]
+    },
+    "Workforce Correlation": {
+        "inputs": ["business_driver_table", "headcount_table", "headcount_years"],
+        "outputs": ["clean_driver_data"]
+    },
+    "Elasticity Modeling": {
+        "inputs": ["clean_driver_data"],
+        "outputs": ["elasticity_table", "function_impact_mapping", "insight_narratives"]
+    },
+    "Critical Workforce Forecast": {
+        "inputs": ["clean_driver_data", "elasticity_table", "headcount_table", "headcount_years"],
+        "outputs": ["critical_role_forecast", "scenario_planning_forecast"]
+    },
+    "Scenario Planning": {
+        "inputs": ["scenario_planning_forecast"],
+        "outputs": ["scenario_planning_output", "scenario_plan_role_table", "scenario_plan_role_detailed",
+                    "scenario_assumptions", "scenario_monte_carlo", "scenario_sweep"]
+    },
+    "Gap Analysis": {
+        "inputs": ["scenario_plan_role_table", "scenario_planning_forecast", "scenario_assumptions"],
+        "outputs": ["workforce_role_gap_table"]
+    },
+    "Workforce Strategy": {
+        "inputs": ["workforce_role_gap_table"],
+        "outputs": ["gap_management_output"]
+    },
+    "Gap Strategy Analysis": {
+        "inputs": ["gap_management_output"],
+        "outputs": ["gap_strategy_output"]
+    },
+    "Action Planning": {
+        "inputs": ["gap_strategy_output"],
+        "outputs": ["action_plan_table"]
+    }
+})
+
+MEMO_KEY = "_pipeline_memo"
+HASHES_KEY = "_pipeline_hashes"
+
+def _update(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(b"frame")
+        h.update(repr([(str(c), str(t)) for c, t in value.dtypes.items()]).encode("utf-8"))
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts)
+            h.update(pickle.dumps(value))
+    elif isinstance(value, pd.Series):
+        h.update(b"series" + repr((value.name, str(value.dtype))).encode("utf-8"))
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            h.update(pickle.dumps(value))
+    elif isinstance(value, np.ndarray):
+        h.update(b"array" + repr((value.dtype.str, value.shape)).encode("utf-8"))
+        if value.dtype == object:
+            _update(h, pd.Series(value.ravel()))
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"dict%d" % len(value))
+        for key in sorted(value, key=repr):
+            _update(h, key)
+            _update(h, value[key])
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        h.update(type(value).__name__.encode("utf-8") + b"%d" % len(items))
+        for item in items:
+            _update(h, item)
+    else:
+        h.update(type(value).__name__.encode("utf-8") + repr(value).encode("utf-8"))
+
+def fingerprint(value):
+    """
+    Content hash of a session artifact: DataFrames and Series via
+    pd.util.hash_pandas_object (plus column names and dtypes), arrays by their
+    bytes, and containers recursively.
+    """
+    h = hashlib.sha256()
+    _update(h, value)
+    return h.hexdigest()
+
+def dependents(stage):
+    """
+    Every stage downstream of `stage`, in page order.
+    """
+    reached = {stage}
+    for name, spec in STAGES.items():
+        if name in reached:
+            continue
+        upstream = [s for s in reached if set(STAGES[s]["outputs"]) & set(spec["inputs"])]
+        if upstream:
+            reached.add(name)
+    return [name for name in STAGES if name in reached and name != stage]
+
+def invalidate(stage, state=None):
+    """
+    Drops the artifacts and memoised results of every stage downstream of
+    `stage` so their pages recompute from fresh inputs. Returns the stages hit.
+    """
+    state = st.session_state if state is None else state
+    memo = state.get(MEMO_KEY, {})
+    hashes = state.get(HASHES_KEY, {})
+    stale = dependents(stage)
+    for name in stale:
+        for key in STAGES[name]["outputs"]:
+            if key in state:
+                del state[key]
+            hashes.pop(key, None)
+        for memo_key in [k for k in memo if k[0] == name]:
+            del memo[memo_key]
+    return stale
+
+def publish(stage, state=None, **outputs):
+    """
+    Stores a stage's artifacts in session state. When any artifact's content
+    differs from what was last published, everything downstream is
+    invalidated. Returns True if something changed.
+    """
+    state = st.session_state if state is None else state
+    if HASHES_KEY not in state:
+        state[HASHES_KEY] = {}
+    hashes = state[HASHES_KEY]
+
+    changed = False
+    for key, value in outputs.items():
+        digest = fingerprint(value)
+        if hashes.get(key) != digest or key not in state:
+            changed = True
+            hashes[key] = digest
+        state[key] = value
+
+    if changed:
+        invalidate(stage, state)
+    return changed
+
+def run_stage(stage, compute, *args, state=None, **kwargs):
+    """
+    Memoised compute(*args, **kwargs) for one stage: the result is reused
+    until the content hash of the arguments changes or the stage is
+    invalidated from upstream.
+    """
+    state = st.session_state if state is None else state
+    if MEMO_KEY not in state:
+        state[MEMO_KEY] = {}
+    memo = state[MEMO_KEY]
+
+    key = (stage, getattr(compute, "__qualname__", repr(compute)))
+    signature = fingerprint([args, kwargs])
+    cached = memo.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    result = compute(*args, **kwargs)
+    memo[key] = (signature, result)
+    return result
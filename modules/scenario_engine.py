@@ -0,0 +1,361 @@
+# modules/scenario_engine.py
+import numpy as np
+import pandas as pd
+
+def forecast_years_of(df_forecast):
+    return sorted({col.split()[-1] for col in df_forecast.columns if col.startswith("Forecast ")})
+
+def project_demand(base, growth_rate):
+    """
+    Compounds `growth_rate` onto a (roles, years) demand array: year i is
+    scaled by (1 + growth_rate) ** i.
+    """
+    base = np.asarray(base, dtype=float)
+    return base * (1 + growth_rate) ** np.arange(base.shape[-1])
+
+def project_supply(initial, attrition, retirement, pipeline, n_years, decimals=None):
+    """
+    Supply recurrence s[t] = s[t-1] * (1 - attrition - retirement) + pipeline for
+    every role at once. Returns a (roles, n_years) array whose first column is
+    `initial`.
+
+    With decimals=None the closed form for constant rates is used,
+        s[t] = k**t * s[0] + pipeline * (1 - k**t) / (1 - k),   k = 1 - attrition - retirement,
+    so any horizon costs one broadcast. Passing `decimals` steps year by year
+    (vectorised over roles) and rounds each year before carrying it forward,
+    as the Scenario Planning table does.
+    """
+    initial = np.asarray(initial, dtype=float)
+    keep = 1 - np.asarray(attrition, dtype=float) - np.asarray(retirement, dtype=float)
+    pipeline = np.asarray(pipeline, dtype=float)
+    initial, keep, pipeline = np.broadcast_arrays(initial, keep, pipeline)
+
+    if decimals is None:
+        t = np.arange(n_years)
+        decay = keep[..., None] ** t
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inflow = np.where(
+                np.isclose(keep, 1.0)[..., None],
+                pipeline[..., None] * t,
+                pipeline[..., None] * (1 - decay) / (1 - keep[..., None])
+            )
+        return initial[..., None] * decay + inflow
+
+    supply = np.empty(initial.shape + (n_years,))
+    supply[..., 0] = initial
+    for t in range(1, n_years):
+        supply[..., t] = np.round(supply[..., t - 1] * keep + pipeline, decimals)
+    return supply
+
+def project_scenario(df_forecast, rate_df, growth_rate):
+    """
+    Scenario demand, projected supply and gap for every forecast row.
+    `rate_df` is indexed by role with "Attrition Rate", "Retirement Rate" and
+    "Pipeline"; rows whose role has no rates keep the forecast as supply.
+    Returns (demand, supply, role_gap) in the Scenario Planning layout.
+    """
+    forecast_years = forecast_years_of(df_forecast)
+    cols = [f"Forecast {y}" for y in forecast_years]
+    base_by_role = df_forecast[["Role"] + cols].set_index("Role")
+    base = base_by_role.to_numpy(dtype=float)
+
+    demand = base_by_role.copy()
+    demand[cols] = project_demand(base, growth_rate)
+
+    rates = rate_df.reindex(base_by_role.index)
+    has_rates = rates.notna().all(axis=1).to_numpy()
+    projected = project_supply(
+        base[:, 0],
+        rates["Attrition Rate"].fillna(0).to_numpy(),
+        rates["Retirement Rate"].fillna(0).to_numpy(),
+        rates["Pipeline"].fillna(0).to_numpy(),
+        len(cols),
+        decimals=1
+    )
+    supply = base_by_role.astype(float)
+    supply[cols] = np.where(has_rates[:, None], projected, base)
+
+    role_gap = demand.copy()
+    for year, col in zip(forecast_years, cols):
+        role_gap[f"Gap {year}"] = demand[col].astype(float).round(0) - supply[col].astype(float).round(0)
+    role_gap["Role"] = role_gap.index
+    role_gap.reset_index(drop=True, inplace=True)
+
+    return demand, supply, role_gap
+
+def summarize_scenario(demand, supply, role_gap):
+    """
+    Scenario Planning summaries from project_scenario's output: the gap summed
+    per unique role, and yearly totals of demand, supply and gap.
+    Returns (result_df, role_gap_summary).
+    """
+    forecast_years = forecast_years_of(demand)
+    gap_cols = [f"Gap {y}" for y in forecast_years]
+    role_gap_summary = role_gap.groupby("Role")[gap_cols].sum().reset_index()
+    result_df = pd.DataFrame({
+        "Year": forecast_years,
+        "Scenario Demand": demand[[f"Forecast {y}" for y in forecast_years]].sum().values,
+        "Projected Supply": supply[[f"Forecast {y}" for y in forecast_years]].sum().values,
+        "Workforce Gap": role_gap[gap_cols].sum().values
+    })
+    return result_df, role_gap_summary
+
+PERCENTILES = (10, 50, 90)
+MONTE_CARLO_PATHS = 5000
+ROLE_BAND_PATHS = 2000    # paths kept for per-role percentile bands
+
+def _normal(rng, mean, sd, size):
+    return rng.normal(mean, sd, size)
+
+def _lognormal(rng, mean, sd, size):
+    # Moment-matched so the draws keep the requested mean and sd (mean > 0)
+    mean = np.maximum(mean, 1e-12)
+    sigma2 = np.log1p((sd / mean) ** 2)
+    return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+
+def _uniform(rng, mean, sd, size):
+    half_width = np.sqrt(3) * sd
+    return rng.uniform(mean - half_width, mean + half_width, size)
+
+def _poisson(rng, mean, sd, size):
+    return rng.poisson(np.maximum(mean, 0), size).astype(float)
+
+# name -> fn(rng, mean, sd, size); Poisson ignores sd (its variance is the mean)
+DISTRIBUTIONS = {
+    "Normal": _normal,
+    "Lognormal": _lognormal,
+    "Uniform": _uniform,
+    "Poisson": _poisson
+}
+
+DEFAULT_DISTRIBUTIONS = {
+    "Growth": "Normal",
+    "Attrition Rate": "Normal",
+    "Retirement Rate": "Normal",
+    "Pipeline": "Poisson"
+}
+
+def simulate_paths(base, attrition, retirement, pipeline, growth_mean=0.0, growth_sd=0.02,
+                   rate_cv=0.25, pipeline_cv=0.25, has_rates=None, n_paths=MONTE_CARLO_PATHS,
+                   distributions=None, percentiles=PERCENTILES, seed=0, max_cells=5_000_000,
+                   role_bands=False, role_band_paths=ROLE_BAND_PATHS):
+    """
+    Monte Carlo demand/supply/gap for a (roles, years) demand baseline.
+
+    Every path draws one market growth rate per year, shared by all roles, and
+    per-role attrition, retirement and pipeline values for every year, around
+    the given means (sd = mean * cv for rates and pipeline). Rates are clipped
+    to [0, 1] and pipeline to >= 0. Paths are simulated as one
+    (paths, roles, years) tensor, `max_cells` elements per chunk.
+
+    The same seed and max_cells reproduce the same paths.
+
+    Returns (totals, by_role): percentile arrays shaped (3, len(percentiles), years)
+    and (3, len(percentiles), roles, years) for demand, supply and gap.
+    Totals use every path. by_role is None unless role_bands=True, and is
+    then estimated from the first `role_band_paths` paths (paths are
+    independent draws), so memory stays bounded whatever n_paths is.
+    """
+    base = np.asarray(base, dtype=float)
+    n_roles, n_years = base.shape
+    attrition, retirement, pipeline = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n_roles,)) for v in (attrition, retirement, pipeline)
+    )
+    has_rates = np.ones(n_roles, dtype=bool) if has_rates is None else np.asarray(has_rates, dtype=bool)
+    samplers = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    draw = {key: DISTRIBUTIONS[name] for key, name in samplers.items()}
+
+    rng = np.random.default_rng(seed)
+    totals = np.empty((3, n_paths, n_years))
+    kept = min(n_paths, role_band_paths) if role_bands else 0
+    demand_kept = np.empty((kept, n_roles, n_years), dtype=np.float32)
+    supply_kept = np.empty_like(demand_kept)
+
+    chunk = max(1, max_cells // max(1, n_roles * n_years))
+    steps = (n_roles, n_years - 1)
+    for start in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - start)
+
+        growth = draw["Growth"](rng, growth_mean, growth_sd, (size, n_years - 1))
+        factor = np.ones((size, n_years))
+        factor[:, 1:] = np.cumprod(1 + growth, axis=1)
+        demand = base * factor[:, None, :]
+
+        attr = np.clip(draw["Attrition Rate"](rng, attrition[:, None], attrition[:, None] * rate_cv, (size,) + steps), 0, 1)
+        retire = np.clip(draw["Retirement Rate"](rng, retirement[:, None], retirement[:, None] * rate_cv, (size,) + steps), 0, 1)
+        inflow = np.maximum(draw["Pipeline"](rng, pipeline[:, None], pipeline[:, None] * pipeline_cv, (size,) + steps), 0)
+        keep = np.clip(1 - attr - retire, 0, 1)
+
+        supply = np.empty((size, n_roles, n_years))
+        supply[:, :, 0] = base[:, 0]
+        for t in range(1, n_years):
+            supply[:, :, t] = supply[:, :, t - 1] * keep[:, :, t - 1] + inflow[:, :, t - 1]
+        # Roles without rates keep their forecast as supply, as in project_scenario
+        supply[:, ~has_rates, :] = base[~has_rates]
+
+        totals[0, start:start + size] = demand.sum(axis=1)
+        totals[1, start:start + size] = supply.sum(axis=1)
+        if start < kept:
+            n = min(size, kept - start)
+            demand_kept[start:start + n] = demand[:n]
+            supply_kept[start:start + n] = supply[:n]
+
+    totals[2] = totals[0] - totals[1]
+    total_bands = np.percentile(totals, percentiles, axis=1).swapaxes(0, 1)
+
+    role_bands_out = None
+    if role_bands:
+        role_bands_out = np.stack([
+            np.percentile(demand_kept, percentiles, axis=0),
+            np.percentile(supply_kept, percentiles, axis=0),
+            np.percentile(demand_kept - supply_kept, percentiles, axis=0)
+        ])
+    return total_bands, role_bands_out
+
+def simulate_scenario(df_forecast, rate_df, growth_rate=0.0, growth_sd=0.02, rate_cv=0.25,
+                      pipeline_cv=0.25, n_paths=MONTE_CARLO_PATHS, distributions=None,
+                      percentiles=PERCENTILES, seed=0, max_cells=5_000_000, role_bands=False):
+    """
+    Monte Carlo version of project_scenario. Forecast rows are summed per role
+    (each row brings its own pipeline inflow, as in the deterministic table)
+    and simulated with `rate_df` as the mean rates.
+    Returns (totals, by_role): tidy frames with Year, Metric and one column per
+    percentile (e.g. "P10"), by_role also carrying Role. by_role is None
+    unless role_bands=True (see simulate_paths).
+    """
+    forecast_years = forecast_years_of(df_forecast)
+    cols = [f"Forecast {y}" for y in forecast_years]
+    grouped = df_forecast[["Role"] + cols].groupby("Role", sort=False)
+    base_by_role = grouped[cols].sum()
+    row_counts = grouped.size().to_numpy()
+
+    rates = rate_df.reindex(base_by_role.index)
+    has_rates = rates.notna().all(axis=1).to_numpy()
+    total_bands, by_role_bands = simulate_paths(
+        base_by_role.to_numpy(dtype=float),
+        rates["Attrition Rate"].fillna(0).to_numpy(),
+        rates["Retirement Rate"].fillna(0).to_numpy(),
+        rates["Pipeline"].fillna(0).to_numpy() * row_counts,
+        growth_mean=growth_rate, growth_sd=growth_sd, rate_cv=rate_cv, pipeline_cv=pipeline_cv,
+        has_rates=has_rates, n_paths=n_paths, distributions=distributions,
+        percentiles=percentiles, seed=seed, max_cells=max_cells, role_bands=role_bands
+    )
+
+    labels = [f"P{q:g}" for q in percentiles]
+    metrics = ["Scenario Demand", "Projected Supply", "Workforce Gap"]
+    totals = pd.DataFrame(
+        total_bands.transpose(0, 2, 1).reshape(-1, len(labels)), columns=labels
+    )
+    totals.insert(0, "Metric", np.repeat(metrics, len(forecast_years)))
+    totals.insert(0, "Year", np.tile(forecast_years, len(metrics)))
+    if by_role_bands is None:
+        return totals.round(1), None
+
+    roles = base_by_role.index.to_numpy()
+    by_role = pd.DataFrame(
+        by_role_bands.transpose(0, 2, 3, 1).reshape(-1, len(labels)), columns=labels
+    )
+    by_role.insert(0, "Metric", np.repeat(metrics, len(roles) * len(forecast_years)))
+    by_role.insert(0, "Year", np.tile(forecast_years, len(metrics) * len(roles)))
+    by_role.insert(0, "Role", np.tile(np.repeat(roles, len(forecast_years)), len(metrics)))
+    return totals.round(1), by_role.round(1)
+
+def _chunks(n, per_item_cells, max_cells):
+    step = max(1, max_cells // max(1, per_item_cells))
+    return [slice(start, min(start + step, n)) for start in range(0, n, step)]
+
+def sweep_arrays(base, attrition, retirement, pipeline, growth_rates, attrition_multipliers,
+                 has_rates=None, max_cells=5_000_000):
+    """
+    Total demand, supply and gap for every (growth rate, attrition multiplier)
+    pair, with the same rounding as project_scenario.
+
+    Demand depends only on growth and supply only on attrition, and the total
+    gap is sum(round(demand)) - sum(round(supply)), so the grid is one
+    (growth, years) and one (multiplier, years) pass joined by broadcasting;
+    the (growth, multiplier, roles, years) tensor is never built. Each pass is
+    chunked to `max_cells` elements.
+    Returns (demand, supply, gap) shaped (growth, multiplier, years).
+    """
+    base = np.asarray(base, dtype=float)
+    n_roles, n_years = base.shape
+    growth_rates = np.asarray(growth_rates, dtype=float)
+    multipliers = np.asarray(attrition_multipliers, dtype=float)
+    has_rates = np.ones(n_roles, dtype=bool) if has_rates is None else np.asarray(has_rates, dtype=bool)
+
+    demand = np.empty((len(growth_rates), n_years))
+    demand_rounded = np.empty_like(demand)
+    for part in _chunks(len(growth_rates), n_roles * n_years, max_cells):
+        projected = project_demand(base, growth_rates[part, None, None])
+        demand[part] = projected.sum(axis=1)
+        demand_rounded[part] = np.round(projected).sum(axis=1)
+
+    supply = np.empty((len(multipliers), n_years))
+    supply_rounded = np.empty_like(supply)
+    for part in _chunks(len(multipliers), n_roles * n_years, max_cells):
+        projected = project_supply(
+            base[:, 0], np.asarray(attrition) * multipliers[part, None], retirement, pipeline, n_years, decimals=1
+        )
+        projected = np.where(has_rates[:, None], projected, base)
+        supply[part] = projected.sum(axis=1)
+        supply_rounded[part] = np.round(projected).sum(axis=1)
+
+    shape = (len(growth_rates), len(multipliers), n_years)
+    gap = demand_rounded[:, None, :] - supply_rounded[None, :, :]
+    return (
+        np.broadcast_to(demand[:, None, :], shape).copy(),
+        np.broadcast_to(supply[None, :, :], shape).copy(),
+        gap
+    )
+
+def sweep_scenarios(df_forecast, rate_df, growth_rates, attrition_multipliers, max_cells=5_000_000):
+    """
+    Scenario sweep over a grid of growth rates and attrition multipliers
+    (attrition rate x multiplier for every role). Returns a tidy comparison
+    cube with one row per Growth Rate, Attrition Multiplier and Year.
+    """
+    forecast_years = forecast_years_of(df_forecast)
+    cols = [f"Forecast {y}" for y in forecast_years]
+    base_by_role = df_forecast[["Role"] + cols].set_index("Role")
+    rates = rate_df.reindex(base_by_role.index)
+
+    demand, supply, gap = sweep_arrays(
+        base_by_role.to_numpy(dtype=float),
+        rates["Attrition Rate"].fillna(0).to_numpy(),
+        rates["Retirement Rate"].fillna(0).to_numpy(),
+        rates["Pipeline"].fillna(0).to_numpy(),
+        growth_rates, attrition_multipliers,
+        has_rates=rates.notna().all(axis=1).to_numpy(), max_cells=max_cells
+    )
+
+    index = pd.MultiIndex.from_product(
+        [list(growth_rates), list(attrition_multipliers), forecast_years],
+        names=["Growth Rate", "Attrition Multiplier", "Year"]
+    )
+    return pd.DataFrame({
+        "Scenario Demand": demand.ravel(),
+        "Projected Supply": supply.ravel(),
+        "Workforce Gap": gap.ravel()
+    }, index=index).reset_index()
+
+def break_even_growth(cube, year=None):
+    """
+    Growth rate at which the total workforce gap reaches zero in `year`
+    (default: the last forecast year) for every attrition multiplier, linearly
+    interpolated between grid points. NaN where the grid never crosses zero.
+    """
+    year = year or cube["Year"].max()
+    rows = []
+    for multiplier, group in cube[cube["Year"] == year].groupby("Attrition Multiplier", sort=False):
+        group = group.sort_values("Growth Rate")
+        growth = group["Growth Rate"].to_numpy(dtype=float)
+        gap = group["Workforce Gap"].to_numpy(dtype=float)
+        value = np.nan
+        crossing = np.flatnonzero(np.sign(gap[:-1]) != np.sign(gap[1:]))
+        if (gap == 0).any():
+            value = growth[np.argmax(gap == 0)]
+        elif len(crossing):
+            i = crossing[0]
+            value = growth[i] + (growth[i + 1] - growth[i]) * gap[i] / (gap[i] - gap[i + 1])
+        rows.append({"Attrition Multiplier": multiplier, "Break-even Growth Rate": value})
+    return pd.DataFrame(rows, columns=["Attrition Multiplier", "Break-even Growth Rate"])
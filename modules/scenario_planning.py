@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from modules import pipeline, scenario_engine
 
 def inject_custom_styles():
     st.markdown("""
@@ -38,9 +39,7 @@ def render_scenario_planning():
 
     df_forecast = st.session_state["scenario_planning_forecast"]
 
-    forecast_years = sorted({
-        col.split()[-1] for col in df_forecast.columns if col.startswith("Forecast ")
-    })
+    forecast_years = scenario_engine.forecast_years_of(df_forecast)
 
     st.sidebar.header("⚙️ Scenario Settings")
     growth_scenario = st.sidebar.selectbox(
@@ -72,59 +71,20 @@ def render_scenario_planning():
 
     rate_df = pd.DataFrame(rate_inputs).set_index("Role")
 
-    # === Demand Projection ===
-    base_cols = [f"Forecast {y}" for y in forecast_years]
-    base_by_role = df_forecast[["Role"] + base_cols].set_index("Role")
-    scenario_demand_by_role = base_by_role.copy()
-    for i, year in enumerate(forecast_years):
-        col = f"Forecast {year}"
-        scenario_demand_by_role[col] = base_by_role[col] * ((1 + growth_rate) ** i)
-
-    # === Supply Projection ===
-    supply_by_role = base_by_role.copy()
-    for i, year in enumerate(forecast_years):
-        col = f"Forecast {year}"
-        if i == 0:
-            supply_by_role[col] = base_by_role[col]
-        else:
-            prev_year = forecast_years[i - 1]
-            prev_col = f"Forecast {prev_year}"
-            for role in roles:
-                if role not in supply_by_role.index or role not in rate_df.index:
-                    continue
-                prev_val = supply_by_role.loc[role, prev_col]
-                attr = rate_df.loc[role]["Attrition Rate"]
-                retire = rate_df.loc[role]["Retirement Rate"]
-                inflow = rate_df.loc[role]["Pipeline"]
-                updated_val = prev_val * (1 - attr - retire) + inflow
-                supply_by_role.loc[role, col] = round(updated_val, 1)
-
-    # === Gap Calculation (Raw Data)
-    role_gap = scenario_demand_by_role.copy()
-    for year in forecast_years:
-        role_gap[f"Gap {year}"] = (
-            scenario_demand_by_role[f"Forecast {year}"].astype(float).round(0) -
-            supply_by_role[f"Forecast {year}"].astype(float).round(0)
-        )
-
-    role_gap["Role"] = role_gap.index
-    role_gap.reset_index(drop=True, inplace=True)
+    # === Demand, Supply and Gap Projection ===
+    scenario_demand_by_role, supply_by_role, role_gap = pipeline.run_stage(
+        "Scenario Planning", scenario_engine.project_scenario, df_forecast, rate_df, growth_rate
+    )
 
     # === Summarize Gap by Unique Role ===
-    gap_cols = [f"Gap {y}" for y in forecast_years]
-    role_gap_summary = role_gap.groupby("Role")[gap_cols].sum().reset_index()
+    result_df, role_gap_summary = scenario_engine.summarize_scenario(
+        scenario_demand_by_role, supply_by_role, role_gap
+    )
 
     st.subheader("📋 Role-Level Gap Forecast")
     st.dataframe(role_gap_summary, use_container_width=True)
 
     # === Summary View
-    result_df = pd.DataFrame({
-        "Year": forecast_years,
-        "Scenario Demand": scenario_demand_by_role[[f"Forecast {y}" for y in forecast_years]].sum().values,
-        "Projected Supply": supply_by_role[[f"Forecast {y}" for y in forecast_years]].sum().values,
-        "Workforce Gap": role_gap[[f"Gap {y}" for y in forecast_years]].sum().values
-    })
-
     st.subheader("📈 Summary Forecast")
     st.dataframe(result_df, use_container_width=True)
 
@@ -132,13 +92,77 @@ def render_scenario_planning():
     fig = px.line(melt_df, x="Year", y="Headcount", color="Metric", markers=True)
     st.plotly_chart(fig, use_container_width=True)
 
+    # === Monte Carlo Bands ===
+    with st.expander("🎲 Monte Carlo Simulation"):
+        st.caption("Draws growth, attrition, retirement and pipeline paths around the assumptions above.")
+        mc1, mc2, mc3 = st.columns(3)
+        with mc1:
+            n_paths = st.number_input("Paths", 100, 100000, scenario_engine.MONTE_CARLO_PATHS, 100)
+            seed = st.number_input("Random seed", 0, 2**31 - 1, 0, 1)
+        with mc2:
+            growth_sd = st.number_input("Growth volatility (% per year)", 0.0, 20.0, 2.0, 0.5) / 100
+            rate_cv = st.number_input("Attrition / retirement volatility (% of rate)", 0.0, 100.0, 25.0, 5.0) / 100
+        with mc3:
+            pipeline_cv = st.number_input("Pipeline volatility (% of FTE)", 0.0, 100.0, 25.0, 5.0) / 100
+            pipeline_dist = st.selectbox("Pipeline distribution", ["Poisson", "Normal", "Lognormal", "Uniform"])
+
+        if st.button("▶️ Run Simulation"):
+            with st.spinner("Simulating paths..."):
+                mc_totals, _ = scenario_engine.simulate_scenario(
+                    df_forecast, rate_df, growth_rate,
+                    growth_sd=growth_sd, rate_cv=rate_cv, pipeline_cv=pipeline_cv,
+                    n_paths=int(n_paths), distributions={"Pipeline": pipeline_dist}, seed=int(seed)
+                )
+            st.session_state["scenario_monte_carlo"] = {"totals": mc_totals}
+
+        if "scenario_monte_carlo" in st.session_state:
+            mc_totals = st.session_state["scenario_monte_carlo"]["totals"]
+            st.dataframe(mc_totals, use_container_width=True)
+            band_df = mc_totals.melt(id_vars=["Year", "Metric"], var_name="Percentile", value_name="Headcount")
+            fig_mc = px.line(band_df, x="Year", y="Headcount", color="Metric", line_dash="Percentile", markers=True)
+            st.plotly_chart(fig_mc, use_container_width=True)
+
+    # === Scenario Sweep ===
+    with st.expander("🧮 Scenario Sweep"):
+        st.caption("Evaluates every growth rate x attrition multiplier combination in one pass.")
+        sw1, sw2 = st.columns(2)
+        with sw1:
+            growth_range = st.slider("Growth rate range (%)", -20.0, 30.0, (-10.0, 15.0), 0.5)
+            growth_step = st.number_input("Growth step (%)", 0.1, 10.0, 1.0, 0.1)
+        with sw2:
+            multiplier_range = st.slider("Attrition multiplier range", 0.0, 3.0, (0.5, 2.0), 0.05)
+            multiplier_step = st.number_input("Multiplier step", 0.01, 1.0, 0.25, 0.01)
+
+        growth_grid = np.round(np.arange(growth_range[0], growth_range[1] + 1e-9, growth_step) / 100, 4)
+        multiplier_grid = np.round(np.arange(multiplier_range[0], multiplier_range[1] + 1e-9, multiplier_step), 4)
+        sweep_cube = pipeline.run_stage(
+            "Scenario Planning", scenario_engine.sweep_scenarios, df_forecast, rate_df, growth_grid, multiplier_grid
+        )
+
+        final_year = forecast_years[-1]
+        heat = sweep_cube[sweep_cube["Year"] == final_year].pivot(
+            index="Attrition Multiplier", columns="Growth Rate", values="Workforce Gap"
+        )
+        fig_sweep = px.imshow(
+            heat, aspect="auto", color_continuous_scale="RdBu_r", color_continuous_midpoint=0,
+            labels={"color": f"Gap {final_year}"}
+        )
+        st.plotly_chart(fig_sweep, use_container_width=True)
+
+        st.markdown(f"**Break-even growth rate ({final_year})**")
+        st.dataframe(scenario_engine.break_even_growth(sweep_cube, final_year), use_container_width=True)
+
     # === Save to Session for Later Modules ===
-    st.session_state["scenario_planning_output"] = result_df
-    st.session_state["scenario_plan_role_table"] = role_gap_summary
-    st.session_state["scenario_plan_role_detailed"] = role_gap
-    st.session_state["scenario_assumptions"] = {
-        "growth_rate": growth_rate,
-        "attrition_rates": rate_df["Attrition Rate"].to_dict(),
-        "retirement_rates": rate_df["Retirement Rate"].to_dict(),
-        "internal_pipeline": rate_df["Pipeline"].to_dict()
-    }
+    pipeline.publish(
+        "Scenario Planning",
+        scenario_planning_output=result_df,
+        scenario_plan_role_table=role_gap_summary,
+        scenario_plan_role_detailed=role_gap,
+        scenario_sweep=sweep_cube,
+        scenario_assumptions={
+            "growth_rate": growth_rate,
+            "attrition_rates": rate_df["Attrition Rate"].to_dict(),
+            "retirement_rates": rate_df["Retirement Rate"].to_dict(),
+            "internal_pipeline": rate_df["Pipeline"].to_dict()
+        }
+    )
@@ -1,12 +1,77 @@
 from dotenv import load_dotenv
 import os
+import time
+import uuid
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 import snowflake.connector
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import streamlit as st
 
 # ✅ Load environment variables
 load_dotenv()
 
+WORKFORCE_QUERY = """
+    SELECT DISTINCT
+        EMPLOYEE_PERSONNEL_NUMBER AS employee_personnel_number,
+        CALENDAR_YEAR AS calendar_year,
+        ZONE_NIM_GEO AS zone_nim_geo,
+        FUNCTION_UNIT AS function,
+        REASON_FOR_ACTION AS reason_for_action,
+        TECHNICAL_ENTRY_DATE AS technical_entry_date,
+        ACTION_DATE AS action_date,
+        EMPLOYMENT_STATUS AS employment_status
+    FROM edw.prshrtpms.pd_headcount_v
+    WHERE CALENDAR_YEAR BETWEEN EXTRACT(YEAR FROM CURRENT_DATE) - 4
+    AND EXTRACT(YEAR FROM CURRENT_DATE) - 1
+    ORDER BY CALENDAR_YEAR, FUNCTION
+    """
+
+# Same extract restricted to an explicit list of years, used to refresh snapshot partitions
+WORKFORCE_YEARS_QUERY = """
+    SELECT DISTINCT
+        EMPLOYEE_PERSONNEL_NUMBER AS employee_personnel_number,
+        CALENDAR_YEAR AS calendar_year,
+        ZONE_NIM_GEO AS zone_nim_geo,
+        FUNCTION_UNIT AS function,
+        REASON_FOR_ACTION AS reason_for_action,
+        TECHNICAL_ENTRY_DATE AS technical_entry_date,
+        ACTION_DATE AS action_date,
+        EMPLOYMENT_STATUS AS employment_status
+    FROM edw.prshrtpms.pd_headcount_v
+    WHERE CALENDAR_YEAR IN ({years})
+    ORDER BY CALENDAR_YEAR, FUNCTION
+    """
+
+HEADCOUNT_VIEW = "edw.prshrtpms.pd_headcount_v"
+
+# Cube dimensions accepted by the query builder, mapped to view columns
+CUBE_DIMENSIONS = {
+    "function": "FUNCTION_UNIT",
+    "zone": "ZONE_NIM_GEO",
+    "year": "CALENDAR_YEAR",
+    "reason_for_action": "REASON_FOR_ACTION",
+    "employment_status": "EMPLOYMENT_STATUS"
+}
+DEFAULT_CUBE = ("function", "zone", "year", "reason_for_action")
+
+# On-disk Parquet snapshot, one partition per CALENDAR_YEAR
+SNAPSHOT_DIR = os.getenv("HEADCOUNT_SNAPSHOT_DIR", os.path.join(".cache", "headcount_snapshot"))
+
+# Snowflake upper-cases the unquoted aliases above
+WORKFORCE_COLUMNS = [
+    "EMPLOYEE_PERSONNEL_NUMBER", "CALENDAR_YEAR", "ZONE_NIM_GEO", "FUNCTION",
+    "REASON_FOR_ACTION", "TECHNICAL_ENTRY_DATE", "ACTION_DATE", "EMPLOYMENT_STATUS"
+]
+
+# Low-cardinality text columns, dictionary-encoded into pandas categoricals
+CATEGORICAL_COLUMNS = {"ZONE_NIM_GEO", "FUNCTION", "REASON_FOR_ACTION", "EMPLOYMENT_STATUS"}
+
 # ✅ Fail early if missing
 def validate_env_vars():
     required_vars = [
@@ -28,27 +93,337 @@ def get_connection():
         user=os.getenv("SNOWFLAKE_USER"),
         warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
         database=os.getenv("SNOWFLAKE_DATABASE"),
-        schema=os.getenv("SNOWFLAKE_SCHEMA")
+        schema=os.getenv("SNOWFLAKE_SCHEMA"),
+        # Cache the SSO id token so new connections skip the browser handshake
+        client_store_temporary_credential=True,
+        # Keep pooled sessions from expiring while idle
+        client_session_keep_alive=True
+    )
+
+class ConnectionPool:
+    """
+    Thread-safe pool of open connections shared by every session in the process.
+    Idle connections are evicted after `idle_timeout` seconds and re-validated
+    before reuse; at most `max_size` connections are open at once.
+    """
+
+    def __init__(self, connect, max_size=4, idle_timeout=900, ping_after=60):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self._idle = []  # (connection, last_used) pairs, most recently used last
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.stats = {"opened": 0, "reused": 0, "evicted": 0, "unhealthy": 0}
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        keep = []
+        for conn, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self.stats["evicted"] += 1
+                self._close(conn)
+            else:
+                keep.append((conn, last_used))
+        self._idle = keep
+
+    def _is_healthy(self, conn, idle_for):
+        try:
+            if getattr(conn, "is_closed", lambda: False)():
+                return False
+            if idle_for > self.ping_after:
+                cur = conn.cursor()
+                try:
+                    cur.execute("SELECT 1")
+                finally:
+                    cur.close()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                self._evict_idle()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                elif self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No Snowflake connection available in the pool.")
+                    self._cond.wait(remaining)
+                    continue
+
+            # Health check outside the lock so a slow ping doesn't block other sessions
+            if self._is_healthy(conn, time.monotonic() - last_used):
+                with self._cond:
+                    self.stats["reused"] += 1
+                return conn
+            self._close(conn)
+            with self._cond:
+                self.stats["unhealthy"] += 1
+                self._in_use -= 1
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats["opened"] += 1
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._evict_idle()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        A pooled connection for the `with` block. If the block raises, the
+        connection is closed instead of returned, as its state is unknown.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+
+    def metrics(self):
+        with self._cond:
+            total = self.stats["opened"] + self.stats["reused"]
+            return {
+                **self.stats,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "reuse_ratio": round(self.stats["reused"] / total, 3) if total else 0.0
+            }
+
+    def close_all(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close(conn)
+            self._idle = []
+
+@st.cache_resource
+def get_pool():
+    pool = ConnectionPool(
+        get_connection,
+        max_size=int(os.getenv("SNOWFLAKE_POOL_SIZE", "4")),
+        idle_timeout=int(os.getenv("SNOWFLAKE_POOL_IDLE_SECONDS", "900"))
+    )
+    atexit.register(pool.close_all)
+    return pool
+
+def arrow_batches_to_frame(batches, columns=WORKFORCE_COLUMNS):
+    """
+    Concatenates Arrow result batches into one typed DataFrame.
+    Text dimensions become categoricals and CALENDAR_YEAR becomes int16,
+    without ever materialising Python row tuples. An empty result gets
+    `columns` (the workforce extract's by default).
+    """
+    tables = [b if isinstance(b, pa.Table) else pa.Table.from_batches([b]) for b in batches]
+    if not tables:
+        return pd.DataFrame(columns=list(columns))
+
+    # Snowflake narrows NUMBER columns per batch (int8/int16/...), so widen to a common schema
+    table = pa.concat_tables(tables, promote_options="permissive")
+    del tables
+
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        key = name.upper()
+        if key in CATEGORICAL_COLUMNS and not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+        elif key == "CALENDAR_YEAR" and column.null_count == 0:
+            column = pc.cast(column, pa.int16())
+        columns.append(column)
+    table = pa.table(columns, names=table.column_names)
+
+    return table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+
+def fetch_arrow_frame(conn, query):
+    """
+    Runs a query and builds the DataFrame from the cursor's Arrow result batches.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(query)
+        return arrow_batches_to_frame(cur.fetch_arrow_batches())
+    finally:
+        cur.close()
+
+def workforce_years(today=None):
+    """
+    Returns the 4 calendar years covered by the extract, oldest first.
+    """
+    current_year = (today or datetime.today()).year
+    return list(range(current_year - 4, current_year))
+
+def snapshot_path(year, snapshot_dir=None):
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f"CALENDAR_YEAR={int(year)}", "data.parquet")
+
+def write_snapshot_partition(df_year, year, snapshot_dir=None):
+    """
+    Writes one year of the extract. The file is written under a temporary name and
+    swapped in, so concurrent readers never see a half-written partition.
+    """
+    path = snapshot_path(year, snapshot_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    df_year.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def invalidate_snapshot(years=None, snapshot_dir=None):
+    """
+    Drops cached partitions (all years if none are given) so they are re-queried.
+    """
+    root = snapshot_dir or SNAPSHOT_DIR
+    if years is None:
+        years = [d.split("=", 1)[1] for d in os.listdir(root) if d.startswith("CALENDAR_YEAR=")] \
+            if os.path.isdir(root) else []
+    for year in years:
+        path = snapshot_path(year, root)
+        if os.path.exists(path):
+            os.remove(path)
+
+def load_workforce_snapshot(years=None, refresh_years=None, snapshot_dir=None, pool=None):
+    """
+    Serves the extract from the Parquet snapshot and only queries Snowflake for
+    missing partitions plus `refresh_years` (by default the most recent year, which
+    can still receive corrections). Closed years are read from disk.
+    """
+    years = sorted(int(y) for y in (years or workforce_years()))
+    refresh_years = {max(years)} if refresh_years is None else {int(y) for y in refresh_years}
+    stale = [y for y in years if y in refresh_years or not os.path.exists(snapshot_path(y, snapshot_dir))]
+
+    if stale:
+        query = WORKFORCE_YEARS_QUERY.format(years=", ".join(str(y) for y in stale))
+        with (pool or get_pool()).connection() as conn:
+            df_fresh = fetch_arrow_frame(conn, query)
+
+        year_col = next((c for c in df_fresh.columns if c.upper() == "CALENDAR_YEAR"), "CALENDAR_YEAR")
+        for year in stale:
+            write_snapshot_partition(df_fresh[df_fresh[year_col] == year], year, snapshot_dir)
+
+    return arrow_batches_to_frame(pq.read_table(snapshot_path(y, snapshot_dir), partitioning=None) for y in years)
+
+def build_cube_query(dimensions=DEFAULT_CUBE, filters=None, years=None,
+                     table=HEADCOUNT_VIEW, paramstyle="pyformat"):
+    """
+    Builds a GROUP BY query returning distinct headcount per combination of
+    `dimensions`, so only the aggregated cube leaves the warehouse.
+
+    `filters` maps dimension names to a value or a list of values (IN predicate),
+    e.g. {"zone": ["AOA", "EUR"], "function": "Sales"}. `years` is a
+    (first, last) pair and defaults to the 4-year extract window.
+    `paramstyle` is "pyformat" for Snowflake or "qmark" for SQLite/DuckDB.
+    Returns (sql, params).
+    """
+    unknown = [d for d in list(dimensions) + list(filters or {}) if d not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"❌ Unknown cube dimension(s): {', '.join(unknown)}")
+    if paramstyle not in ("pyformat", "qmark"):
+        raise ValueError(f"❌ Unsupported paramstyle: {paramstyle}")
+
+    params = {} if paramstyle == "pyformat" else []
+
+    def bind(value):
+        if paramstyle == "qmark":
+            params.append(value)
+            return "?"
+        name = f"p{len(params)}"
+        params[name] = value
+        return f"%({name})s"
+
+    window = years or (workforce_years()[0], workforce_years()[-1])
+    predicates = [f"CALENDAR_YEAR BETWEEN {bind(int(window[0]))} AND {bind(int(window[1]))}"]
+    for dim, value in (filters or {}).items():
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            continue
+        placeholders = ", ".join(bind(v) for v in values)
+        predicates.append(f"{CUBE_DIMENSIONS[dim]} IN ({placeholders})")
+
+    columns = [CUBE_DIMENSIONS[d] for d in dimensions]
+    select = ", ".join(columns + ["COUNT(DISTINCT EMPLOYEE_PERSONNEL_NUMBER) AS HEADCOUNT"])
+    sql = f"SELECT {select} FROM {table} WHERE {' AND '.join(predicates)}"
+    if columns:
+        sql += f" GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}"
+    return sql, params
+
+def fetch_headcount_cube(conn=None, dimensions=DEFAULT_CUBE, filters=None, years=None,
+                         table=HEADCOUNT_VIEW, paramstyle="pyformat"):
+    """
+    Runs build_cube_query on `conn` (a pooled Snowflake connection by default).
+    Any DB-API connection works, e.g. sqlite3 or DuckDB with paramstyle="qmark".
+    """
+    sql, params = build_cube_query(dimensions, filters, years, table, paramstyle)
+    if conn is None:
+        with get_pool().connection() as pooled:
+            return fetch_headcount_cube(pooled, dimensions, filters, years, table, paramstyle)
+
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params)
+        columns = [d[0].upper() for d in cur.description]
+        if hasattr(cur, "fetch_arrow_batches"):
+            return arrow_batches_to_frame(cur.fetch_arrow_batches(), columns)
+        return pd.DataFrame.from_records(cur.fetchall(), columns=columns)
+    finally:
+        cur.close()
+
+def cube_to_headcount_table(cube):
+    """
+    Pivots a cube containing FUNCTION_UNIT and CALENDAR_YEAR into the
+    "Function Unit" x year table the downstream pages use as `headcount_table`.
+    Other dimensions are summed over, which can double count employees with
+    several actions in a year; query a ("function", "year") cube for exact counts.
+    """
+    table = cube.pivot_table(
+        index="FUNCTION_UNIT", columns="CALENDAR_YEAR", values="HEADCOUNT",
+        aggfunc="sum", fill_value=0, observed=True
     )
+    table.columns = [str(int(c)) for c in table.columns]
+    return table.rename_axis("Function Unit").reset_index()
 
 @st.cache_data(ttl=3600)
-def fetch_workforce_data():
-    query = """
-    SELECT DISTINCT 
-        EMPLOYEE_PERSONNEL_NUMBER AS employee_personnel_number,
-        CALENDAR_YEAR AS calendar_year,
-        ZONE_NIM_GEO AS zone_nim_geo,
-        FUNCTION_UNIT AS function,
-        REASON_FOR_ACTION AS reason_for_action,
-        TECHNICAL_ENTRY_DATE AS technical_entry_date,
-        ACTION_DATE AS action_date,
-        EMPLOYMENT_STATUS AS employment_status
-    FROM edw.prshrtpms.pd_headcount_v
-    WHERE CALENDAR_YEAR BETWEEN EXTRACT(YEAR FROM CURRENT_DATE) - 4 
-    AND EXTRACT(YEAR FROM CURRENT_DATE) - 1
-    ORDER BY CALENDAR_YEAR, FUNCTION
+def fetch_function_headcount(zones=None, functions=None):
+    """
+    Headcount per function unit per year, aggregated server-side.
     """
-    conn = get_connection()
-    df_raw = pd.read_sql(query, conn)
-    conn.close()
-    return df_raw
\ No newline at end of file
+    filters = {"zone": list(zones or []), "function": list(functions or [])}
+    cube = fetch_headcount_cube(dimensions=("function", "year"), filters=filters)
+    return cube_to_headcount_table(cube)
+
+@st.cache_data(ttl=3600)
+def fetch_workforce_data(use_arrow=True, use_snapshot=True):
+    if use_arrow and use_snapshot:
+        return load_workforce_snapshot()
+
+    with get_pool().connection() as conn:
+        if use_arrow:
+            return fetch_arrow_frame(conn, WORKFORCE_QUERY)
+        return pd.read_sql(WORKFORCE_QUERY, conn)
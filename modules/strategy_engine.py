@@ -0,0 +1,185 @@
+# modules/strategy_engine.py
+import numpy as np
+import pandas as pd
+
+STRATEGIES = ["Buy", "Build", "Borrow", "Boost"]
+USE_AUTO = "(Use Auto)"
+
+# Gap % at or above which a role needs an external fix, and the strategic
+# impact scores separating high / mid / low importance roles
+STRATEGY_THRESHOLDS = {"gap_pct": 50, "high_score": 4, "low_score": 2}
+
+# First matching rule wins. Each rule is
+#   (strategy, score at least, score below, gap % at least, gap % below)
+# naming a threshold above, or None for no bound.
+STRATEGY_RULES = [
+    ("Buy", "high_score", None, "gap_pct", None),
+    ("Build", "high_score", None, None, None),
+    ("Borrow", "low_score", "high_score", "gap_pct", None),
+]
+STRATEGY_DEFAULT = "Boost"
+
+# Quadrants of the strategic gap chart (no low-score band)
+QUADRANT_RULES = [
+    ("Boost", None, "high_score", None, "gap_pct"),
+    ("Build", "high_score", None, None, "gap_pct"),
+    ("Buy", "high_score", None, "gap_pct", None),
+    ("Borrow", None, "high_score", "gap_pct", None),
+]
+QUADRANT_DEFAULT = "Other"
+
+def _between(values, low, high):
+    """
+    low <= values < high, with NaN never inside a bounded side.
+    """
+    inside = np.ones(values.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if low is not None:
+            inside &= values >= low
+        if high is not None:
+            inside &= values < high
+    return inside
+
+def classify(gap_pct, score, rules=STRATEGY_RULES, default=STRATEGY_DEFAULT, thresholds=None):
+    """
+    Evaluates a rule table over whole gap % / strategic score columns with one
+    np.select. `thresholds` overrides entries of STRATEGY_THRESHOLDS.
+    """
+    limits = {**STRATEGY_THRESHOLDS, **(thresholds or {})}
+    gap_pct = np.asarray(gap_pct, dtype=float)
+    score = np.asarray(score, dtype=float)
+    bound = lambda name: None if name is None else limits[name]
+
+    conditions = [
+        _between(score, bound(score_from), bound(score_below)) & _between(gap_pct, bound(gap_from), bound(gap_below))
+        for _, score_from, score_below, gap_from, gap_below in rules
+    ]
+    labels = np.array([rule[0] for rule in rules] + [default], dtype=object)
+    return labels[np.select(conditions, np.arange(len(rules)), default=len(rules))]
+
+def assign_strategies(gap_pct, score, thresholds=None):
+    return classify(gap_pct, score, STRATEGY_RULES, STRATEGY_DEFAULT, thresholds)
+
+def classify_quadrants(gap_pct, score, thresholds=None):
+    return classify(gap_pct, score, QUADRANT_RULES, QUADRANT_DEFAULT, thresholds)
+
+def apply_overrides(df_gap, overrides, column="Auto Strategy"):
+    """
+    Final strategy per row: the role's manual override joined on Critical Role,
+    falling back to `column` where the override is missing or USE_AUTO.
+    """
+    chosen = pd.Series(
+        {role: choice for role, choice in overrides.items() if choice and choice != USE_AUTO},
+        dtype=object
+    )
+    return df_gap["Critical Role"].map(chosen).fillna(df_gap[column])
+
+def strategy_summary(df_gap):
+    """
+    Roles, total gap and role list per final strategy and year.
+    """
+    columns = ["Strategy", "Year", "Roles", "Total_Gap", "Critical Roles"]
+    if df_gap.empty:
+        return pd.DataFrame(columns=columns)
+
+    keys = ["Final Strategy", "Year"]
+    roles = df_gap.drop_duplicates(keys + ["Critical Role"]).groupby(keys)["Critical Role"]
+    summary = pd.DataFrame({
+        "Roles": roles.size(),
+        "Total_Gap": df_gap.groupby(keys)["Gap"].sum().round(1),
+        "Critical Roles": roles.agg(", ".join)
+    }).reset_index().rename(columns={"Final Strategy": "Strategy"})
+    return summary[columns]
+
+DEFAULT_STRATEGIC_SCORE = 3
+
+def classify_gap_table(df_gap, strategic_scores, overrides=None, thresholds=None):
+    """
+    Adds Strategic Impact, Auto Strategy and Final Strategy to the role gap
+    table. Roles without a score get DEFAULT_STRATEGIC_SCORE.
+    """
+    df_gap = df_gap.copy()
+    df_gap["Strategic Impact"] = df_gap["Critical Role"].map(
+        lambda role: strategic_scores.get(role, DEFAULT_STRATEGIC_SCORE)
+    )
+    df_gap["Auto Strategy"] = assign_strategies(df_gap["Gap %"], df_gap["Strategic Impact"], thresholds)
+    df_gap["Final Strategy"] = apply_overrides(df_gap, overrides or {})
+    return df_gap
+
+# Strategy -> recommended action on the Gap Strategy page
+STRATEGY_ACTIONS = {
+    "Buy": "Hire externally",
+    "Build": "Upskill internally (targeted programs)",
+    "Borrow": "Use contractors or redeploy from low-impact areas",
+    "Boost": "Monitor and retain existing staff"
+}
+URGENT_BUY_GAP = 50
+
+def gap_strategy_table(df_gap):
+    """
+    One row per role: total absolute gap, peak gap year, mean strategic
+    impact, strategy, recommended action and priority score
+    (0.5 x total gap + 10 x impact), highest priority first.
+    """
+    df = df_gap.copy()
+    df["Gap"] = df["Gap"].abs()
+
+    role_summary = df.groupby("Critical Role").agg({
+        "Gap": "sum",
+        "Strategic Impact": "mean",
+        "Final Strategy": "first"
+    }).reset_index()
+
+    peak_years = df.loc[df.groupby("Critical Role")["Gap"].idxmax()][["Critical Role", "Year"]]
+    role_summary = role_summary.merge(peak_years, on="Critical Role", how="left")
+    role_summary.rename(columns={"Gap": "Total Gap", "Year": "Peak Year"}, inplace=True)
+
+    strategy = role_summary["Final Strategy"]
+    urgent = (strategy == "Buy") & (role_summary["Total Gap"] >= URGENT_BUY_GAP)
+    role_summary["Recommended Action"] = np.where(
+        urgent, "Hire externally (urgently)", strategy.map(STRATEGY_ACTIONS).fillna("No action required")
+    )
+    role_summary["Priority Score"] = (
+        role_summary["Total Gap"] * 0.5 +
+        role_summary["Strategic Impact"] * 10
+    ).round(1)
+
+    return role_summary.sort_values(by="Priority Score", ascending=False)
+
+# Strategy -> (action template, owner) on the Action Planning page
+ACTION_PLANS = {
+    "Buy": ("Initiate targeted external recruitment campaign for {role}.", "Talent Acquisition"),
+    "Build": ("Launch internal upskilling or cross-training programs to develop {role}.", "L&D Team"),
+    "Borrow": ("Engage external contractors or temporary consultants for {role}.", "HRBP"),
+    "Boost": ("Implement retention strategies or job redesign to maximize current {role} capacity.", "People & Culture")
+}
+DEFAULT_ACTION_PLAN = ("Reassess strategic plan for {role}.", "HR Strategy")
+
+def action_plan_table(df_strategy):
+    """
+    Action plan per role from the gap strategy table: suggested action, owner,
+    feasibility and expected duration (both from strategic impact).
+    """
+    columns = ["Role", "Peak Year", "Total Gap", "Strategy", "Recommended Action",
+               "Feasibility", "Owner", "Expected Duration", "Priority Score"]
+    if df_strategy.empty:
+        return pd.DataFrame(columns=columns)
+
+    strategy = df_strategy["Final Strategy"]
+    plans = [ACTION_PLANS.get(s, DEFAULT_ACTION_PLAN) for s in strategy]
+    impact = df_strategy["Strategic Impact"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        high, medium = impact >= 4, impact >= 2
+
+    df_plan = pd.DataFrame({
+        "Role": df_strategy["Critical Role"].to_numpy(),
+        "Peak Year": df_strategy["Peak Year"].to_numpy(),
+        "Total Gap": np.round(df_strategy["Total Gap"].to_numpy(dtype=float), 1),
+        "Strategy": strategy.to_numpy(),
+        "Recommended Action": [template.format(role=role) for (template, _), role in zip(plans, df_strategy["Critical Role"])],
+        "Feasibility": np.select([high, medium], ["High", "Medium"], "Low"),
+        "Owner": [owner for _, owner in plans],
+        "Expected Duration": np.select([high, medium], ["3–6 months", "6–9 months"], "9–12+ months"),
+        "Priority Score": df_strategy["Priority Score"].to_numpy()
+    }, columns=columns)
+    return df_plan.sort_values(by="Priority Score", ascending=False)
@@ -0,0 +1,64 @@
+import os
+import streamlit as st
+import plotly.express as px
+from modules import auth, logger, ui, usage_engine
+
+def render_usage_analytics():
+    ui.page_container(
+        "📈 Usage Analytics",
+        "Sessions, page funnel and dwell time from the access log. Only rows added "
+        "since the last visit are read; the aggregates are kept on disk."
+    )
+
+    if st.session_state.get("user_email") not in auth.ADMIN_EMAILS:
+        st.error("❌ Usage analytics is only available to admins.")
+        return
+
+    if not logger.LOG_FILE.lower().endswith(".csv"):
+        st.info("ℹ️ Usage analytics reads the rotated CSV access logs; set ACCESS_LOG_FILE to a .csv file.")
+        return
+    if not logger.rotated_files(logger.LOG_FILE):
+        st.warning(f"⚠️ No access log found at {logger.LOG_FILE}.")
+        return
+
+    # Only rows added since the last run are read; the aggregates persist on disk
+    state = usage_engine.load_state()
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        rebuild = st.button("🔁 Rebuild from scratch")
+    if rebuild:
+        state = usage_engine.new_state()
+    with st.spinner("Reading new log rows..."):
+        state, new_rows = usage_engine.update_from_logs(logger.LOG_FILE, state)
+    if new_rows or rebuild:
+        usage_engine.save_state(state)
+    with col2:
+        st.caption(f"{state['rows']:,} log rows analysed ({new_rows:,} new) · "
+                   f"state file: {os.path.abspath(usage_engine.STATE_FILE)}")
+
+    report = usage_engine.usage_report(state)
+    pages, funnel, users = report["pages"], report["funnel"], report["users"]
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Users", f"{len(users):,}")
+    m2.metric("Sessions", f"{int(users['Sessions'].sum()):,}")
+    m3.metric("Page Views", f"{int(pages['Views'].sum()):,}")
+    m4.metric("Sessions Reaching Action Planning", f"{funnel['% of Sessions'].iloc[-1]}%")
+
+    st.subheader(" Page Funnel")
+    fig = px.funnel(funnel, x="Sessions Reached", y="Page")
+    fig.update_layout(template="plotly_white")
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(funnel, use_container_width=True)
+
+    st.subheader(" Dwell Time and Exits by Page")
+    st.caption("Dwell time is the gap to the user's next event in the same session "
+               f"(sessions end at login or after {int(usage_engine.SESSION_GAP.total_seconds() // 60)} idle minutes).")
+    fig = px.bar(pages, x="Page", y="Median Dwell (s)", color="Exit Rate %",
+                 color_continuous_scale="Reds", text="Median Dwell (s)")
+    fig.update_layout(template="plotly_white")
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(pages, use_container_width=True)
+
+    st.subheader(" Sessions per User")
+    st.dataframe(users, use_container_width=True)
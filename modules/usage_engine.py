@@ -0,0 +1,273 @@
+# modules/usage_engine.py
+import hashlib
+import io
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+from modules import logger, page_registry
+
+SESSION_GAP = pd.Timedelta(minutes=30)   # idle time that ends a session
+CHUNK_BYTES = 8 * 1024 ** 2              # log bytes parsed per chunk
+SIGNATURE_BYTES = 1024                   # leading bytes that identify a log file
+STATE_FILE = os.getenv("USAGE_STATE_FILE", os.path.join(".cache", "usage_analytics.pkl"))
+
+# Dwell histogram edges in seconds; the last bin is open-ended up to SESSION_GAP
+DWELL_BINS = np.array([0, 5, 10, 20, 30, 60, 120, 300, 600, 900, 1200])
+
+def new_state(pages=None):
+    """
+    Empty aggregates. Everything is additive, so a re-run only folds in new rows.
+    """
+    pages = list(pages or page_registry.PAGES)
+    return {
+        "pages": pages,
+        "offsets": {},          # file signature -> bytes already read
+        "rows": 0,
+        "next_session": 0,
+        "open": pd.DataFrame({  # last event of each user's session still in progress
+            "Email": pd.Series(dtype=object), "DateTime": pd.Series(dtype="datetime64[ns]"),
+            "Page": pd.Series(dtype=object), "Session": pd.Series(dtype="int64"),
+            "Visited": pd.Series(dtype="int64")
+        }),
+        "users": pd.DataFrame({
+            "Sessions": pd.Series(dtype="int64"), "Page Views": pd.Series(dtype="int64"),
+            "First Seen": pd.Series(dtype="datetime64[ns]"), "Last Seen": pd.Series(dtype="datetime64[ns]")
+        }),
+        "views": pd.Series(dtype="int64"),
+        "exits": pd.Series(dtype="int64"),
+        "dwell_sum": pd.Series(dtype=float),
+        "dwell_hist": pd.DataFrame(columns=range(len(DWELL_BINS)), dtype="int64"),
+        "funnel_reached": np.zeros(len(pages), dtype=np.int64),
+        "funnel_deepest": np.zeros(len(pages), dtype=np.int64),
+        "closed_sessions": 0
+    }
+
+def load_state(path=None, pages=None):
+    path = path or STATE_FILE
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("pages") == list(pages or page_registry.PAGES):
+            return state
+    # No state yet, or the page list changed and the funnel has to be rebuilt
+    return new_state(pages)
+
+def save_state(state, path=None):
+    path = path or STATE_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp_path, path)
+
+def file_signature(path):
+    """
+    Hash of a log file's header and first row. Rotation renames files but
+    never rewrites them, so the signature follows a file from access_log.csv
+    to access_log.1.csv and its read offset stays valid.
+    """
+    with open(path, "rb") as f:
+        head = b"".join(f.readline(SIGNATURE_BYTES) for _ in range(2))
+    return hashlib.sha1(head).hexdigest()
+
+def read_new_rows(path, offset=0, chunk_bytes=CHUNK_BYTES):
+    """
+    Yields (rows, end_offset) for the complete lines after `offset`, at most
+    `chunk_bytes` at a time. A trailing partial line is left for next time.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        carry = b""
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                return
+            block = carry + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                carry = block
+                continue
+            data, carry = block[:cut], block[cut:]
+            rows = pd.read_csv(io.BytesIO(data), names=logger.LOG_COLUMNS, header=None, dtype=str,
+                               keep_default_na=False)
+            rows = rows[rows["Email"] != logger.LOG_COLUMNS[0]]  # header line at the top of each file
+            offset += cut
+            yield rows, offset
+
+def _bump(total, counts):
+    return total.add(counts, fill_value=0).astype(total.dtype if len(total) else counts.dtype)
+
+def fold_events(state, rows):
+    """
+    Folds a chunk of log rows into the aggregates. A session ends at a Login
+    row or after SESSION_GAP of inactivity; an event's dwell time is the gap to
+    the user's next event in the same session.
+    """
+    pages = state["pages"]
+    page_bit = {p: 1 << i for i, p in enumerate(pages)}
+
+    df = rows.copy()
+    df["DateTime"] = pd.to_datetime(df["DateTime"], errors="coerce")
+    df = df.dropna(subset=["DateTime"])
+    if df.empty:
+        return state
+    state["rows"] += len(df)
+    df["Carried"] = False
+
+    carried = state["open"][state["open"]["Email"].isin(df["Email"])].assign(Carried=True)
+    df = pd.concat([carried, df], ignore_index=True)
+    df = df.sort_values(["Email", "Carried", "DateTime"], ascending=[True, False, True], kind="stable")
+    df = df.reset_index(drop=True)
+
+    email = df["Email"].to_numpy()
+    when = df["DateTime"].to_numpy()
+    carried_mask = df["Carried"].to_numpy()
+    is_login = df["Page"].str.startswith("Login").to_numpy()
+    same_user = np.r_[False, email[1:] == email[:-1]]
+    gap = np.r_[np.timedelta64(0, "ns"), np.diff(when)]
+    gap = np.maximum(gap, np.timedelta64(0, "ns"))
+
+    new_session = (~same_user | is_login | (gap > SESSION_GAP.to_timedelta64())) & ~carried_mask
+    session_ids = np.full(len(df), -1, dtype=np.int64)
+    session_ids[new_session] = state["next_session"] + np.arange(new_session.sum())
+    session_ids[carried_mask] = df.loc[carried_mask, "Session"].to_numpy(dtype=np.int64)
+    session_ids = pd.Series(np.where(session_ids >= 0, session_ids, np.nan)).ffill().to_numpy(dtype=np.int64)
+    state["next_session"] += int(new_session.sum())
+
+    # Dwell and exits belong to the earlier event of each consecutive pair
+    counted = ~is_login & ~carried_mask                     # fresh page views
+    continues = np.r_[~new_session[1:] & same_user[1:], False]
+    ends = np.r_[new_session[1:] & same_user[1:], False]    # followed by a new session of the same user
+    has_dwell = continues & ~is_login
+    dwell = np.r_[gap[1:], np.timedelta64(0, "ns")] / np.timedelta64(1, "s")
+
+    page = df["Page"]
+    state["views"] = _bump(state["views"], page[counted].value_counts())
+    state["exits"] = _bump(state["exits"], page[ends & ~is_login].value_counts())
+    state["dwell_sum"] = _bump(state["dwell_sum"], pd.Series(dwell[has_dwell]).groupby(page[has_dwell].to_numpy()).sum())
+    bins = np.searchsorted(DWELL_BINS, dwell[has_dwell], side="right") - 1
+    hist = pd.crosstab(page[has_dwell].to_numpy(), bins).reindex(columns=range(len(DWELL_BINS)), fill_value=0)
+    state["dwell_hist"] = state["dwell_hist"].add(hist, fill_value=0).fillna(0).astype("int64")
+
+    # Pages visited per session as a bitmask over the funnel order
+    bits = page.map(page_bit).fillna(0).astype("int64").to_numpy()
+    bits[carried_mask] = df.loc[carried_mask, "Visited"].to_numpy(dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, session_ids[1:] != session_ids[:-1]])
+    visited = np.bitwise_or.reduceat(bits, starts)
+    last_rows = np.r_[starts[1:], len(df)] - 1
+    last_of_user = np.r_[email[1:] != email[:-1], True][last_rows]
+
+    _count_funnel(state, visited[~last_of_user])
+    state["closed_sessions"] += int((~last_of_user).sum())
+
+    # Per-user totals
+    fresh = df[~carried_mask]
+    users = pd.DataFrame({
+        "Sessions": pd.Series(new_session[~carried_mask]).groupby(fresh["Email"].to_numpy()).sum(),
+        "Page Views": pd.Series(counted[~carried_mask]).groupby(fresh["Email"].to_numpy()).sum(),
+        "First Seen": fresh.groupby("Email")["DateTime"].min(),
+        "Last Seen": fresh.groupby("Email")["DateTime"].max()
+    })
+    old = state["users"].reindex(users.index)
+    users["Sessions"] += old["Sessions"].fillna(0).astype("int64").to_numpy()
+    users["Page Views"] += old["Page Views"].fillna(0).astype("int64").to_numpy()
+    users["First Seen"] = pd.concat([users["First Seen"], old["First Seen"]], axis=1).min(axis=1)
+    users["Last Seen"] = pd.concat([users["Last Seen"], old["Last Seen"]], axis=1).max(axis=1)
+    state["users"] = pd.concat([state["users"].drop(users.index, errors="ignore"), users]).sort_index()
+
+    # The newest event of every user in this chunk stays open
+    open_rows = df.iloc[last_rows[last_of_user]][["Email", "DateTime", "Page"]].assign(
+        Session=session_ids[last_rows[last_of_user]], Visited=visited[last_of_user]
+    )
+    state["open"] = pd.concat(
+        [state["open"][~state["open"]["Email"].isin(open_rows["Email"])], open_rows], ignore_index=True
+    )
+    return state
+
+def _count_funnel(state, visited):
+    if len(visited) == 0:
+        return
+    n_pages = len(state["pages"])
+    reached = (visited[:, None] >> np.arange(n_pages)) & 1
+    state["funnel_reached"] += reached.sum(axis=0)
+    has_any = visited > 0
+    deepest = np.floor(np.log2(visited[has_any])).astype(int)
+    state["funnel_deepest"] += np.bincount(deepest, minlength=n_pages)[:n_pages]
+
+def update_from_logs(log_file=None, state=None, backup_count=logger.BACKUP_COUNT, chunk_bytes=CHUNK_BYTES):
+    """
+    Reads whatever is new in the rotated CSV logs (oldest first) and folds it
+    into `state`. Returns (state, rows read).
+    """
+    log_file = log_file or logger.LOG_FILE
+    state = state or new_state()
+    before = state["rows"]
+    for path in logger.rotated_files(log_file, backup_count):
+        signature = file_signature(path)
+        offset = state["offsets"].get(signature, 0)
+        if os.path.getsize(path) <= offset:
+            continue
+        for rows, offset in read_new_rows(path, offset, chunk_bytes):
+            fold_events(state, rows)
+            state["offsets"][signature] = offset
+    return state, state["rows"] - before
+
+def _dwell_quantile(hist, q):
+    """
+    Quantile of binned dwell times, interpolating inside the bin.
+    """
+    counts = hist.to_numpy(dtype=float)
+    total = counts.sum(axis=1)
+    edges = np.r_[DWELL_BINS, SESSION_GAP.total_seconds()]
+    cum = counts.cumsum(axis=1)
+    target = total[:, None] * q
+    idx = (cum < target).sum(axis=1).clip(max=len(DWELL_BINS) - 1)
+    rows = np.arange(len(counts))
+    below = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+    in_bin = counts[rows, idx]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(in_bin > 0, (target[:, 0] - below) / in_bin, 0)
+        value = edges[idx] + frac * (edges[idx + 1] - edges[idx])
+    return pd.Series(np.where(total > 0, value, np.nan), index=hist.index)
+
+def usage_report(state, now=None):
+    """
+    Report tables from the aggregates. Sessions still open count towards the
+    funnel, and as exits once they have been idle longer than SESSION_GAP.
+    Returns {"pages", "funnel", "users"}.
+    """
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    open_ = state["open"]
+    idle = open_[(now - open_["DateTime"]) > SESSION_GAP]
+    exits = _bump(state["exits"], idle.loc[~idle["Page"].str.startswith("Login"), "Page"].value_counts())
+
+    views = state["views"]
+    dwell_n = state["dwell_hist"].sum(axis=1)
+    pages = pd.DataFrame({
+        "Views": views,
+        "Exits": exits.reindex(views.index).fillna(0).astype("int64"),
+        "Mean Dwell (s)": (state["dwell_sum"] / dwell_n).reindex(views.index),
+        "Median Dwell (s)": _dwell_quantile(state["dwell_hist"], 0.5).reindex(views.index),
+        "P90 Dwell (s)": _dwell_quantile(state["dwell_hist"], 0.9).reindex(views.index)
+    })
+    pages["Exit Rate %"] = (pages["Exits"] / pages["Views"] * 100).round(1)
+    order = {p: i for i, p in enumerate(state["pages"])}
+    pages = pages.sort_index(key=lambda idx: idx.map(lambda p: order.get(p, len(order))))
+    pages = pages.rename_axis("Page").reset_index().round(1)
+
+    reached, deepest = state["funnel_reached"].copy(), state["funnel_deepest"].copy()
+    state_open = {"pages": state["pages"], "funnel_reached": reached, "funnel_deepest": deepest}
+    _count_funnel(state_open, open_["Visited"].to_numpy(dtype=np.int64))
+    n_sessions = state["closed_sessions"] + len(open_)
+    funnel = pd.DataFrame({
+        "Step": np.arange(1, len(state["pages"]) + 1),
+        "Page": state["pages"],
+        "Sessions Reached": reached,
+        "% of Sessions": np.round(reached / max(n_sessions, 1) * 100, 1),
+        "Furthest Step Here": deepest
+    })
+
+    users = state["users"].rename_axis("Email").reset_index().sort_values("Last Seen", ascending=False)
+    return {"pages": pages, "funnel": funnel, "users": users.reset_index(drop=True)}
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import plotly.express as px
+from modules import pipeline
 
 # Inject custom CSS styles
 def inject_custom_styles():
@@ -96,8 +97,7 @@ def render_headcount_input():
 
     # ✅ Only save when user clicks the save button
     if st.button("💾 Save Headcount Data"):
-        st.session_state["headcount_table"] = df_edit
-        st.session_state["headcount_years"] = years
+        pipeline.publish("Workforce Data Insights", headcount_table=df_edit, headcount_years=years)
         st.success("✅ Headcount data saved successfully!")
 
     # ✅ Visualization from saved data